@@ -0,0 +1,339 @@
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Tuple
+
+AGGREGATE_FUNCTIONS = ("SUM", "COUNT", "AVERAGE", "MIN", "MAX")
+
+Bounds = Tuple[int, int, int, int]   # (r1, c1, r2, c2), normalize edilmiş
+
+# bundan küçük aralıklar önbelleğe alınmaz, her seferinde taranır
+CACHE_MIN_CELLS = 64
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def exact_sum(values: Iterable[Any]) -> Any:
+    """
+    Sayıların tam toplamı, sonda bir kez yuvarlanır (sıradan bağımsız);
+    hepsi int ise int
+    """
+    return ExactSum(values).value()
+
+
+class ExactSum:
+    """
+    Kayan nokta hatası biriktirmeyen toplam. Her sonlu float 2**-k'nın
+    tam katıdır: toplam exact / 2**shift olarak tamsayıyla tutulur,
+    ekleme/çıkarma kesindir (shift yalnızca daha ince float gelince büyür).
+    floats  : toplamdaki float sayısı (0 → sonuç int)
+    special : inf / -inf / nan adetleri (tamsayıya çevrilemez)
+    """
+    __slots__ = ("exact", "shift", "floats", "special")
+
+    def __init__(self, values: Iterable[Any] = ()):
+        self.special: Dict[str, int] = {}
+
+        # toplu kuruluş: ortak payda bir kez bulunur
+        others, ratios, floats = [], [], 0
+        for value in values:
+            if type(value) is not float:
+                others.append(value)
+                continue
+            floats += 1
+            if math.isfinite(value):
+                ratios.append(value.as_integer_ratio())
+            else:
+                key = repr(value)
+                self.special[key] = self.special.get(key, 0) + 1
+
+        shift = max(denominator for _, denominator in ratios).bit_length() - 1 if ratios else 0
+        self.exact = (sum(others) << shift) + sum(
+            numerator << (shift + 1 - denominator.bit_length()) for numerator, denominator in ratios
+        )
+        self.shift = shift
+        self.floats = floats
+
+    def add(self, value: Any):
+        self._update(value, 1)
+
+    def remove(self, value: Any):
+        self._update(value, -1)
+
+    def _update(self, value: Any, sign: int):
+        if type(value) is not float:
+            self.exact += sign * (value << self.shift)
+            return
+
+        self.floats += sign
+        if math.isfinite(value):
+            numerator, denominator = value.as_integer_ratio()
+            k = denominator.bit_length() - 1
+            if k > self.shift:
+                self.exact <<= k - self.shift
+                self.shift = k
+            self.exact += sign * (numerator << (self.shift - k))
+            return
+
+        key = repr(value)
+        count = self.special.get(key, 0) + sign
+        if count:
+            self.special[key] = count
+        else:
+            del self.special[key]
+
+    def value(self) -> Any:
+        if self.special:
+            return sum(float(key) for key in self.special)
+        if not self.floats:
+            return self.exact >> self.shift
+        return _divide(self.exact, 1 << self.shift)
+
+    def mean(self, count: int) -> float:
+        if self.special:
+            return self.value() / count
+        return _divide(self.exact, count << self.shift)
+
+
+def _divide(numerator: int, denominator: int) -> float:
+    # int / int doğru yuvarlanır; float aralığını aşan sonuç ±inf
+    try:
+        return numerator / denominator
+    except OverflowError:
+        return math.inf if numerator > 0 else -math.inf
+
+
+class RangeAggregate:
+    """
+    Bir aralığın son toplu durumu. Girdi hücresi değişince
+    (eski, yeni) farkıyla güncellenir; toplam tam tutulur (ExactSum),
+    böylece farklar ne kadar birikirse biriksin sonuç aralığın baştan
+    toplamıyla aynıdır. MIN/MAX'ın uç değeri silinirse yalnızca uçlar
+    geçersiz (stale) olur ve ilk sorguda aralık taranır.
+    """
+    __slots__ = ("bounds", "total", "count", "low", "high", "stale")
+
+    def __init__(self, bounds: Bounds, values: List[Any]):
+        self.bounds = bounds
+        self.total = ExactSum(values)
+        self.count = len(values)
+        self.low = min(values) if values else None
+        self.high = max(values) if values else None
+        self.stale = False
+
+    def apply(self, old: Any, new: Any):
+        if _is_number(old):
+            self.total.remove(old)
+            self.count -= 1
+            if old == self.low or old == self.high:
+                self.stale = True
+
+        if _is_number(new):
+            self.total.add(new)
+            self.count += 1
+            if not self.stale:
+                if self.low is None or new < self.low:
+                    self.low = new
+                if self.high is None or new > self.high:
+                    self.high = new
+
+    def result(self, name: str) -> Any:
+        if name == "SUM":
+            return self.total.value() if self.count else 0
+        if name == "COUNT":
+            return self.count
+        if name == "AVERAGE":
+            return self.total.mean(self.count) if self.count else 0
+        if name == "MIN":
+            return self.low if self.count else 0
+        return self.high if self.count else 0
+
+
+class _RowIndex:
+    """
+    Bir sütunu izleyen aralık durumları, satır aralığına göre dizinli:
+    uzunluk sınıfı (2'nin kuvveti) başına başlangıca göre sıralı liste.
+    Bir satırı kapsayan girişler her sınıfta yalnızca
+    [satır - en uzun, satır] başlangıçlı dilimde aranır; yazma maliyeti
+    sütundaki giriş sayısına değil kapsayan giriş sayısına bağlıdır.
+    """
+    __slots__ = ("classes",)
+
+    def __init__(self):
+        # sınıf -> [başlangıçlar, girişler, en uzun]
+        self.classes: Dict[int, list] = {}
+
+    def add(self, entry: RangeAggregate):
+        r1, _, r2, _ = entry.bounds
+        key = (r2 - r1).bit_length()
+        bucket = self.classes.get(key)
+        if bucket is None:
+            bucket = self.classes[key] = [[], [], 0]
+        starts, entries, _ = bucket
+        i = bisect_right(starts, r1)
+        starts.insert(i, r1)
+        entries.insert(i, entry)
+        bucket[2] = max(bucket[2], r2 - r1)
+
+    def remove(self, entry: RangeAggregate):
+        r1, _, r2, _ = entry.bounds
+        key = (r2 - r1).bit_length()
+        starts, entries, _ = self.classes[key]
+        i = bisect_left(starts, r1)
+        while entries[i] is not entry:
+            i += 1
+        del starts[i], entries[i]
+        if not starts:
+            del self.classes[key]
+
+    def covering(self, row: int) -> List[RangeAggregate]:
+        found = []
+        for starts, entries, longest in self.classes.values():
+            for i in range(bisect_left(starts, row - longest), bisect_right(starts, row)):
+                entry = entries[i]
+                if row <= entry.bounds[2]:
+                    found.append(entry)
+        return found
+
+    def __bool__(self):
+        return bool(self.classes)
+
+
+class AggregateCache:
+    """
+    Aralık toplamlarının (SUM/COUNT/AVERAGE/MIN/MAX) kalıcı önbelleği.
+
+    CellStore'a sütun bazlı izleyici olarak kaydolur: izlenen bir sütuna
+    yazılan her değer, o satırı kapsayan aralıkların durumunu farkla
+    günceller (sütun başına _RowIndex ile yalnızca kapsayanlar gezilir).
+    Böylece tek bir girdi değişince aralığı içeren tüm toplamlar O(1)
+    ile okunur; tam tarama yalnızca ilk kullanımda ve uç değeri silinmiş
+    MIN/MAX için yapılır.
+
+    min_cells'ten küçük aralıklar önbelleğe girmez (taraması bir girişin
+    bakımından ucuz; aşağı doldurulmuş kısa kayan pencereler önbelleği
+    doldurmaz). Önbellek doluysa en uzun süredir kullanılmayan düşer:
+    yeni düzenlenen bölgenin pencereleri kalır.
+    """
+
+    def __init__(self, store, max_entries: int = 1024, min_cells: int = CACHE_MIN_CELLS):
+        self.store = store
+        self.max_entries = max_entries
+        self.min_cells = min_cells
+        # ekleme/kullanım sırası: ilk giriş en eski kullanılan (LRU)
+        self.entries: Dict[Bounds, RangeAggregate] = {}
+        self._by_col: Dict[int, _RowIndex] = {}
+
+        self.deltas = 0
+        self.rescans = 0
+
+    # =====================================================
+    # SORGU
+    # =====================================================
+    def result(self, name: str, bounds: Bounds) -> Any:
+        entry = self.entries.pop(bounds, None)
+        if entry is None:
+            r1, c1, r2, c2 = bounds
+            if (r2 - r1 + 1) * (c2 - c1 + 1) < self.min_cells:
+                return RangeAggregate(bounds, self._scan(bounds)).result(name)
+            entry = self._add(bounds)
+        else:
+            self.entries[bounds] = entry
+            if entry.stale and name in ("MIN", "MAX"):
+                self._rescan(entry)
+        return entry.result(name)
+
+    # =====================================================
+    # DELTA
+    # =====================================================
+    def on_write(self, row: int, col: int, old: Any, new: Any):
+        if old == new and type(old) is type(new):
+            return
+        index = self._by_col.get(col)
+        if index is None:
+            return
+        for entry in index.covering(row):
+            entry.apply(old, new)
+            self.deltas += 1
+
+    # =====================================================
+    # YARDIMCI
+    # =====================================================
+    def _add(self, bounds: Bounds) -> RangeAggregate:
+        if len(self.entries) >= self.max_entries:
+            self._evict(next(iter(self.entries)))
+
+        entry = RangeAggregate(bounds, self._scan(bounds))
+        self.entries[bounds] = entry
+        self._index(entry)
+        return entry
+
+    def _index(self, entry: RangeAggregate):
+        _, c1, _, c2 = entry.bounds
+        for col in range(c1, c2 + 1):
+            index = self._by_col.get(col)
+            if index is None:
+                index = self._by_col[col] = _RowIndex()
+                self.store.watch(col, self.on_write)
+            index.add(entry)
+
+    def resize(self, old: Bounds, new: Bounds):
+        """
+        Aynı sütunlarda yalnızca satır sınırları değişen aralık (tablo
+        büyüdü/küçüldü): durum yeniden taranmaz, eklenen ve çıkan
+        satırlar farkla uygulanır ve giriş yeni sınırla anılır
+        """
+        entry = self.entries.get(old)
+        if entry is None or old == new or new in self.entries or (old[1], old[3]) != (new[1], new[3]):
+            return
+
+        (r1, c1, r2, c2), (n1, _, n2, _) = old, new
+        for col in range(c1, c2 + 1):
+            column = self.store.column(col)
+            for first, last, sign in ((n1, r1 - 1, 1), (r2 + 1, n2, 1), (r1, n1 - 1, -1), (n2 + 1, r2, -1)):
+                if first > last:
+                    continue
+                for row in self.store.rows(col, first, last):
+                    if sign > 0:
+                        entry.apply(None, column[row])
+                    else:
+                        entry.apply(column[row], None)
+                    self.deltas += 1
+
+        self._unindex(entry)
+        del self.entries[old]
+        entry.bounds = new
+        self.entries[new] = entry
+        self._index(entry)
+
+    def _evict(self, bounds: Bounds):
+        self._unindex(self.entries.pop(bounds))
+
+    def _unindex(self, entry: RangeAggregate):
+        _, c1, _, c2 = entry.bounds
+        for col in range(c1, c2 + 1):
+            index = self._by_col[col]
+            index.remove(entry)
+            if not index:
+                del self._by_col[col]
+                self.store.unwatch(col, self.on_write)
+
+    def _rescan(self, entry: RangeAggregate):
+        values = self._scan(entry.bounds)
+        entry.low = min(values) if values else None
+        entry.high = max(values) if values else None
+        entry.stale = False
+        self.rescans += 1
+
+    def _scan(self, bounds: Bounds) -> List[Any]:
+        r1, c1, r2, c2 = bounds
+        values = []
+        for col in range(c1, c2 + 1):
+            column = self.store.column(col)
+            values.extend(v for v in map(column.__getitem__, self.store.rows(col, r1, r2)) if _is_number(v))
+        return values
+
+    def clear(self):
+        for bounds in list(self.entries):
+            self._evict(bounds)
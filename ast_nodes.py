@@ -1,29 +1,57 @@
+import sys
+import weakref
 from dataclasses import dataclass
-from typing import List
+from typing import Any, Dict, Tuple
 
 # =========================
 # BASE NODE
 # =========================
 
 class ASTNode:
-    pass
+    """
+    Düğümler değişmezdir ve NodeFactory ile üretildiklerinde yapısal
+    olarak aynı alt ağaçlar tek nesnedir. Hash ilk kullanımda bir kez
+    hesaplanır (alt düğümlerin hash'i zaten önbellekte).
+    __weakref__: fabrika düğümleri zayıf referansla tutar.
+    """
+    __slots__ = ("_hash", "__weakref__")
+
+    def _key(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__match_args__)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        return type(self) is type(other) and self._key() == other._key()
+
+    def __hash__(self):
+        try:
+            return self._hash
+        except AttributeError:
+            value = hash((type(self), self._key()))
+            object.__setattr__(self, "_hash", value)
+            return value
+
+
+def node(cls):
+    return dataclass(frozen=True, slots=True, eq=False)(cls)
 
 
 # =========================
 # LITERALS
 # =========================
 
-@dataclass(frozen=True)
+@node
 class Number(ASTNode):
     value: float
 
 
-@dataclass(frozen=True)
+@node
 class String(ASTNode):
     value: str
 
 
-@dataclass(frozen=True)
+@node
 class Boolean(ASTNode):
     value: bool
 
@@ -32,37 +60,90 @@ class Boolean(ASTNode):
 # CELL REFERENCES
 # =========================
 
-@dataclass(frozen=True)
+@node
 class Cell(ASTNode):
     ref: str   # "A1"
 
 
-@dataclass(frozen=True)
+@node
 class Range(ASTNode):
     start: Cell
     end: Cell
 
 
+# A:C / 1:3 – tüm sütun / satır; açık uçlu, dolu hücrelerle sınırlı
+# (indeksler 0 tabanlı, start <= end; doldurmada kaydırılmaz)
+@node
+class ColumnRange(ASTNode):
+    start: int
+    end: int
+
+
+@node
+class RowRange(ASTNode):
+    start: int
+    end: int
+
+
+@node
+class SheetRef(ASTNode):
+    sheet: str         # "Sheet2" (tırnaksız ad)
+    ref: ASTNode       # Cell / Range (göreli programda RelCell / RelRange)
+
+
+# =========================
+# RELATIVE (R1C1) REFERENCES
+# =========================
+
+@node
+class RelCell(ASTNode):
+    row: int            # göreli ise ofset, mutlak ($) ise satır indeksi
+    col: int
+    row_abs: bool = False
+    col_abs: bool = False
+
+
+@node
+class RelRange(ASTNode):
+    start: RelCell
+    end: RelCell
+
+
 # =========================
 # SYMBOL (LAMBDA param)
 # =========================
 
-@dataclass(frozen=True)
+@node
 class Symbol(ASTNode):
     name: str
 
 
+# =========================
+# TANIMLI İSİM (TaxRate, Inputs)
+# =========================
+
+@node
+class Name(ASTNode):
+    name: str          # yazıldığı gibi; derlemede tanımıyla değiştirilir
+
+
+@node
+class TableRef(ASTNode):
+    table: str         # Sales[Amount] → "Sales"
+    item: str          # "Amount", "#All", "#Headers", "#Data" ya da "" (gövde)
+
+
 # =========================
 # OPERATIONS
 # =========================
 
-@dataclass(frozen=True)
+@node
 class UnaryOp(ASTNode):
     op: str            # "-", "NOT"
     operand: ASTNode
 
 
-@dataclass(frozen=True)
+@node
 class BinaryOp(ASTNode):
     left: ASTNode
     op: str            # "+", "-", "*", "/", "<", "==", etc.
@@ -73,20 +154,104 @@ class BinaryOp(ASTNode):
 # FUNCTIONS
 # =========================
 
-@dataclass(frozen=True)
+@node
 class Function(ASTNode):
     name: str
-    args: List[ASTNode]
+    args: Tuple[ASTNode, ...]
 
 
-@dataclass(frozen=True)
+@node
 class If(ASTNode):
     condition: ASTNode
     true_expr: ASTNode
     false_expr: ASTNode
 
 
-@dataclass(frozen=True)
+@node
 class Lambda(ASTNode):
-    params: List[str]
-    body: ASTNode
\ No newline at end of file
+    params: Tuple[str, ...]
+    body: ASTNode
+    # parametreden bağımsız alt ifadeler: lambda oluşturulurken bir kez hesaplanır
+    bindings: Tuple[Tuple[str, ASTNode], ...] = ()
+
+
+# =========================
+# HASH-CONSING FACTORY
+# =========================
+
+class NodeFactory:
+    """
+    Hash-consing: aynı yapıdaki düğüm bir kez oluşturulur, sonrakiler
+    aynı nesneyi alır. Alt düğümler zaten tekil olduğundan anahtar
+    onların kimliği (id) ile kurulur – anahtar üretimi O(1)/alan.
+    Metinler (referans, fonksiyon adı, operatör) intern edilir.
+    Düğümler zayıf tutulur: hiçbir programın kullanmadığı düğüm silinir
+    ve kaydı kendiliğinden düşer. Anahtardaki id'ler güvenlidir: canlı
+    düğüm alt düğümlerini güçlü tuttuğundan id'leri yeniden kullanılamaz.
+    """
+
+    def __init__(self):
+        self._nodes: "weakref.WeakValueDictionary[tuple, ASTNode]" = weakref.WeakValueDictionary()
+        self.hits = 0
+
+    def __call__(self, cls, *fields) -> Any:
+        key = [cls]
+        for field in fields:
+            kind = type(field)
+            if kind is str:
+                key.append(field)
+            elif kind is list or kind is tuple:
+                key.append(tuple(_identity(f) for f in field))
+            elif isinstance(field, ASTNode):
+                key.append(id(field))
+            else:
+                # 1 == 1.0 == True: tip de anahtara girer
+                key.append((kind, field))
+        key = tuple(key)
+
+        existing = self._nodes.get(key)
+        if existing is not None:
+            self.hits += 1
+            return existing
+
+        created = cls(*[
+            sys.intern(f) if type(f) is str else (_canonical(f) if type(f) in (list, tuple) else f)
+            for f in fields
+        ])
+        self._nodes[key] = created
+        return created
+
+    def intern(self, node: ASTNode) -> ASTNode:
+        """
+        Başka bir fabrikada (ör. alt süreçte) üretilmiş ağacı bu
+        fabrikanın tekil düğümleriyle yeniden kurar.
+        """
+        if not isinstance(node, ASTNode):
+            return node
+        return self(type(node), *(self._intern_field(getattr(node, name)) for name in node.__match_args__))
+
+    def _intern_field(self, field):
+        if isinstance(field, ASTNode):
+            return self.intern(field)
+        if isinstance(field, tuple):
+            return tuple(self._intern_field(f) for f in field)
+        return field
+
+    def __len__(self):
+        return len(self._nodes)
+
+
+def _identity(field):
+    if isinstance(field, ASTNode):
+        return id(field)
+    if isinstance(field, tuple):
+        return tuple(_identity(f) for f in field)
+    return field
+
+
+def _canonical(field):
+    if isinstance(field, str):
+        return sys.intern(field)
+    if isinstance(field, (list, tuple)):
+        return tuple(_canonical(f) for f in field)
+    return field
@@ -0,0 +1,227 @@
+import heapq
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Iterable, List, Set, Tuple
+
+# =========================
+# PREDICATES
+# =========================
+
+def _is_blank(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _norm(value: Any) -> Any:
+    # "abc" == "ABC" (Excel filtreleri büyük/küçük harf duyarsız)
+    return value.lower() if isinstance(value, str) else value
+
+
+class Predicate:
+    """
+    Sütun filtresi.
+    local=True ise bir satırın sonucu yalnızca kendi değerine bağlıdır
+    (düzenlemede tek satır yeniden değerlendirilebilir).
+    """
+    local = True
+
+    def test(self, value: Any) -> bool:
+        raise NotImplementedError
+
+    def select(self, column: Dict[int, Any], rows: range) -> Set[int]:
+        """
+        Sütun deposu üzerinde tek geçiş: koşulu sağlayan dolu satırlar
+        """
+        test = self.test
+        return {r for r, v in column.items() if r in rows and test(v)}
+
+
+@dataclass(frozen=True)
+class NonBlank(Predicate):
+    def test(self, value):
+        return not _is_blank(value)
+
+
+@dataclass(frozen=True)
+class Equals(Predicate):
+    value: Any
+
+    def test(self, value):
+        if _is_blank(self.value):
+            return _is_blank(value)
+        return _norm(value) == _norm(self.value)
+
+
+@dataclass(frozen=True)
+class InSet(Predicate):
+    values: FrozenSet[Any]
+
+    def test(self, value):
+        if _is_blank(value):
+            return any(_is_blank(v) for v in self.values)
+        return _norm(value) in {_norm(v) for v in self.values}
+
+    def select(self, column, rows):
+        wanted = {_norm(v) for v in self.values}
+        return {r for r, v in column.items() if r in rows and _norm(v) in wanted}
+
+
+@dataclass(frozen=True)
+class Between(Predicate):
+    low: float = None
+    high: float = None
+
+    def test(self, value):
+        if not _is_number(value):
+            return False
+        if self.low is not None and value < self.low:
+            return False
+        if self.high is not None and value > self.high:
+            return False
+        return True
+
+
+@dataclass(frozen=True)
+class Contains(Predicate):
+    text: str
+    match_case: bool = False
+
+    def test(self, value):
+        if _is_blank(value):
+            return False
+        if self.match_case:
+            return self.text in str(value)
+        return self.text.lower() in str(value).lower()
+
+
+@dataclass(frozen=True)
+class TopN(Predicate):
+    n: int = 10
+    bottom: bool = False
+
+    local = False
+
+    def test(self, value):
+        # tek başına karar verilemez; select() sütunun tamamına bakar
+        return False
+
+    def select(self, column, rows):
+        numbers = ((v, r) for r, v in column.items() if r in rows and _is_number(v))
+        pick = heapq.nsmallest if self.bottom else heapq.nlargest
+        return {r for _, r in pick(self.n, numbers)}
+
+
+# =========================
+# AUTOFILTER
+# =========================
+
+Block = Tuple[int, int, bool]   # (ilk satır, son satır, gizli mi)
+
+
+class AutoFilter:
+    """
+    first_row..last_row aralığına uygulanan, sütun başına bir koşullu filtre.
+    Sonuç gizli satır kümesidir; UI'ya yalnızca değişen satırlar
+    bitişik bloklar halinde verilir.
+    """
+
+    def __init__(self, store, first_row: int, last_row: int):
+        self.store = store
+        self.rows = range(first_row, last_row + 1)
+        self.criteria: Dict[int, Predicate] = {}
+        self.hidden: Set[int] = set()
+
+        # yerel olmayan koşulların (TopN) son seçimi: col -> geçen satırlar.
+        # Başka sütundaki düzenlemede satır bu kümeyle sınanır
+        self.selected: Dict[int, Set[int]] = {}
+
+    # =====================================================
+    # KOŞULLAR
+    # =====================================================
+    def set_criteria(self, col: int, predicate: Predicate) -> List[Block]:
+        self.criteria[col] = predicate
+        return self.apply()
+
+    def clear_criteria(self, col: int = None) -> List[Block]:
+        if col is None:
+            self.criteria.clear()
+        else:
+            self.criteria.pop(col, None)
+        return self.apply()
+
+    # =====================================================
+    # DEĞERLENDİRME
+    # =====================================================
+    def evaluate(self) -> Set[int]:
+        """
+        Tüm koşullar için gizlenecek satırlar (satır maskesi)
+        """
+        hidden: Set[int] = set()
+        all_rows = None
+        self.selected = {}
+
+        for col, predicate in self.criteria.items():
+            column = self.store.column(col)
+            filled = {r for r in column if r in self.rows}
+            passing = predicate.select(column, self.rows)
+            if not predicate.local:
+                self.selected[col] = passing
+
+            hidden |= filled - passing
+            if not predicate.test(None):
+                if all_rows is None:
+                    all_rows = set(self.rows)
+                hidden |= all_rows - filled
+
+        return hidden
+
+    def apply(self) -> List[Block]:
+        return self._update(self.evaluate())
+
+    def refresh(self, cells: Iterable[Tuple[int, int]]) -> List[Block]:
+        """
+        Düzenlenen hücreler sonrası artımlı yeniden filtreleme.
+        Yalnızca filtreli sütunlardaki değişiklikler dikkate alınır.
+        """
+        touched = [(r, c) for r, c in cells if c in self.criteria and r in self.rows]
+        if not touched:
+            return []
+
+        if any(not self.criteria[c].local for _, c in touched):
+            return self.apply()
+
+        hidden = set(self.hidden)
+        for row in {r for r, _ in touched}:
+            if self._row_visible(row):
+                hidden.discard(row)
+            else:
+                hidden.add(row)
+        return self._update(hidden)
+
+    def _row_visible(self, row: int) -> bool:
+        for col, predicate in self.criteria.items():
+            if not predicate.local:
+                # sütunu değişmedi: son seçim hâlâ geçerli
+                if row not in self.selected[col]:
+                    return False
+            elif not predicate.test(self.store.get(row, col)):
+                return False
+        return True
+
+    # =====================================================
+    # BLOKLAR
+    # =====================================================
+    def _update(self, hidden: Set[int]) -> List[Block]:
+        changed = sorted((hidden - self.hidden) | (self.hidden - hidden))
+        self.hidden = hidden
+
+        blocks: List[Block] = []
+        for row in changed:
+            state = row in hidden
+            if blocks and blocks[-1][1] + 1 == row and blocks[-1][2] == state:
+                blocks[-1] = (blocks[-1][0], row, state)
+            else:
+                blocks.append((row, row, state))
+        return blocks
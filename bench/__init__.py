@@ -0,0 +1,15 @@
+"""
+Başsız (headless) performans ölçümleri: sentetik çalışma kitapları
+üzerinde tokenize/parse, değerlendirme, bağımlılık kaydı ve tam /
+artımlı recalc süreleri. Kullanım:
+
+    python -m bench --output bench/baseline.json        # referans makinede bir kez
+    python -m bench --baseline bench/baseline.json      # değişiklikten sonra
+
+Karşılaştırma öğe başına süre ve belleğe (tepe / kalıcı) bakar; eşiği
+aşan ölçüm varsa çıkış kodu 1'dir. Süreler makineye özgüdür: baseline aynı makinede alınmalı.
+"""
+from bench.generators import WORKLOADS, Workload
+from bench.runner import CASES, FOOTPRINT, compare, run
+
+__all__ = ["WORKLOADS", "Workload", "CASES", "FOOTPRINT", "compare", "run"]
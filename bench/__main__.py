@@ -0,0 +1,48 @@
+import argparse
+import os
+import sys
+
+from bench.generators import WORKLOADS
+from bench.runner import CASES, DEFAULT_TOLERANCE, FOOTPRINT, compare, load, run, save
+
+
+def main(argv=None) -> int:
+    args = argparse.ArgumentParser(prog="python -m bench", description="Mini Excel performans ölçümleri")
+    args.add_argument("--workload", action="append", choices=list(WORKLOADS), help="yalnızca bu çalışma kitapları")
+    args.add_argument("--case", action="append", choices=list(CASES) + [FOOTPRINT], help="yalnızca bu ölçümler")
+    args.add_argument("--scale", type=float, default=1.0, help="boyut çarpanı (varsayılan 1.0)")
+    args.add_argument("--repeat", type=int, default=3)
+    args.add_argument("--seed", type=int, default=0)
+    args.add_argument("--output", help="sonuçların yazılacağı JSON dosyası")
+    args.add_argument("--baseline", help="karşılaştırılacak önceki sonuç (JSON)")
+    args.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="gerileme eşiği (0.10 = %%10)")
+    options = args.parse_args(argv)
+
+    results = run(options.workload, options.case, options.scale, options.repeat, options.seed, progress=print)
+
+    if options.output:
+        save(results, options.output)
+
+    if not options.baseline:
+        return 0
+    if not os.path.exists(options.baseline):
+        print(f"baseline bulunamadı: {options.baseline}", file=sys.stderr)
+        return 0
+
+    baseline = load(options.baseline)
+    if baseline["meta"].get("scale") != options.scale:
+        print("uyarı: baseline farklı ölçekte alınmış", file=sys.stderr)
+
+    regressions = 0
+    print()
+    for workload, case, ratio, memory, regressed in compare(results, baseline, options.tolerance):
+        flag = "GERİLEME" if regressed else ""
+        timing = f"süre x{ratio:5.2f}" if ratio is not None else " " * 11
+        size = f"bellek x{memory:5.2f}" if memory is not None else ""
+        print(f"{workload:<12} {case:<20} {timing}  {size}  {flag}")
+        regressions += regressed
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
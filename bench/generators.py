@@ -0,0 +1,121 @@
+import random
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from utils import ReferenceTemplate, index_to_cell
+
+
+@dataclass(frozen=True)
+class Workload:
+    """
+    Sentetik çalışma kitabı: yüklenecek hücreler, artımlı recalc için
+    tek bir girdi değişikliği ve (varsa) yükleme sonrası fill bloğu.
+    """
+    name: str
+    entries: List[Tuple[int, int, str]]
+    edit: Tuple[int, int]                       # değeri değiştirilecek girdi hücresi
+    fill: Optional[Tuple[int, int, int, int]] = None   # (top, left, bottom, right), aşağı
+    size: int = 0
+    formulas: List[Tuple[int, int, str]] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # sayfadaki tüm formüller ("=" olmadan), fill kopyaları dahil
+        formulas = [(row, col, text[1:]) for row, col, text in self.entries if text.startswith("=")]
+        if self.fill:
+            top, left, bottom, right = self.fill
+            for row, col, text in list(formulas):
+                if row == top and left <= col <= right:
+                    template = ReferenceTemplate(text)
+                    formulas += [(r, col, template.render(r - top, 0)) for r in range(top + 1, bottom + 1)]
+        object.__setattr__(self, "formulas", formulas)
+
+
+# =========================
+# ÜRETİCİLER
+# =========================
+
+def chain(n: int, seed: int = 0) -> Workload:
+    """
+    Uzun zincir: A1 = 1, An = A(n-1) + 1 → her katmanda tek hücre
+    """
+    entries = [(0, 0, "1")]
+    entries += [(r, 0, f"={index_to_cell(r - 1, 0)}+1") for r in range(1, n)]
+    return Workload("chain", entries, edit=(0, 0), size=n)
+
+
+def fan_out(n: int, seed: int = 0) -> Workload:
+    """
+    Geniş yayılım: tek girdi ($A$1), n formül ona bağlı
+    """
+    entries = [(0, 0, "2")]
+    entries += [(r, 1, f"=$A$1*{r}+A{r + 1}") for r in range(n)]
+    return Workload("fan_out", entries, edit=(0, 0), size=n)
+
+
+def huge_ranges(n: int, seed: int = 0) -> Workload:
+    """
+    Büyük aralıklar: n sayı, üzerlerinde birkaç SUM/AVERAGE/MAX toplamı
+    """
+    rng = random.Random(seed)
+    entries = [(r, 0, str(rng.randint(1, 1000))) for r in range(n)]
+    for i, func in enumerate(("SUM", "AVERAGE", "MAX", "MIN", "COUNT")):
+        entries.append((i, 2, f"={func}(A1:A{n})"))
+        entries.append((i, 3, f"={func}(A{n // 2}:A{n})"))
+    return Workload("huge_ranges", entries, edit=(n - 1, 0), size=n)
+
+
+def diamond(width: int, depth: int, seed: int = 0) -> Workload:
+    """
+    Elmas grafikler: her katmandaki hücre önceki katmanın iki
+    komşusuna bağlı; ilk satırdaki bir değişiklik tüm katmanlara yayılır
+    """
+    entries = [(0, c, str(c + 1)) for c in range(width)]
+    for r in range(1, depth):
+        for c in range(width):
+            left = index_to_cell(r - 1, c)
+            right = index_to_cell(r - 1, (c + 1) % width)
+            entries.append((r, c, f"=({left}+{right})/2"))
+    return Workload("diamond", entries, edit=(0, 0), size=width * depth)
+
+
+def lookups(n: int, seed: int = 0) -> Workload:
+    """
+    Arama ağırlıklı sayfa: anahtar sütunu, her satırda anahtar
+    karşılaştırması (IF) ve eşleşenler üzerinde toplamlar.
+    (Değerlendiricide VLOOKUP yok: arama IF + aralık toplamıyla modellenir.)
+    """
+    rng = random.Random(seed)
+    entries = [(0, 5, "7")]     # F1: aranan anahtar
+    for r in range(n):
+        entries.append((r, 0, str(rng.randint(1, 20))))
+        entries.append((r, 1, str(rng.randint(1, 1000))))
+        entries.append((r, 2, f"=IF(A{r + 1}==$F$1,B{r + 1},0)"))
+    entries.append((1, 5, f"=SUM(C1:C{n})"))
+    entries.append((2, 5, f"=MAX(C1:C{n})"))
+    return Workload("lookups", entries, edit=(0, 5), size=n)
+
+
+def fill_down(n: int, seed: int = 0) -> Workload:
+    """
+    Fill-down sütunları: iki girdi sütunu, ilk satırdaki formüller
+    yüklemeden sonra n satıra doldurulur
+    """
+    rng = random.Random(seed)
+    entries = []
+    for r in range(n):
+        entries.append((r, 0, str(rng.randint(1, 100))))
+        entries.append((r, 1, str(rng.randint(1, 100))))
+    entries.append((0, 2, "=A1*B1"))
+    entries.append((0, 3, "=C1+$A$1"))
+    return Workload("fill_down", entries, edit=(0, 0), fill=(0, 2, n - 1, 3), size=n)
+
+
+# ölçek 1.0'daki boyutlar
+WORKLOADS = {
+    "chain": lambda scale, seed: chain(int(2000 * scale), seed),
+    "fan_out": lambda scale, seed: fan_out(int(5000 * scale), seed),
+    "huge_ranges": lambda scale, seed: huge_ranges(int(10000 * scale), seed),
+    "diamond": lambda scale, seed: diamond(50, int(40 * scale), seed),
+    "lookups": lambda scale, seed: lookups(int(2000 * scale), seed),
+    "fill_down": lambda scale, seed: fill_down(int(5000 * scale), seed),
+}
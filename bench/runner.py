@@ -0,0 +1,271 @@
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from dependency import DependencyExtractor
+from dependency_graph import DependencyGraph
+from formula_engine import FormulaEngine
+from memory import memory_report
+from parser import Parser, tokenize
+from utils import index_to_cell
+
+from bench.generators import WORKLOADS, Workload
+
+# süre / bellek bu oranı aşarsa (varsayılan %10) gerileme sayılır
+DEFAULT_TOLERANCE = 0.10
+
+# zamanlama dışı ölçüm: yükleme sonrası kalıcı bellek (alt sistem bazında)
+FOOTPRINT = "footprint"
+
+
+# =========================
+# YARDIMCI
+# =========================
+
+def _load(workload: Workload) -> FormulaEngine:
+    engine = FormulaEngine(table=None)
+    engine.set_cells(workload.entries)
+    if workload.fill:
+        engine.fill(*workload.fill, direction="down")
+    return engine
+
+
+# =========================
+# ÖLÇÜMLER
+# =========================
+# Her ölçüm hazırlığı (ölçülmeyen) yapar ve bir run() döndürür;
+# run() her çağrıda işi baştan yapar ve işlenen öğe sayısını döner.
+
+def _tokenize(workload: Workload) -> Callable[[], int]:
+    formulas = [text for _, _, text in workload.formulas]
+
+    def run():
+        for formula in formulas:
+            tokenize(formula)
+        return len(formulas)
+    return run
+
+
+def _parse(workload: Workload) -> Callable[[], int]:
+    formulas = [text for _, _, text in workload.formulas]
+
+    def run():
+        parser = Parser()
+        for formula in formulas:
+            parser.parse(formula)
+        return len(formulas)
+    return run
+
+
+def _evaluate(workload: Workload) -> Callable[[], int]:
+    engine = _load(workload)
+    programs = [(engine.program(r, c), r, c) for r, c, _ in workload.formulas]
+    programs = [(p.ast, r, c) for p, r, c in programs if p is not None]
+    evaluator = engine.evaluator
+
+    def run():
+        for ast, r, c in programs:
+            evaluator.eval_at(ast, r, c)
+        return len(programs)
+    return run
+
+
+def _dependencies(workload: Workload) -> Callable[[], int]:
+    parser = Parser()
+    extractor = DependencyExtractor()
+    deps = [
+        (index_to_cell(r, c), extractor.extract(parser.parse(text)))
+        for r, c, text in workload.formulas
+    ]
+
+    def run():
+        graph = DependencyGraph()
+        for cell, cell_deps in deps:
+            graph.set_dependencies(cell, cell_deps)
+        return len(deps)
+    return run
+
+
+def _recalc_full(workload: Workload) -> Callable[[], int]:
+    def run():
+        _load(workload)
+        return len(workload.entries)
+    return run
+
+
+def _recalc_incremental(workload: Workload) -> Callable[[], int]:
+    engine = _load(workload)
+    row, col = workload.edit
+    original = engine.store.source(row, col)
+    toggle = [original, "1" if original != "1" else "2"]
+
+    def run():
+        toggle.reverse()
+        engine.set_cell(row, col, toggle[0])
+        return engine.last_recalc.get("cells", 0)
+    return run
+
+
+CASES: Dict[str, Callable[[Workload], Callable[[], int]]] = {
+    "tokenize": _tokenize,
+    "parse": _parse,
+    "evaluate": _evaluate,
+    "set_dependencies": _dependencies,
+    "recalc_full": _recalc_full,
+    "recalc_incremental": _recalc_incremental,
+}
+
+
+# =========================
+# ÇALIŞTIRICI
+# =========================
+
+def measure(run: Callable[[], int], repeat: int) -> Dict[str, Any]:
+    """
+    En iyi / ortalama süre ve ayrı bir turda tepe bellek (tracemalloc
+    süreyi bozduğu için zamanlama turlarından ayrı ölçülür)
+    """
+    times = []
+    items = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = run()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "seconds": best,
+        "mean_seconds": sum(times) / len(times),
+        "items": items,
+        "throughput": items / best if best else 0.0,
+        "peak_kb": peak / 1024,
+    }
+
+
+def footprint(workload: Workload) -> Dict[str, Any]:
+    """
+    Yüklenmiş motorun alt sistem bazında kalıcı belleği (memory_report)
+    """
+    report = memory_report(_load(workload))
+    return {
+        "seconds": 0.0,
+        "mean_seconds": 0.0,
+        "items": len(workload.entries),
+        "throughput": 0.0,
+        "retained_kb": report["total"] / 1024,
+        "subsystems_kb": {name: size / 1024 for name, size in report["subsystems"].items()},
+    }
+
+
+def run(
+    workloads: Optional[List[str]] = None,
+    cases: Optional[List[str]] = None,
+    scale: float = 1.0,
+    repeat: int = 3,
+    seed: int = 0,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Seçilen çalışma kitabı × ölçüm çiftlerini çalıştırır (FOOTPRINT dahil).
+    Dönüş JSON'a yazılabilir: {"meta": {...}, "results": [{...}, ...]}
+    """
+    results = []
+    for workload_name in workloads or list(WORKLOADS):
+        workload = WORKLOADS[workload_name](scale, seed)
+        for case_name in cases or list(CASES) + [FOOTPRINT]:
+            if case_name == FOOTPRINT:
+                stats = footprint(workload)
+            else:
+                stats = measure(CASES[case_name](workload), repeat)
+            stats.update(workload=workload_name, case=case_name, size=workload.size)
+            results.append(stats)
+            if progress:
+                progress(_format_result(stats))
+
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "scale": scale,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+# =========================
+# KARŞILAŞTIRMA
+# =========================
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Tuple[str, str, float, float, bool]]:
+    """
+    Aynı (workload, case) çiftlerinin öğe başına süre (1 / throughput)
+    ve öğe başına bellek (tepe ya da kalıcı) oranlarını karşılaştırır;
+    böylece üretici boyutu değişse de oranlar anlamlı kalır.
+    Dönüş: [(workload, case, süre oranı | None, bellek oranı | None, gerileme mi), ...]
+    """
+    previous = {(r["workload"], r["case"]): r for r in baseline.get("results", [])}
+    rows = []
+    for result in current["results"]:
+        old = previous.get((result["workload"], result["case"]))
+        if old is None:
+            continue
+
+        ratio = None
+        if old["throughput"] and result["throughput"]:
+            ratio = old["throughput"] / result["throughput"]
+
+        memory = None
+        old_memory, new_memory = _memory_per_item(old), _memory_per_item(result)
+        if old_memory and new_memory is not None:
+            memory = new_memory / old_memory
+
+        regressed = any(r is not None and r > 1 + tolerance for r in (ratio, memory))
+        rows.append((result["workload"], result["case"], ratio, memory, regressed))
+    return rows
+
+
+def _memory_per_item(result: Dict[str, Any]) -> Optional[float]:
+    size = result.get("retained_kb", result.get("peak_kb"))
+    if size is None or not result["items"]:
+        return None
+    return size / result["items"]
+
+
+def _format_result(stats: Dict[str, Any]) -> str:
+    if stats["case"] == FOOTPRINT:
+        parts = ", ".join(f"{name} {size:.0f}" for name, size in stats["subsystems_kb"].items())
+        return f"{stats['workload']:<12} {stats['case']:<20} {stats['retained_kb']:10.0f} KB  ({parts})"
+    return (
+        f"{stats['workload']:<12} {stats['case']:<20} "
+        f"{stats['seconds'] * 1000:10.1f} ms {stats['throughput']:12.0f}/s "
+        f"{stats['peak_kb']:10.0f} KB"
+    )
+
+
+def save(results: Dict[str, Any], path: str):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
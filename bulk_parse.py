@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ast_nodes import ASTNode, NodeFactory
+from dependency import DependencyExtractor
+from parser import Parser
+
+# bu sayının altındaki benzersiz formülde süreç havuzu başlatmaya değmez
+PARALLEL_THRESHOLD = 2000
+CHUNK_SIZE = 512
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedFormula:
+    """
+    Toplu parse sonucu: ast (hata varsa None), sıralı bağımlılık
+    listesi ve hata mesajı. Tüm alanlar pickle edilebilir.
+    """
+    ast: Optional[ASTNode]
+    dependencies: Tuple[str, ...] = ()
+    error: Optional[str] = None
+
+
+# =========================
+# KOMPAKT KODLAMA
+# =========================
+# Alt süreçten düğüm nesneleri yerine parça başına bir düğüm tablosu
+# döner: her satır (sınıf, alanlar...) ve alt düğümler tablo indeksidir
+# (int). Tablo yalnızca demet/sayı/metinden oluşur – pickle hızlıdır
+# (sınıf bir kez referansla yazılır) ve paylaşılan alt ağaçlar bir kez
+# taşınır/kurulur. Demet alanları ("t", ...), int değerli alanlar
+# ("v", değer) olarak sarılır; metin/float/bool olduğu gibi kalır.
+
+def _encode(roots: List[Optional[ASTNode]]):
+    table = []
+    index: Dict[int, int] = {}
+
+    def field(value):
+        if isinstance(value, ASTNode):
+            return node(value)
+        if isinstance(value, tuple):
+            return ("t",) + tuple(field(v) for v in value)
+        if type(value) is int:
+            return ("v", value)
+        return value
+
+    def node(n):
+        position = index.get(id(n))
+        if position is None:
+            encoded = (type(n),) + tuple(field(getattr(n, name)) for name in n.__match_args__)
+            position = index[id(n)] = len(table)
+            table.append(encoded)
+        return position
+
+    return table, [None if root is None else node(root) for root in roots]
+
+
+def _decode(table, roots, nodes: NodeFactory) -> List[Optional[ASTNode]]:
+    built = []
+    append = built.append
+
+    def field(value):
+        kind = type(value)
+        if kind is int:
+            return built[value]
+        if kind is tuple:
+            return value[1] if value[0] == "v" else tuple(field(v) for v in value[1:])
+        return value
+
+    # alt düğümler tabloda ebeveynlerinden önce gelir
+    for row in table:
+        append(nodes(row[0], *[field(v) for v in row[1:]]))
+    return [None if root is None else built[root] for root in roots]
+
+
+# =========================
+# İŞÇİ (alt süreç)
+# =========================
+
+_parser = None
+_extractor = None
+
+
+def _parse_chunk(formulas: List[str]):
+    """
+    Alt süreçte bir parça formülü parse eder; Parser süreç başına bir
+    kez kurulur. Dönüş: (düğüm tablosu, kökler, bağımlılıklar, hatalar)
+    """
+    global _parser, _extractor
+    if _parser is None:
+        _parser = Parser()
+        _extractor = DependencyExtractor()
+
+    results = _parse_all(formulas, _parser, _extractor)
+    table, roots = _encode([result.ast for result in results])
+    return table, roots, [r.dependencies for r in results], [r.error for r in results]
+
+
+def _parse_all(formulas: List[str], parser: Parser, extractor: DependencyExtractor) -> List[ParsedFormula]:
+    results = []
+    for formula in formulas:
+        try:
+            ast = parser.parse(formula)
+        except Exception as error:
+            results.append(ParsedFormula(None, (), str(error)))
+            continue
+        results.append(ParsedFormula(ast, tuple(sorted(extractor.extract(ast)))))
+    return results
+
+
+# =========================
+# API
+# =========================
+
+def parse_many(
+    formulas: Iterable[str],
+    nodes: Optional[NodeFactory] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> List[ParsedFormula]:
+    """
+    Formül metinlerini ("=" olmadan) toplu parse eder; sonuç listesi
+    girişle aynı sıradadır. Aynı metin yalnızca bir kez parse edilir.
+
+    Benzersiz formül sayısı PARALLEL_THRESHOLD'u aşarsa parçalar
+    (chunk_size) bir süreç havuzunda işlenir. Havuz "spawn" ile başlar:
+    Qt iş parçacıkları olan ana süreç fork edilmez.
+    Dönen ağaçlar nodes fabrikasında (verilmezse yeni bir fabrikada)
+    tekilleştirilir.
+    """
+    formulas = list(formulas)
+    unique: Dict[str, int] = {}
+    for formula in formulas:
+        unique.setdefault(formula, len(unique))
+    texts = list(unique)
+
+    if nodes is None:
+        nodes = NodeFactory()
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(texts) >= PARALLEL_THRESHOLD:
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        context = multiprocessing.get_context("spawn")
+        parsed = []
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            for table, roots, dependencies, errors in pool.map(_parse_chunk, chunks):
+                asts = _decode(table, roots, nodes)
+                parsed.extend(map(ParsedFormula, asts, dependencies, errors))
+    else:
+        parsed = _parse_all(texts, Parser(nodes), DependencyExtractor())
+
+    return [parsed[unique[formula]] for formula in formulas]
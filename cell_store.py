@@ -0,0 +1,307 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def parse_literal(text: str) -> Any:
+    """
+    Kullanıcının girdiği (formül olmayan) metni tipli değere çevirir:
+    "" -> None, "12.5" -> 12.5, diğerleri -> str
+    """
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class CellStore:
+    """
+    Sayfanın tipli hücre değerleri (sütun bazlı) ve formül kaynakları.
+    UI yalnızca gösterir; motor değerleri buradan okur.
+    """
+
+    def __init__(self):
+        # col -> {row: value}
+        self.columns: Dict[int, Dict[int, Any]] = {}
+
+        # col -> dolu satırlar (artan sıralı): seyrek aralıklar yalnızca dolu hücreleri gezer
+        self.occupied: Dict[int, List[int]] = {}
+
+        # (row, col) -> "A1+B1"  (başındaki "=" olmadan)
+        self.formulas: Dict[Tuple[int, int], str] = {}
+
+        # col -> sürüm damgası: sütuna her yazımda artar (memo geçersizleme)
+        self.versions: Dict[int, int] = {}
+
+        # col -> [fn(row, col, eski, yeni)]: izlenen sütunlara yazımlar
+        self.watchers: Dict[int, List[Callable]] = {}
+
+    # =====================================================
+    # DEĞERLER
+    # =====================================================
+    def get(self, row: int, col: int, default: Any = None) -> Any:
+        column = self.columns.get(col)
+        if column is None:
+            return default
+        return column.get(row, default)
+
+    def set(self, row: int, col: int, value: Any):
+        if value is None:
+            self.clear(row, col)
+            return
+
+        column = self.columns.get(col)
+        if column is None:
+            column = self.columns[col] = {}
+
+        watchers = self.watchers.get(col)
+        if watchers:
+            old = column.get(row)
+            for fn in watchers:
+                fn(row, col, old, value)
+
+        if row not in column:
+            insort(self.occupied.setdefault(col, []), row)
+        column[row] = value
+        self.versions[col] = self.versions.get(col, 0) + 1
+
+    def clear(self, row: int, col: int):
+        column = self.columns.get(col)
+        if column is None:
+            return
+
+        old = column.pop(row, None)
+        self.versions[col] = self.versions.get(col, 0) + 1
+
+        if old is not None:
+            rows = self.occupied[col]
+            del rows[bisect_left(rows, row)]
+
+        watchers = self.watchers.get(col)
+        if watchers and old is not None:
+            for fn in watchers:
+                fn(row, col, old, None)
+
+    def update_column(self, col: int, values: Dict[int, Any]):
+        """
+        Toplu yazım (vektörel sonuçlar): tek sürüm artışı
+        """
+        column = self.columns.get(col)
+        if column is None:
+            column = self.columns[col] = {}
+
+        watchers = self.watchers.get(col)
+        if watchers:
+            for row, value in values.items():
+                old = column.get(row)
+                for fn in watchers:
+                    fn(row, col, old, value)
+
+        added = [row for row in values if row not in column]
+        if added:
+            rows = self.occupied.setdefault(col, [])
+            ordered = (not rows or added[0] > rows[-1]) and all(a < b for a, b in zip(added, added[1:]))
+            rows.extend(added)
+            if not ordered:
+                rows.sort()
+
+        column.update(values)
+        self.versions[col] = self.versions.get(col, 0) + 1
+
+    def clear_rows(self, col: int, rows: Iterable[int]):
+        """
+        Toplu silme (yapıştırılan boşluklar): tek sürüm artışı
+        """
+        column = self.columns.get(col)
+        if column is None:
+            return
+
+        watchers = self.watchers.get(col)
+        removed = set()
+        for row in rows:
+            old = column.pop(row, None)
+            if old is None:
+                continue
+            removed.add(row)
+            if watchers:
+                for fn in watchers:
+                    fn(row, col, old, None)
+
+        if removed:
+            self.occupied[col] = [r for r in self.occupied[col] if r not in removed]
+        self.versions[col] = self.versions.get(col, 0) + 1
+
+    def version(self, col: int) -> int:
+        return self.versions.get(col, 0)
+
+    def watch(self, col: int, fn: Callable):
+        self.watchers.setdefault(col, []).append(fn)
+
+    def unwatch(self, col: int, fn: Callable):
+        watchers = self.watchers.get(col)
+        if watchers and fn in watchers:
+            watchers.remove(fn)
+            if not watchers:
+                del self.watchers[col]
+
+    def column(self, col: int) -> Dict[int, Any]:
+        return self.columns.get(col, {})
+
+    def rows(self, col: int, first: int = 0, last: Optional[int] = None) -> List[int]:
+        """
+        Sütunun first..last (dahil) arasındaki dolu satırları, sıralı.
+        last None → sütunun sonuna kadar (A:A gibi açık uçlu aralıklar)
+        """
+        rows = self.occupied.get(col)
+        if not rows:
+            return []
+        start = bisect_left(rows, first) if first else 0
+        end = len(rows) if last is None else bisect_right(rows, last)
+        return rows[start:end]
+
+    def used_columns(self) -> List[int]:
+        """
+        En az bir dolu hücresi olan sütunlar, sıralı (1:3 gibi satır aralıkları)
+        """
+        return sorted(col for col, rows in self.occupied.items() if rows)
+
+    def used_bounds(self) -> Optional[Tuple[int, int]]:
+        """
+        Dolu bölgenin (son satır, son sütun) sınırı; boş sayfada None
+        """
+        filled = [(rows[-1], col) for col, rows in self.occupied.items() if rows]
+        if not filled:
+            return None
+        return max(row for row, _ in filled), max(col for _, col in filled)
+
+    # =====================================================
+    # DOLU BLOKLAR (Ctrl+Ok, Otomatik Toplam)
+    # =====================================================
+    def run_start(self, row: int, col: int) -> Optional[int]:
+        """
+        row'u içeren kesintisiz dolu bloğun ilk satırı; row boşsa None
+        """
+        rows = self.occupied.get(col)
+        if not rows:
+            return None
+        i = bisect_left(rows, row)
+        if i == len(rows) or rows[i] != row:
+            return None
+        return rows[_run_start(rows, i)]
+
+    def edge(self, row: int, col: int, drow: int, dcol: int, last_row: int, last_col: int) -> Tuple[int, int]:
+        """
+        Ctrl+Ok hedefi: dolu bloğun içindeyse bloğun ucu, değilse o
+        yöndeki ilk dolu hücre, o da yoksa sayfanın kenarı.
+        Dikeyde doluluk dizininde ikili arama; yatayda yalnızca dolu sütunlar.
+        """
+        if drow:
+            return _edge(self.occupied.get(col, []), row, drow, last_row), col
+        filled = [c for c in self.used_columns() if row in self.columns[c]]
+        return row, _edge(filled, col, dcol, last_col)
+
+    def cells(self) -> Iterator[Tuple[int, int, Any]]:
+        for col, column in self.columns.items():
+            for row, value in column.items():
+                yield row, col, value
+
+    # =====================================================
+    # FORMÜLLER
+    # =====================================================
+    def formula(self, row: int, col: int) -> Optional[str]:
+        return self.formulas.get((row, col))
+
+    def set_formula(self, row: int, col: int, formula: Optional[str]):
+        if formula:
+            self.formulas[(row, col)] = formula
+        else:
+            self.formulas.pop((row, col), None)
+
+    def source(self, row: int, col: int) -> str:
+        """
+        Hücrenin kullanıcıya gösterilen kaynağı: "=formül" ya da değer metni
+        """
+        formula = self.formulas.get((row, col))
+        if formula:
+            return "=" + formula
+        return display_value(self.get(row, col))
+
+    def sources(self, top: int, left: int, bottom: int, right: int) -> List[Tuple[int, int, str]]:
+        """
+        Dikdörtgendeki dolu hücrelerin kaynakları (seyrek): [(row, col, kaynak)]
+        Yalnızca doluluk dizini ve formüller gezilir.
+        """
+        formulas = self.formulas
+        out = []
+        for col in range(left, right + 1):
+            column = self.columns.get(col)
+            for row in self.rows(col, top, bottom):
+                formula = formulas.get((row, col))
+                out.append((row, col, "=" + formula if formula else display_value(column[row])))
+
+        # sonucu boş olan formüller doluluk dizininde yok
+        out += [
+            (row, col, "=" + formula) for (row, col), formula in formulas.items()
+            if top <= row <= bottom and left <= col <= right and self.get(row, col) is None
+        ]
+        return out
+
+
+def _edge(filled: List[int], pos: int, step: int, limit: int) -> int:
+    """
+    filled: sıralı dolu indeksler; pos'tan step yönünde Ctrl+Ok hedefi
+    """
+    i = bisect_left(filled, pos)
+    here = i < len(filled) and filled[i] == pos
+
+    if step > 0:
+        if here and i + 1 < len(filled) and filled[i + 1] == pos + 1:
+            return filled[_run_end(filled, i)]
+        i += here
+        return filled[i] if i < len(filled) else limit
+
+    if here and i > 0 and filled[i - 1] == pos - 1:
+        return filled[_run_start(filled, i)]
+    return filled[i - 1] if i > 0 else 0
+
+
+def _run_start(filled: List[int], i: int) -> int:
+    """
+    filled[i]'yi içeren kesintisiz bloğun ilk indeksi. Blok içinde
+    filled[j] - j sabittir ve dizi boyunca azalmaz: ikili arama yeter.
+    """
+    base = filled[i] - i
+    lo, hi = 0, i
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if filled[mid] - mid == base:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _run_end(filled: List[int], i: int) -> int:
+    base = filled[i] - i
+    lo, hi = i, len(filled) - 1
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if filled[mid] - mid == base:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def display_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if value is True:
+        return "TRUE"
+    if value is False:
+        return "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
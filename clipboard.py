@@ -0,0 +1,317 @@
+import csv
+import io
+import json
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from cell_store import display_value, parse_literal
+from styles import Style
+from utils import ReferenceTemplate, to_r1c1
+
+# kendi biçimimiz: formüller + stiller; diğer uygulamalar text/plain (TSV) görür
+MIME_TYPE = "application/x-mini-excel-cells"
+
+Bounds = Tuple[int, int, int, int]   # (top, left, bottom, right)
+
+
+class ClipBlock:
+    """
+    Kopyalanan hücre bloğu (seyrek).
+
+    rows / cols : kaynak satır ve sütunları (blok sırasıyla; çoklu
+                  seçimde aradaki boşluklar atlanır)
+    values      : [(i, j, tipli değer)] yalnızca dolu değer hücreleri
+    cells       : [(i, j, grup)] formül hücreleri; grup formulas indeksi
+    formulas    : [(i, j, formül)] aynı programı (R1C1 şeklini) paylaşan
+                  hücreler tek grup: (i, j) grubun ilk hücresi, metinler
+                  bu formülün kaydırılmasıyla üretilir
+    styles      : blok sütunu başına [(ilk i, son i, style id)]
+    palette     : style id -> Style (başka sayfanın stil tablosuna taşınır)
+    relative    : göreli referanslar hedefe göre kaydırılır mı
+                  (kopyala: evet; kes ve dış metin: hayır)
+    moved       : kes: bloğun içini gösteren referanslar bloğu izler
+    """
+    __slots__ = ("rows", "cols", "values", "cells", "formulas", "styles", "palette", "relative", "moved")
+
+    def __init__(self, rows: List[int], cols: List[int], values: List[Tuple[int, int, Any]],
+                 cells: List[Tuple[int, int, int]], formulas: List[Tuple[int, int, str]], styles: List[List[Tuple[int, int, int]]],
+                 palette: Dict[int, Style], relative: bool = True, moved: bool = False):
+        self.rows = rows
+        self.cols = cols
+        self.values = values
+        self.cells = cells
+        self.formulas = formulas
+        self.styles = styles
+        self.palette = palette
+        self.relative = relative
+        self.moved = moved
+
+    @property
+    def height(self) -> int:
+        return len(self.rows)
+
+    @property
+    def width(self) -> int:
+        return len(self.cols)
+
+    def __repr__(self):
+        return f"ClipBlock({self.height}x{self.width}, {len(self.values) + len(self.cells)} hücre, {len(self.formulas)} formül grubu)"
+
+
+# =========================
+# KOPYALAMA
+# =========================
+
+def selection_axes(ranges: List[Bounds]) -> Tuple[List[int], List[int]]:
+    """
+    Çoklu seçimin satır ve sütunları. Excel gibi: aralıklar aynı
+    satırlardaysa yan yana, aynı sütunlardaysa alt alta birleşir;
+    aksi halde ValueError.
+    """
+    if not ranges:
+        raise ValueError("Seçim yok")
+
+    top, left, bottom, right = ranges[0]
+    if all((t, b) == (top, bottom) for t, _, b, _ in ranges):
+        rows = list(range(top, bottom + 1))
+        cols = sorted({c for _, l, _, r in ranges for c in range(l, r + 1)})
+    elif all((l, r) == (left, right) for _, l, _, r in ranges):
+        rows = sorted({row for t, _, b, _ in ranges for row in range(t, b + 1)})
+        cols = list(range(left, right + 1))
+    else:
+        raise ValueError("Bu işlem çoklu seçimde yapılamaz")
+    return rows, cols
+
+
+def copy_block(engine, styles, ranges: List[Bounds], relative: bool = True, moved: bool = False) -> ClipBlock:
+    """
+    Seçimi bloğa çevirir. Yalnızca dolu hücreler (sütunların doluluk
+    dizini) gezilir; formüller programlarına göre gruplanır.
+    moved: kes (relative=False ile)
+    """
+    rows, cols = selection_axes(ranges)
+    store = engine.store
+    spans = _spans(rows)
+    offsets = {row: i for i, row in enumerate(rows)}
+
+    # formül sonucu boş olan hücreler doluluk dizininde yok
+    col_set = set(cols)
+    formula_rows: Dict[int, List[int]] = {}
+    for row, col in store.formulas:
+        if col in col_set and row in offsets:
+            formula_rows.setdefault(col, []).append(row)
+
+    values, cells, formulas, groups = [], [], [], {}
+    for j, col in enumerate(cols):
+        filled = {row for s, e in spans for row in store.rows(col, s, e)}
+        filled.update(formula_rows.get(col, ()))
+        for row in sorted(filled):
+            i = offsets[row]
+            formula = store.formula(row, col)
+            if not formula:
+                values.append((i, j, store.get(row, col)))
+                continue
+
+            program = engine.program(row, col)
+            key = program.shape if program is not None else (row, col)
+            index = groups.get(key)
+            if index is None:
+                index = groups[key] = len(formulas)
+                formulas.append((i, j, formula))
+            cells.append((i, j, index))
+
+    block_styles, palette = [], {}
+    for col in cols:
+        segments = []
+        for s, e in spans:
+            for seg_s, seg_e, style_id in styles.segments(col, s, e):
+                segments.append((offsets[seg_s], offsets[seg_e], style_id))
+                palette[style_id] = styles.table.get(style_id)
+        block_styles.append(segments)
+
+    return ClipBlock(rows, cols, values, cells, formulas, block_styles, palette, relative, moved)
+
+
+def block_text(store, block: ClipBlock) -> str:
+    """
+    Dış uygulamalar için TSV: görünen değerler, satırlar "\\n" ile
+    """
+    grid = [[""] * block.width for _ in range(block.height)]
+    for i, j, _ in block.values + block.cells:
+        grid[i][j] = display_value(store.get(block.rows[i], block.cols[j]))
+
+    out = io.StringIO()
+    csv.writer(out, delimiter="\t", lineterminator="\n").writerows(grid)
+    return out.getvalue()
+
+
+# =========================
+# SERİLEŞTİRME
+# =========================
+
+def encode(block: ClipBlock) -> bytes:
+    return json.dumps({
+        "rows": block.rows,
+        "cols": block.cols,
+        "values": block.values,
+        "cells": block.cells,
+        "formulas": block.formulas,
+        "styles": block.styles,
+        "palette": {str(style_id): asdict(style) for style_id, style in block.palette.items()},
+        "relative": block.relative,
+        "moved": block.moved,
+    }, separators=(",", ":")).encode("utf-8")
+
+
+def decode(data: bytes) -> Optional[ClipBlock]:
+    """
+    encode() çıktısı → blok; bozuksa None
+    """
+    try:
+        raw = json.loads(bytes(data).decode("utf-8"))
+        return ClipBlock(
+            raw["rows"],
+            raw["cols"],
+            [tuple(value) for value in raw["values"]],
+            [tuple(cell) for cell in raw["cells"]],
+            [tuple(formula) for formula in raw["formulas"]],
+            [[tuple(seg) for seg in segments] for segments in raw["styles"]],
+            {int(style_id): Style(**fields) for style_id, fields in raw["palette"].items()},
+            raw["relative"],
+            raw.get("moved", False),
+        )
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def from_text(text: str) -> Optional[ClipBlock]:
+    """
+    Dış uygulamadan gelen düz metin (TSV) → blok. "=" ile başlayan
+    alanlar kaydırılmadan formül olarak yazılır; stil taşınmaz.
+    """
+    if not text:
+        return None
+    grid = list(csv.reader(io.StringIO(text), delimiter="\t"))
+    if not grid:
+        return None
+
+    width = max(len(fields) for fields in grid)
+    values, cells, formulas = [], [], []
+    for i, fields in enumerate(grid):
+        for j, field in enumerate(fields):
+            if field.lstrip().startswith("="):
+                cells.append((i, j, len(formulas)))
+                formulas.append((i, j, field.strip()[1:]))
+            else:
+                value = parse_literal(field)
+                if value is not None:
+                    values.append((i, j, value))
+
+    return ClipBlock(list(range(len(grid))), list(range(width)), values, cells, formulas, [], {}, relative=False)
+
+
+# =========================
+# YAPIŞTIRMA
+# =========================
+
+def paste_origins(block: ClipBlock, targets: List[Bounds]) -> List[Tuple[int, int]]:
+    """
+    Her hedef aralık için yapıştırma başlangıçları: aralık blok
+    boyutunun katıysa blok döşenir (Excel gibi), değilse sol üst köşe.
+    """
+    origins = []
+    for top, left, bottom, right in targets:
+        height, width = bottom - top + 1, right - left + 1
+        if height % block.height == 0 and width % block.width == 0:
+            origins += [
+                (row, col)
+                for row in range(top, bottom + 1, block.height)
+                for col in range(left, right + 1, block.width)
+            ]
+        else:
+            origins.append((top, left))
+    return origins
+
+
+def paste_cells(block: ClipBlock, top: int, left: int, store):
+    """
+    Bloğun (top, left)'e yapıştırılması için motor girdileri:
+      values : [(row, col, değer)] – hedefte dolu olup blokta boş
+               hücreler None ile temizlenir
+      groups : [[(row, col, "=formül")]] – aynı şekilli kopyalar
+    Göreli referanslar her formül grubunun şablonundan kaydırılır
+    (hücre başına tarama yok). Kesilen blokta içeriyi gösteren
+    referanslar hedefe taşınır; dışarıyı gösterenler aynen kalır.
+    """
+    rows, cols = block.rows, block.cols
+    templates = [ReferenceTemplate(formula) for _, _, formula in block.formulas]
+    groups: List[List[Tuple[int, int, str]]] = [[] for _ in block.formulas]
+    if block.moved:
+        moved_rows = {row: top + i for i, row in enumerate(rows)}
+        moved_cols = {col: left + j for j, col in enumerate(cols)}
+        # grubun bir kısmı içeriyi, bir kısmı dışarıyı gösterebilir:
+        # taşınan kopyalar şekle göre yeniden gruplanır
+        shapes: Dict[str, List[Tuple[int, int, str]]] = {}
+    # sayfa dışına taşan (#REF!) kopyalar şekli paylaşmaz: tek başına derlenir
+    broken: List[List[Tuple[int, int, str]]] = []
+
+    values = [(top + i, left + j, value) for i, j, value in block.values]
+    covered = {(row, col) for row, col, _ in values}
+
+    for i, j, group in block.cells:
+        row, col = top + i, left + j
+        covered.add((row, col))
+
+        anchor_i, anchor_j, _ = block.formulas[group]
+        if block.relative:
+            drow, dcol = row - rows[anchor_i], col - cols[anchor_j]
+        else:
+            drow, dcol = rows[i] - rows[anchor_i], cols[j] - cols[anchor_j]
+        if block.moved:
+            text = "=" + templates[group].render_moved(drow, dcol, moved_rows, moved_cols)
+        else:
+            text = "=" + templates[group].render(drow, dcol)
+        if "#REF!" in text:
+            broken.append([(row, col, text)])
+        elif block.moved:
+            shapes.setdefault(to_r1c1(text[1:], row, col), []).append((row, col, text))
+        else:
+            groups[group].append((row, col, text))
+    if block.moved:
+        groups = list(shapes.values())
+
+    # hedefte dolu ama blokta boş hücreler
+    bottom, right = top + block.height - 1, left + block.width - 1
+    cleared = {
+        (row, col) for row, col in store.formulas
+        if top <= row <= bottom and left <= col <= right
+    }
+    for col in range(left, right + 1):
+        cleared.update((row, col) for row in store.rows(col, top, bottom))
+    values += [(row, col, None) for row, col in sorted(cleared - covered)]
+
+    return values, [cells for cells in groups if cells] + broken
+
+
+def paste_styles(block: ClipBlock, top: int, left: int, styles):
+    """
+    Bloğun stil run'larını hedefe yazar; id'ler hedef sayfanın stil
+    tablosuna yeniden bağlanır
+    """
+    ids = {style_id: styles.table.intern(style) for style_id, style in block.palette.items()}
+    for j, segments in enumerate(block.styles):
+        for s, e, style_id in segments:
+            styles.set_style_id(top + s, left + j, top + e, left + j, ids[style_id])
+
+
+def _spans(rows: Iterable[int]) -> List[Tuple[int, int]]:
+    """
+    Sıralı satırlar → ardışık (ilk, son) parçalar
+    """
+    spans: List[List[int]] = []
+    for row in rows:
+        if spans and row == spans[-1][1] + 1:
+            spans[-1][1] = row
+        else:
+            spans.append([row, row])
+    return [(s, e) for s, e in spans]
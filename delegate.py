@@ -0,0 +1,115 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush, QColor, QFont, QPalette, QPen
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem
+
+from cell_store import CellStore
+from number_format import compile_format
+from styles import DEFAULT_STYLE_ID, StyleIndex
+
+WORD_WRAP = Qt.TextWordWrap.value
+
+BORDER_SIDES = ("top", "bottom", "left", "right")
+
+
+class CellDelegate(QStyledItemDelegate):
+    """
+    Hücre formatını item verisi yerine StyleIndex'ten okuyarak çizer.
+    QFont/QBrush nesneleri style id başına bir kez üretilir.
+    Sayı formatı çizim anında, CellStore'daki tipli değere uygulanır.
+    """
+
+    def __init__(self, styles: StyleIndex, store: CellStore, parent=None):
+        super().__init__(parent)
+        self.styles = styles
+        self.store = store
+        self._fonts = {}
+        self._brushes = {}
+        self._borders = {}
+        self._border_pen = QPen(QColor("black"), 1)
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+
+        row, col = index.row(), index.column()
+        style_id = self.styles.style_id(row, col)
+        style = self.styles.table.get(style_id)
+
+        value = self.store.get(row, col)
+        if value is not None and not isinstance(value, str):
+            option.text = compile_format(style.number_format)(value)
+
+        if style_id == DEFAULT_STYLE_ID:
+            return
+
+        if style.font_family or style.font_size or style.bold:
+            option.font = self.font(style_id, option.font)
+
+        if style.background:
+            option.backgroundBrush = self._brush(style.background)
+
+        if style.foreground:
+            option.palette.setBrush(QPalette.Text, self._brush(style.foreground))
+
+        if style.alignment is not None:
+            if style.alignment & WORD_WRAP:
+                option.features |= QStyleOptionViewItem.WrapText
+            option.displayAlignment = Qt.AlignmentFlag(style.alignment & ~WORD_WRAP)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+
+        # Kenarlıklar: yalnızca çizilen (görünür) hücre için, stylesheet olmadan
+        sides = self.border_sides(self.styles.style_id(index.row(), index.column()))
+        if not sides:
+            return
+
+        rect = option.rect
+        painter.save()
+        painter.setPen(self._border_pen)
+        if "top" in sides:
+            painter.drawLine(rect.topLeft(), rect.topRight())
+        if "bottom" in sides:
+            painter.drawLine(rect.bottomLeft(), rect.bottomRight())
+        if "left" in sides:
+            painter.drawLine(rect.topLeft(), rect.bottomLeft())
+        if "right" in sides:
+            painter.drawLine(rect.topRight(), rect.bottomRight())
+        painter.restore()
+
+    def border_sides(self, style_id: int) -> frozenset:
+        """
+        "all" / "top|left" gibi border değerini bir kez çözer
+        """
+        sides = self._borders.get(style_id)
+        if sides is None:
+            border = self.styles.table.get(style_id).border
+            if not border:
+                sides = frozenset()
+            elif border == "all":
+                sides = frozenset(BORDER_SIDES)
+            else:
+                sides = frozenset(border.split("|"))
+            self._borders[style_id] = sides
+        return sides
+
+    # =====================================================
+    # ÖNBELLEK
+    # =====================================================
+    def font(self, style_id: int, base: QFont) -> QFont:
+        font = self._fonts.get(style_id)
+        if font is None:
+            style = self.styles.table.get(style_id)
+            font = QFont(base)
+            if style.font_family:
+                font.setFamily(style.font_family)
+            if style.font_size:
+                font.setPointSize(style.font_size)
+            font.setBold(style.bold)
+            self._fonts[style_id] = font
+        return font
+
+    def _brush(self, color: str) -> QBrush:
+        brush = self._brushes.get(color)
+        if brush is None:
+            brush = self._brushes[color] = QBrush(QColor(color))
+        return brush
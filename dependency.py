@@ -12,7 +12,7 @@ class DependencyExtractor:
 
     def _walk(self, node: ASTNode, deps: set):
         if isinstance(node, Cell):
-            deps.add(node.ref)
+            deps.add(node.ref.replace("$", ""))
 
         elif isinstance(node, Range):
             for cell in expand_range(node.start.ref, node.end.ref):
@@ -1,16 +1,46 @@
 from collections import defaultdict, deque
-from typing import Set, Dict, Iterable
+from typing import Set, Dict, Iterable, List, Tuple
 from dependency import DependencyExtractor
+from styles import StyleRuns
+from utils import cell_to_index, column_name, index_to_cell
+
+# recalc düğümü olarak formül bloğunun tamamı: ("block", blok id)
+BlockNode = Tuple[str, int]
+
+DIGITS = "0123456789"
+
+
+def is_block(node) -> bool:
+    return type(node) is tuple
 
 
 class CircularDependencyError(Exception):
     pass
 
 
+class BlockSpec:
+    """
+    Formül bloğunun okuma şekli (sütun başına, program başına bir tane):
+    relative : [(satır farkı, okunan sütun)] – satır r, r + fark'ı okur
+    absolute : blok hücrelerinin hepsinin okuduğu hücreler {"B1", ...}
+    """
+    __slots__ = ("col", "key", "relative", "absolute")
+
+    def __init__(self, col: int, key, relative: List[Tuple[int, int]], absolute: frozenset):
+        self.col = col
+        self.key = key
+        self.relative = relative
+        self.absolute = absolute
+
+
 class DependencyGraph:
     """
     Hücreler arası bağımlılık grafiği
     A1 -> {B1, C1}
+
+    Tüm sütun / satır referansları (A:C, 1:3) hücrelere genişletilmez:
+    hücre başına tek açık uçlu alan ("col" | "row", ilk, son) olarak
+    saklanır ve sütun/satır dizininden bulunur.
     """
     def __init__(self):
         # cell -> set of cells it depends on
@@ -19,21 +49,57 @@ class DependencyGraph:
         # reverse graph: cell -> cells depending on it
         self.dependents: Dict[str, Set[str]] = defaultdict(set)
 
-        # A -> {B, C}  (A değişirse B ve C etkilenir)
-        self.forward = defaultdict(set)
+        # A -> {B, C}  (A değişirse B ve C etkilenir) – dependents ile aynı sözlük
+        self.forward = self.dependents
 
-        # B -> {A}     (B, A'ya bağlı)
-        self.reverse = defaultdict(set)
+        # B -> {A}     (B, A'ya bağlı) – dependencies ile aynı sözlük
+        self.reverse = self.dependencies
 
         self.extractor = DependencyExtractor()
 
+        # cell -> [("col", c1, c2) | ("row", r1, r2), ...]
+        self.areas: Dict[str, list] = {}
+
+        # sütun / satır -> o sütunun (satırın) tamamını okuyan hücreler
+        self.column_dependents: Dict[int, Set[str]] = {}
+        self.row_dependents: Dict[int, Set[str]] = {}
+
+        # sütun -> {(ilk satır, son satır, hücre), ...}: büyük aralık okuyanlar
+        self.range_dependents: Dict[int, Set[Tuple[int, int, str]]] = {}
+
+        # isim → formül kenarları: tanımlı ismi kullanan hücreler
+        self.names: Dict[str, frozenset] = {}
+        self.name_dependents: Dict[str, Set[str]] = {}
+
+        # formül blokları (fill / yapıştırma): aynı programı paylaşan,
+        # yalnızca tekil hücre okuyan bir sütun parçası hücre başına kenar
+        # yerine tek kayıt olarak tutulur
+        #   block_runs     : col -> satır aralıkları -> blok id
+        #   block_specs    : blok id -> BlockSpec
+        #   block_readers  : okunan sütun -> {(blok id, satır farkı)}
+        #   block_absolute : "B1" -> {blok id}  (tüm blok hücreleri okur)
+        #   block_columns  : block_readers sütunlarının harfleri (successors
+        #                    hücreyi ayrıştırmadan eler)
+        self.block_runs: Dict[int, StyleRuns] = {}
+        self.block_specs: Dict[int, "BlockSpec"] = {}
+        self.block_readers: Dict[int, Set[Tuple[int, int]]] = {}
+        self.block_absolute: Dict[str, Set[int]] = {}
+        self.block_columns: Set[str] = set()
+        self._block_ids: Dict[tuple, int] = {}
+        self._next_block = 0
+
+        # son recalculation_levels çağrısında gezilen düğüm sayısı
+        self.last_visited = 0
+
     # =====================================================
     # DEPENDENCY EKLEME
     # =====================================================
-    def set_dependencies(self, cell: str, deps: Iterable[str]):
+    def set_dependencies(self, cell: str, deps: Iterable[str], areas: Iterable[tuple] = (), names: frozenset = frozenset()):
         """
         cell: "A1"
         deps: {"B1", "C1"}
+        areas: [("col", 0, 0), ...]  (A:A), [("rect", 0, 0, 99999, 0)]  (A1:A100000)
+        names: formülün kullandığı tanımlı isim anahtarları
         """
         self.remove_cell(cell)
 
@@ -41,20 +107,286 @@ class DependencyGraph:
             self.dependencies[cell].add(dep)
             self.dependents[dep].add(cell)
 
-            self.forward[dep].add(cell)
-            self.reverse[cell].add(dep)
+        if areas:
+            self.add_areas(cell, areas)
+        if names:
+            self.add_names(cell, names)
+
+    def add_names(self, cell: str, names: frozenset):
+        self.names[cell] = names
+        for key in names:
+            self.name_dependents.setdefault(key, set()).add(cell)
+
+    def add_areas(self, cell: str, areas: Iterable[tuple]):
+        areas = list(areas)
+        self.areas.setdefault(cell, []).extend(areas)
+        for area in areas:
+            if area[0] == "rect":
+                _, r1, c1, r2, c2 = area
+                for c in range(c1, c2 + 1):
+                    self.range_dependents.setdefault(c, set()).add((r1, r2, cell))
+                continue
+            kind, start, end = area
+            index = self.column_dependents if kind == "col" else self.row_dependents
+            for i in range(start, end + 1):
+                index.setdefault(i, set()).add(cell)
+
+    def set_dependencies_many(self, items: Iterable):
+        """
+        Toplu kayıt (fill): items = [(cell, deps_set), ...]
+        deps_set olduğu gibi saklanır (kopyalanmaz).
+        """
+        dependencies, dependents = self.dependencies, self.dependents
+        remove = self.remove_cell
+
+        for cell, deps in items:
+            if cell in dependencies or cell in self.areas or cell in self.names:
+                remove(cell)
+
+            dependencies[cell] = deps
+            for dep in deps:
+                dependents[dep].add(cell)
 
     def remove_cell(self, cell: str):
         """
         Hücreyi grafikten tamamen çıkar
         """
-        if cell in self.dependencies:
-            for dep in self.dependencies[cell]:
+        deps = self.dependencies.pop(cell, None)
+        if deps:
+            for dep in deps:
                 self.dependents[dep].discard(cell)
-            del self.dependencies[cell]
 
-        if cell in self.dependents:
-            del self.dependents[cell]
+        areas = self.areas.pop(cell, None)
+        if areas:
+            for area in areas:
+                if area[0] == "rect":
+                    _, r1, c1, r2, c2 = area
+                    index, entry, keys = self.range_dependents, (r1, r2, cell), range(c1, c2 + 1)
+                else:
+                    kind, start, end = area
+                    index = self.column_dependents if kind == "col" else self.row_dependents
+                    entry, keys = cell, range(start, end + 1)
+                for i in keys:
+                    readers = index.get(i)
+                    if readers is not None:
+                        readers.discard(entry)
+                        if not readers:
+                            del index[i]
+
+        names = self.names.pop(cell, None)
+        if names:
+            for key in names:
+                users = self.name_dependents.get(key)
+                if users is not None:
+                    users.discard(cell)
+                    if not users:
+                        del self.name_dependents[key]
+
+        if self.block_runs:
+            row, col = cell_to_index(cell)
+            self.remove_block_rows(col, row, row)
+
+    def successors(self, cell: str, blocks: bool = False):
+        """
+        cell değişirse doğrudan etkilenenler: dependents + cell'i
+        kapsayan tüm sütun/satır ve büyük aralık alanlarını okuyanlar
+        + onu okuyan formül bloğu hücreleri.
+        blocks=True: hücreyi mutlak okuyan bloklar hücrelere açılmaz,
+        ("block", id) düğümü olarak döner (yerel recalc)
+        """
+        dependents = self.forward.get(cell, ())
+        if not self.has_areas:
+            if not self.block_specs:
+                return dependents
+            if cell not in self.block_absolute and cell.rstrip(DIGITS) not in self.block_columns:
+                return dependents
+
+        row, col = cell_to_index(cell)
+        by_column = self.column_dependents.get(col)
+        by_row = self.row_dependents.get(row)
+        by_range = self.range_dependents.get(col)
+        by_block = self.block_readers.get(col)
+        by_absolute = self.block_absolute.get(cell) if self.block_absolute else None
+        if not by_column and not by_row and not by_range and not by_block and not by_absolute:
+            return dependents
+
+        result = set(dependents)
+        if by_column:
+            result |= by_column
+        if by_row:
+            result |= by_row
+        if by_range:
+            result.update(reader for r1, r2, reader in by_range if r1 <= row <= r2)
+        if by_block:
+            for spec_id, dr in by_block:
+                reader_col = self.block_specs[spec_id].col
+                if self.block_runs[reader_col].get(row - dr) == spec_id:
+                    result.add(index_to_cell(row - dr, reader_col))
+        if by_absolute:
+            for spec_id in by_absolute:
+                if blocks:
+                    result.add(("block", spec_id))
+                else:
+                    result.update(self.block_cells(spec_id))
+        return result
+
+    @property
+    def has_areas(self) -> bool:
+        return bool(self.column_dependents or self.row_dependents or self.range_dependents)
+
+    # =====================================================
+    # FORMÜL BLOKLARI
+    # =====================================================
+    def add_block(self, col: int, top: int, bottom: int, key, relative: List[Tuple[int, int]], absolute: frozenset) -> BlockNode:
+        """
+        col sütununun top..bottom satırları aynı şekli (key) okur; tek kayıt.
+        Kendi sütununu okuyan şekiller blok olamaz (çağıran hücre hücre
+        bağlar): blok düğümü kendi kendini okumaz, döngü yanlış raporlanmaz.
+        Satırların önceki kenarları çağıran tarafından silinmiş olmalı.
+        """
+        spec_id = self._block_ids.get((col, key))
+        if spec_id is None:
+            spec_id = self._block_ids[(col, key)] = self._next_block
+            self._next_block += 1
+            self.block_specs[spec_id] = BlockSpec(col, key, relative, absolute)
+            for dr, source in relative:
+                self.block_readers.setdefault(source, set()).add((spec_id, dr))
+                self.block_columns.add(column_name(source))
+            for ref in absolute:
+                self.block_absolute.setdefault(ref, set()).add(spec_id)
+
+        runs = self.block_runs.get(col)
+        if runs is None:
+            runs = self.block_runs[col] = StyleRuns()
+        runs.assign(top, bottom, lambda _: spec_id, lambda s, e: iter(((s, e, spec_id),)))
+        return ("block", spec_id)
+
+    def remove_block_rows(self, col: int, top: int, bottom: int):
+        runs = self.block_runs.get(col)
+        if runs is None or not runs.overlaps(top, bottom):
+            return
+        ids = {spec_id for _, _, spec_id in runs.segments(top, bottom, None) if spec_id is not None}
+        runs.replace(top, bottom, [None] * (bottom - top + 1))
+        for spec_id in ids:
+            self._release(spec_id)
+
+    def _release(self, spec_id: int):
+        """
+        Satırı kalmayan bloğun okuma kayıtları silinir
+        """
+        spec = self.block_specs[spec_id]
+        runs = self.block_runs.get(spec.col)
+        if runs is not None and spec_id in runs.ids:
+            return
+
+        del self.block_specs[spec_id]
+        del self._block_ids[(spec.col, spec.key)]
+        for dr, source in spec.relative:
+            readers = self.block_readers[source]
+            readers.discard((spec_id, dr))
+            if not readers:
+                del self.block_readers[source]
+                self.block_columns.discard(column_name(source))
+        for ref in spec.absolute:
+            readers = self.block_absolute[ref]
+            readers.discard(spec_id)
+            if not readers:
+                del self.block_absolute[ref]
+        if runs is not None and not runs:
+            del self.block_runs[spec.col]
+
+    def block_of(self, row: int, col: int):
+        runs = self.block_runs.get(col)
+        return None if runs is None else runs.get(row)
+
+    def block_spans(self, spec_id: int) -> List[Tuple[int, int]]:
+        runs = self.block_runs[self.block_specs[spec_id].col]
+        return [(s, e) for s, e, i in runs if i == spec_id]
+
+    def block_cells(self, spec_id: int) -> List[str]:
+        name = column_name(self.block_specs[spec_id].col)
+        return [f"{name}{row + 1}" for s, e in self.block_spans(spec_id) for row in range(s, e + 1)]
+
+    def node_size(self, node) -> int:
+        """
+        Düğümün hücre sayısı (blok düğümü satırları kadar)
+        """
+        if is_block(node):
+            return sum(e - s + 1 for s, e in self.block_spans(node[1]))
+        return 1
+
+    def expand(self, nodes: Iterable) -> List[str]:
+        """
+        Blok düğümlerini hücrelerine açar (sayfalar arası recalc hücre düzeyinde)
+        """
+        refs = []
+        for node in nodes:
+            if is_block(node):
+                refs += self.block_cells(node[1])
+            else:
+                refs.append(node)
+        return refs
+
+    def _following(self, node):
+        if is_block(node):
+            return self._block_successors(node[1])
+        return self.successors(node, blocks=True)
+
+    def _block_successors(self, spec_id: int) -> Set:
+        """
+        Bloğun herhangi bir hücresi değişirse etkilenenler (blok tek düğüm)
+        """
+        col = self.block_specs[spec_id].col
+        spans = self.block_spans(spec_id)
+        inside = lambda row: any(s <= row <= e for s, e in spans)
+        result = set()
+
+        # hücre kenarları ve mutlak blok okumaları: blok satırları ya da
+        # (daha azsa) kenarı olan hücreler gezilir
+        forward, absolute = self.forward, self.block_absolute
+        if len(forward) + len(absolute) < sum(e - s + 1 for s, e in spans):
+            for ref, readers in forward.items():
+                if readers:
+                    row, c = cell_to_index(ref)
+                    if c == col and inside(row):
+                        result |= readers
+            for ref, ids in absolute.items():
+                row, c = cell_to_index(ref)
+                if c == col and inside(row):
+                    result.update(("block", i) for i in ids)
+        else:
+            name = column_name(col)
+            for s, e in spans:
+                for row in range(s, e + 1):
+                    ref = f"{name}{row + 1}"
+                    readers = forward.get(ref)
+                    if readers:
+                        result |= readers
+                    ids = absolute.get(ref)
+                    if ids:
+                        result.update(("block", i) for i in ids)
+
+        # bu sütunu göreli okuyan bloklar: kapsanan satırlar (tamamıysa blok düğümü)
+        for reader_id, dr in self.block_readers.get(col, ()):
+            reader_spans = self.block_spans(reader_id)
+            covered = _intersect(reader_spans, [(s - dr, e - dr) for s, e in spans])
+            if covered == reader_spans:
+                result.add(("block", reader_id))
+                continue
+            name = column_name(self.block_specs[reader_id].col)
+            result.update(f"{name}{row + 1}" for s, e in covered for row in range(s, e + 1))
+
+        # alanlar
+        readers = self.column_dependents.get(col)
+        if readers:
+            result |= readers
+        for r1, r2, reader in self.range_dependents.get(col, ()):
+            if any(r1 <= e and s <= r2 for s, e in spans):
+                result.add(reader)
+        for row, readers in self.row_dependents.items():
+            if inside(row):
+                result |= readers
+        return result
 
     # =====================================================
     # RE-CALCULATE
@@ -69,7 +401,7 @@ class DependencyGraph:
         while queue:
             current = queue.popleft()
 
-            for dependent in self.forward.get(current, []):
+            for dependent in self.successors(current):
                 if dependent in visited:
                     continue
 
@@ -78,14 +410,101 @@ class DependencyGraph:
 
                 queue.append(dependent)
 
+    def recalculation_order(self, start_cells: Iterable[str]) -> list:
+        """
+        Değişen hücreler + tüm bağımlıları, topolojik sırada.
+        Yalnızca etkilenen alt grafik gezilir (tüm grafik değil).
+        """
+        try:
+            levels = self.recalculation_levels(start_cells)
+        except CircularDependencyError as error:
+            error.order = [cell for level in error.levels for cell in level]
+            raise
+        return [cell for level in levels for cell in level]
+
+    def recalculation_levels(self, start_cells: Iterable[str]) -> list:
+        """
+        recalculation_order'ın katmanlı hali: her katmandaki hücreler
+        birbirine bağlı değildir (birlikte/vektörel hesaplanabilir).
+        Döngü varsa CircularDependencyError (.levels, .cells) fırlatılır.
+        """
+        forward = self.forward
+        dependencies = self.dependencies
+
+        # alan (A:A) okuyan ya da formül bloğu varsa ardıllar gezinti
+        # sırasında bir kez hesaplanır ve giriş dereceleri ileri
+        # kenarlardan sayılır. Düğümler hücre ya da ("block", id)
+        successors = {} if self.has_areas or self.block_specs else None
+
+        affected = set(start_cells)
+        queue = deque(affected)
+
+        while queue:
+            current = queue.popleft()
+            if successors is None:
+                following = forward.get(current, ())
+            else:
+                following = successors[current] = self._following(current)
+            for dependent in following:
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+        self.last_visited = sum(map(self.node_size, affected)) if self.block_specs else len(affected)
+
+        indegree = {}
+        if successors is None:
+            layer = []
+            for cell in affected:
+                deps = dependencies.get(cell)
+                degree = len(deps & affected) if deps else 0
+                if degree:
+                    indegree[cell] = degree
+                else:
+                    layer.append(cell)
+        else:
+            for following in successors.values():
+                for dependent in following:
+                    indegree[dependent] = indegree.get(dependent, 0) + 1
+            layer = [cell for cell in affected if cell not in indegree]
+
+        levels = []
+        done = 0
+        while layer:
+            levels.append(layer)
+            done += len(layer)
+            following = []
+            for node in layer:
+                for dependent in (forward.get(node, ()) if successors is None else successors[node]):
+                    degree = indegree[dependent] - 1
+                    indegree[dependent] = degree
+                    if not degree:
+                        following.append(dependent)
+            layer = following
+
+        if done != len(affected):
+            error = CircularDependencyError("Circular dependency detected")
+            error.levels = levels
+            error.cells = {cell for cell, degree in indegree.items() if degree}
+            raise error
+
+        return levels
+
     # =====================================================
     # SORGULAR
     # =====================================================
     def get_dependencies(self, cell: str) -> Set[str]:
-        return self.dependencies.get(cell, set())
+        deps = self.dependencies.get(cell)
+        if deps is None and self.block_runs:
+            row, col = cell_to_index(cell)
+            spec_id = self.block_of(row, col)
+            if spec_id is not None:
+                spec = self.block_specs[spec_id]
+                deps = {index_to_cell(row + dr, source) for dr, source in spec.relative if row + dr >= 0}
+                return deps | spec.absolute
+        return deps if deps is not None else set()
 
     def get_dependents(self, cell: str) -> Set[str]:
-        return self.dependents.get(cell, set())
+        return set(self.successors(cell))
 
     # =====================================================
     # TOPOLOGICAL SORT
@@ -150,3 +569,20 @@ class DependencyGraph:
             "dependencies": dict(self.dependencies),
             "dependents": dict(self.dependents)
         }
+
+
+def _intersect(a: List[Tuple[int, int]], b: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    İki sıralı, çakışmasız aralık listesinin kesişimi
+    """
+    out = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        s, e = max(a[i][0], b[j][0]), min(a[i][1], b[j][1])
+        if s <= e:
+            out.append((s, e))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
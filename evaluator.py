@@ -1,26 +1,59 @@
+import weakref
 from typing import Any, Dict, List
 from ast_nodes import (
     ASTNode,
     Number,
+    String,
+    Boolean,
     Cell,
     Range,
+    ColumnRange,
+    RowRange,
+    RelCell,
+    RelRange,
+    SheetRef,
+    Symbol,
+    UnaryOp,
     BinaryOp,
     Function,
     Lambda,
+    Name,
+    TableRef,
 )
+from aggregates import AGGREGATE_FUNCTIONS, AggregateCache, ExactSum, exact_sum
 from utils import cell_to_index
 
 
+# yan etkisiz fonksiyonlar: aynı girdiyle aynı sonuç (memo için güvenli)
+PURE_FUNCTIONS = {"SUM", "AVERAGE", "MIN", "MAX", "COUNT", "AND", "OR", "NOT", "IF"}
+
+
 class EvaluationError(Exception):
     pass
 
 
 class Evaluator:
-    def __init__(self, table):
+    def __init__(self, store, sheets=None):
         """
-        table: QTableWidget veya cell(row, col) -> value sağlayan nesne
+        store: CellStore veya get(row, col) -> tipli değer sağlayan nesne
+        sheets: sayfa adı -> depo çözücüsü (Sheet2!A1); None → #REF!
         """
-        self.table = table
+        self.store = store
+        self.sheets = sheets
+
+        # göreli (R1C1) referansların çözüldüğü hücre
+        self.anchor = (0, 0)
+
+        # recalc kapsamlı ortak alt ifade tablosu (begin_pass/end_pass arası)
+        self.memo = None
+        self.memo_hits = 0
+        self.memo_misses = 0
+        # düğüm başına memo uygunluğu; zayıf: bırakılan programların
+        # düğümleri burada yaşamaya devam etmez
+        self._memoizable: "weakref.WeakKeyDictionary[ASTNode, bool]" = weakref.WeakKeyDictionary()
+
+        # tek aralıklı SUM/COUNT/AVERAGE/MIN/MAX: farkla güncellenen durum
+        self.aggregates = AggregateCache(store) if hasattr(store, "watch") else None
 
     # =====================================================
     # PUBLIC API
@@ -29,26 +62,73 @@ class Evaluator:
         if env is None:
             env = {}
 
-        if isinstance(node, Number):
+        if isinstance(node, (Number, String, Boolean)):
             return node.value
 
+        if isinstance(node, RelCell):
+            return self._eval_index(*self.resolve(node))
+
         if isinstance(node, Cell):
             return self._eval_cell(node.ref)
 
         if isinstance(node, Range):
-            return self._eval_range(node.start, node.end)
+            return self._eval_range(node.start.ref, node.end.ref)
+
+        if isinstance(node, RelRange):
+            r1, c1 = self.resolve(node.start)
+            r2, c2 = self.resolve(node.end)
+            return self._range_values(r1, c1, r2, c2)
+
+        if isinstance(node, (ColumnRange, RowRange)):
+            return self._area_values(node, self.store)
+
+        if isinstance(node, SheetRef):
+            return self._eval_sheet_ref(node)
 
         if isinstance(node, BinaryOp):
             return self._eval_binary(node, env)
 
+        if isinstance(node, UnaryOp):
+            return self._eval_unary(node, env)
+
         if isinstance(node, Function):
             return self._eval_function(node, env)
 
         if isinstance(node, Lambda):
             return self._eval_lambda(node, env)
 
+        if isinstance(node, Symbol):
+            if node.name not in env:
+                raise EvaluationError(f"Tanımsız isim: {node.name}")
+            value = env[node.name]
+            if isinstance(value, Exception):
+                raise value
+            return value
+
+        if isinstance(node, Name):
+            # derlemede çözülemeyen (tanımsız / döngüsel) isim
+            raise EvaluationError("#NAME?")
+
+        if isinstance(node, TableRef):
+            # tablo ya da sütun yok
+            raise EvaluationError("#REF!")
+
         raise EvaluationError(f"Bilinmeyen AST node: {node}")
 
+    def eval_at(self, node: ASTNode, row: int, col: int) -> Any:
+        """
+        Paylaşılan (göreli) programı (row, col) hücresi için değerlendirir
+        """
+        self.anchor = (row, col)
+        return self.eval(node)
+
+    def resolve(self, ref: RelCell):
+        row = ref.row if ref.row_abs else self.anchor[0] + ref.row
+        col = ref.col if ref.col_abs else self.anchor[1] + ref.col
+        if row < 0 or col < 0:
+            raise EvaluationError("#REF!")
+        return row, col
+
     # =====================================================
     # CELL / RANGE
     # =====================================================
@@ -57,18 +137,15 @@ class Evaluator:
         if not idx:
             return 0
 
-        row, col = idx
-        item = self.table.item(row, col)
+        return self._eval_index(*idx)
 
-        if not item or not item.text().strip():
-            return 0
+    def _eval_index(self, row: int, col: int) -> Any:
+        value = self.store.get(row, col)
 
-        text = item.text().strip()
+        if value is None:
+            return 0
 
-        try:
-            return float(text)
-        except ValueError:
-            return text
+        return value
 
     def _eval_range(self, start: str, end: str) -> List[Any]:
         s = cell_to_index(start)
@@ -76,19 +153,66 @@ class Evaluator:
         if not s or not e:
             return []
 
-        r1, c1 = s
-        r2, c2 = e
+        return self._range_values(*s, *e)
+
+    def _range_bounds(self, node):
+        if isinstance(node, RelRange):
+            r1, c1 = self.resolve(node.start)
+            r2, c2 = self.resolve(node.end)
+        else:
+            (r1, c1), (r2, c2) = cell_to_index(node.start.ref), cell_to_index(node.end.ref)
+        if min(r1, r2, c1, c2) < 0:
+            raise EvaluationError("#REF!")
+        return min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+    def _eval_sheet_ref(self, node: SheetRef) -> Any:
+        if self.sheets is None:
+            raise EvaluationError("#REF!")
+        store = self.sheets(node.sheet)
+
+        ref = node.ref
+        if isinstance(ref, (Range, RelRange)):
+            return self._range_values(*self._range_bounds(ref), store=store)
+        if isinstance(ref, (ColumnRange, RowRange)):
+            return self._area_values(ref, store)
+
+        row, col = self.resolve(ref) if isinstance(ref, RelCell) else cell_to_index(ref.ref)
+        value = store.get(row, col)
+        return 0 if value is None else value
+
+    def _area_values(self, node, store) -> List[Any]:
+        """
+        A:C / 1:3 – doluluk dizininden yalnızca dolu hücreler gezilir
+        """
+        if isinstance(node, ColumnRange):
+            cols, first, last = range(node.start, node.end + 1), 0, None
+        else:
+            cols, first, last = store.used_columns(), node.start, node.end
 
         values = []
-        for r in range(min(r1, r2), max(r1, r2) + 1):
-            for c in range(min(c1, c2), max(c1, c2) + 1):
-                item = self.table.item(r, c)
-                if not item:
-                    continue
-                try:
-                    values.append(float(item.text()))
-                except:
-                    pass
+        for c in cols:
+            column = store.column(c)
+            for r in store.rows(c, first, last):
+                value = column[r]
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values.append(value)
+        return values
+
+    def _range_values(self, r1: int, c1: int, r2: int, c2: int, store=None) -> List[Any]:
+        if store is None:
+            store = self.store
+
+        # doluluk dizini: seyrek aralıkta yalnızca dolu hücreler gezilir
+        values = []
+        first, last = min(r1, r2), max(r1, r2)
+        for c in range(min(c1, c2), max(c1, c2) + 1):
+            column = store.column(c)
+            if not column:
+                continue
+            for r in store.rows(c, first, last):
+                value = column[r]
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    values.append(value)
 
         return values
 
@@ -126,18 +250,57 @@ class Evaluator:
 
         raise EvaluationError(f"Bilinmeyen operator: {node.op}")
     
+    def _eval_unary(self, node: UnaryOp, env: Dict[str, Any]):
+        value = self.eval(node.operand, env)
+
+        match node.op:
+            case "-":
+                return -value
+            case "+":
+                return +value
+            case "NOT":
+                return not bool(value)
+
+        raise EvaluationError(f"Bilinmeyen operator: {node.op}")
+
     def _flatten(self, args):
+        flat = []
         for x in args:
             if isinstance(x, list):
-                yield from x
+                flat.extend(x)
             else:
-                yield x
+                flat.append(x)
+        return flat
 
     # =====================================================
     # FUNCTIONS
     # =====================================================
     def _eval_function(self, node: Function, env: Dict[str, Any]):
+        if self.memo is None or not self._is_memoizable(node):
+            return self._call_function(node, env)
+
+        key = self._memo_key(node)
+        entry = self.memo.get(key)
+        if entry is not None:
+            self.memo_hits += 1
+            return entry
+
+        self.memo_misses += 1
+        value = self._call_function(node, env)
+        self.memo[key] = value
+        return value
+
+    def _call_function(self, node: Function, env: Dict[str, Any]):
         name = node.name.upper()
+
+        if (
+            self.aggregates is not None
+            and name in AGGREGATE_FUNCTIONS
+            and len(node.args) == 1
+            and isinstance(node.args[0], (Range, RelRange))
+        ):
+            return self.aggregates.result(name, self._range_bounds(node.args[0]))
+
         args = [self.eval(arg, env) for arg in node.args]
 
         # -------- LOGIC --------
@@ -155,12 +318,13 @@ class Evaluator:
             return not bool(args[0])
 
         # -------- AGGREGATES --------
+        # toplamlar önbellekli aralık durumuyla aynı (tam) toplanır
         if name == "SUM":
-            return sum(self._flatten(args))
+            return exact_sum(self._flatten(args))
 
         if name == "AVERAGE":
             flat = self._flatten(args)
-            return sum(flat) / len(flat) if flat else 0
+            return ExactSum(flat).mean(len(flat)) if flat else 0
 
         if name == "MIN":
             flat = self._flatten(args)
@@ -176,10 +340,89 @@ class Evaluator:
 
         raise EvaluationError(f"Bilinmeyen fonksiyon: {name}")
 
+    # =====================================================
+    # MEMO (ortak alt ifadeler)
+    # =====================================================
+    def begin_pass(self):
+        self.memo = {}
+
+    def end_pass(self):
+        self.memo = None
+
+    def memo_stats(self) -> Dict[str, Any]:
+        total = self.memo_hits + self.memo_misses
+        return {
+            "hits": self.memo_hits,
+            "misses": self.memo_misses,
+            "hit_rate": self.memo_hits / total if total else 0.0,
+        }
+
+    def _is_memoizable(self, node: Function) -> bool:
+        """
+        Yalnızca aralık tarayan saf fonksiyonlar (SUM(B2:B5000) gibi);
+        argümanlar yaprak olmalı ki anahtar mutlak koordinatlardan kurulsun.
+        """
+        memoizable = self._memoizable.get(node)
+        if memoizable is None:
+            memoizable = (
+                node.name.upper() in PURE_FUNCTIONS
+                and any(isinstance(a, (Range, RelRange, ColumnRange, RowRange)) for a in node.args)
+                and all(
+                    isinstance(a, (Number, Cell, Range, RelCell, RelRange, ColumnRange, RowRange))
+                    for a in node.args
+                )
+            )
+            self._memoizable[node] = memoizable
+        return memoizable
+
+    def _memo_key(self, node: Function):
+        """
+        (fonksiyon, mutlak argümanlar, girdi sütunlarının sürümleri):
+        farklı hücrelerdeki göreli ağaçlar aynı aralığa çözülürse eşleşir;
+        girdi yazılırsa sürüm değişir ve eski kayıt kullanılmaz.
+        A:C kapsadığı sütunların, 1:3 tüm dolu sütunların sürümleriyle anılır.
+        """
+        version = self.store.version
+        key = [node.name]
+        for arg in node.args:
+            if isinstance(arg, Number):
+                key.append(arg.value)
+                continue
+
+            if isinstance(arg, ColumnRange):
+                columns = range(arg.start, arg.end + 1)
+                key.append(("cols", arg.start, arg.end, tuple(map(version, columns))))
+                continue
+            if isinstance(arg, RowRange):
+                # tüm dolu sütunlar: yeni dolan sütun da anahtarı değiştirir
+                columns = self.store.used_columns()
+                key.append(("rows", arg.start, arg.end, tuple((c, version(c)) for c in columns)))
+                continue
+
+            if isinstance(arg, (Range, RelRange)):
+                r1, c1, r2, c2 = self._range_bounds(arg)
+            elif isinstance(arg, RelCell):
+                r1, c1 = r2, c2 = self.resolve(arg)
+            else:
+                r1, c1 = r2, c2 = cell_to_index(arg.ref)
+
+            key.append((r1, c1, r2, c2, tuple(version(c) for c in range(min(c1, c2), max(c1, c2) + 1))))
+        return tuple(key)
+
     # =====================================================
     # LAMBDA
     # =====================================================
     def _eval_lambda(self, node: Lambda, env: Dict[str, Any]):
+        # parametreden bağımsız (hoist edilmiş) ifadeler bir kez hesaplanır
+        if node.bindings:
+            env = env.copy()
+            for name, expr in node.bindings:
+                try:
+                    env[name] = self.eval(expr, env)
+                except Exception as error:
+                    # hata yalnızca ifade kullanılırsa yükselir (hoist öncesi gibi)
+                    env[name] = error
+
         def fn(*values):
             if len(values) != len(node.params):
                 raise EvaluationError("LAMBDA argüman sayısı uyuşmuyor")
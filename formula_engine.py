@@ -1,106 +1,772 @@
-from PySide6.QtCore import Qt
-from utils import index_to_cell
+import gc
+import time
+from contextlib import nullcontext
+
+from utils import ReferenceTemplate, cell_to_index, column_name, index_to_cell
+from bulk_parse import PARALLEL_THRESHOLD
 from parser import Parser
 from ast_nodes import *
-from dependency_graph import DependencyGraph
+from cell_store import CellStore, display_value, parse_literal
+from dependency_graph import DependencyGraph, CircularDependencyError, is_block
 from dependency import DependencyExtractor
 from evaluator import Evaluator
+from programs import ProgramTable
+from styles import StyleRuns
+from instrumentation import Instrumentation
+from names import NameManager, rename_in_formula
 
 RANGE_FUNCTIONS = ("SUM", "AVERAGE", "MIN", "MAX", "COUNT")
+
+# bir sütunda en az bu kadar ardışık aynı programlı hücre (fill / yapıştırma)
+# grafiğe hücre başına kenar yerine tek formül bloğu olarak yazılır
+BLOCK_ROWS = 64
 LOGIC_FUNCTIONS = ("AND", "OR", "XOR")
 
 class FormulaEngine:
-    def __init__(self, table):
+    def __init__(self, table=None, workbook=None, sheet=None):
+        """
+        table: sonuçların yazılacağı QTableWidget (None → başsız/headless)
+        workbook / sheet: çalışma kitabı ve bu sayfanın anahtarı
+        (Sheet2!A1 referansları ve sayfalar arası recalc için)
+        """
         self.table = table
+        self.workbook = workbook
+        self.sheet = sheet
+        self.store = CellStore()
         self.parser = Parser()
-        self.evaluator = Evaluator(table)
+        self.evaluator = Evaluator(self.store, workbook.store if workbook is not None else None)
         self.extractor = DependencyExtractor()
         self.graph = DependencyGraph()
 
+        # tanımlı isimler çalışma kitabı düzeyindedir; kitapsız motorun kendi yöneticisi var
+        self.names = workbook.defined_names if workbook is not None else NameManager(lambda: (self,))
+
+        # aynı şekilli (R1C1) formüller tek Program'ı paylaşır;
+        # her sütunda ardışık aynı programlı hücreler tek run (formül grubu)
+        self.programs = ProgramTable(self.parser, self.names, sheet)
+        self.groups = {}   # col -> StyleRuns (id = program id)
+
+        # değeri değişen hücreleri toplu olarak dinleyenler: fn([(row, col), ...])
+        self.listeners = []
+        self._changed = []
+
+        # son recalc'in özeti (enstrümantasyon): hücre/katman sayısı, memo isabetleri
+        self.last_recalc = {}
+
+        # isteğe bağlı ayrıntılı ölçüm (enable_instrumentation); None → kapalı
+        self.instrumentation = None
+
     # =====================================================
     # ENTRY POINT
     # =====================================================
     def process_item(self, item):
-        text = item.text().strip()
-        row, col = item.row(), item.column()
-        cell_ref = index_to_cell(row, col)
+        self.process_items([item])
+
+    def process_items(self, items):
+        self.set_cells([(item.row(), item.column(), item.text()) for item in items])
+
+    def set_cell(self, row: int, col: int, text: str):
+        self.set_cells([(row, col, text)])
+
+    def set_cells(self, entries):
+        """
+        Birden fazla hücreyi tek seferde işler:
+        önce tüm formüller/bağımlılıklar güncellenir,
+        sonra etkilenen hücreler tek bir toplu recalc ile hesaplanır.
+        entries: [(row, col, text), ...]
+        """
+        with self._edit("set_cells", len(entries)):
+            # yükleme boyutunda girişte yeni şekiller toplu (paralel) parse edilir
+            formulas = [(text.strip()[1:], row, col) for row, col, text in entries if text.lstrip().startswith("=")]
+            if len(formulas) >= PARALLEL_THRESHOLD:
+                with self._span("precompile", "parse", formulas=len(formulas)):
+                    self.programs.precompile(formulas)
+
+            changed = [self._update_cell(row, col, text) for row, col, text in entries]
+            self._recalculate(changed)
+
+            # tablonun altına yazılan değerler tabloyu büyütür (yalnızca ona başvuranlar yeniden bağlanır)
+            if self.names.tables.on_sheet(self.sheet):
+                values = [(row, col) for row, col, text in entries if not text.lstrip().startswith("=")]
+                self.names.on_write(self.sheet, self.store, values)
+        self._notify()
+
+    def fill(self, top: int, left: int, bottom: int, right: int, direction: str = "down"):
+        """
+        Seçimin ilk satırını (down) ya da ilk sütununu (right) bloğun
+        geri kalanına kopyalar. Göreli referanslar kaydırılır; kopyalar
+        kaynak programı paylaşır, bağımlılıklar toplu kaydedilir ve
+        tek bir recalc yapılır. Dönüş: doldurulan (row, col) listesi.
+        """
+        # toplu blok yüz binlerce döngüsüz küme/dize üretir:
+        # döngüsel GC'yi bu süre boyunca beklet
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with self._edit("fill", (bottom - top + 1) * (right - left + 1)):
+                filled, nodes = [], []
+                if direction == "down":
+                    for col in range(left, right + 1):
+                        cells, starts = self._fill_line(top, col, top + 1, bottom, col, col)
+                        filled += cells
+                        nodes += starts
+                else:
+                    for row in range(top, bottom + 1):
+                        cells, starts = self._fill_line(row, left, row, row, left + 1, right)
+                        filled += cells
+                        nodes += starts
+
+                self._recalculate(nodes)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        self._notify()
+        return filled
+
+    def paste(self, values, groups=()):
+        """
+        Pano bloğunu tek seferde yazar (set_cells'in toplu hızlı yolu):
+        değerler sütun sütun depoya akıtılır; aynı R1C1 şekilli formül
+        kopyaları tek derlenen programı paylaşır; tek bir recalc.
+        values : [(row, col, tipli değer), ...]  (None → hücre boşalır)
+        groups : [[(row, col, "=formül"), ...], ...] – her liste aynı şekilli
+        Dönüş: yazılan (row, col) listesi
+        """
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            with self._edit("paste", len(values) + sum(len(cells) for cells in groups)):
+                pasted = self._paste_values(values)
+                formulas, nodes = [], []
+                for cells in groups:
+                    written, starts = self._paste_group(cells)
+                    formulas += written
+                    nodes += starts
+                self._recalculate(self._read_cells(pasted, nodes) + nodes)
+
+                if values and self.names.tables.on_sheet(self.sheet):
+                    self.names.on_write(self.sheet, self.store, [(row, col) for row, col, _ in values])
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+        self._notify()
+        return pasted + formulas
+
+    def _read_cells(self, cells, nodes=()):
+        """
+        Değer hücrelerinden yalnızca okunanlar recalc'e girer: okuyanı
+        olmayan yüz binlerce değer gezintiye ve katmanlara katılmaz.
+        Yalnızca zaten tümüyle hesaplanacak bloklarca (nodes) okunan
+        değerler de girmez: okuyan hücreler blok geçişinde hesaplanır.
+        Başka sayfaca okunan sayfada kenarlar çalışma kitabında: hepsi girer.
+        """
+        refs = [index_to_cell(r, c) for r, c in cells]
+        if self.workbook is not None and self.workbook.crosses(self.sheet):
+            return refs
+        graph = self.graph
+        whole = {node for node in nodes if is_block(node)}
+        if not whole:
+            return [ref for ref in refs if graph.successors(ref)]
+
+        def covered(reader):
+            if is_block(reader):
+                return reader in whole
+            return ("block", graph.block_of(*cell_to_index(reader))) in whole
+
+        return [ref for ref in refs if not all(map(covered, graph.successors(ref, blocks=True)))]
+
+    def _paste_values(self, values):
+        store, graph = self.store, self.graph
+        links = self.workbook.links if self.workbook is not None else None
+        columns = {}
+        for row, col, value in values:
+            columns.setdefault(col, {})[row] = value
+
+        # grafik kenarları ve sayfalar arası bağlar yalnızca formül hücrelerinde
+        formulas = store.formulas
+        written = []
+        for col, cells in columns.items():
+            rows = sorted(cells)
+            for row in rows:
+                if (row, col) not in formulas:
+                    continue
+                ref = index_to_cell(row, col)
+                store.set_formula(row, col, None)
+                graph.remove_cell(ref)
+                if links is not None:
+                    links.remove(self.sheet, ref)
+            store.update_column(col, {row: cells[row] for row in rows if cells[row] is not None})
+            store.clear_rows(col, [row for row in rows if cells[row] is None])
+            self._set_program_rows(col, rows, None)
+            written += [(row, col) for row in rows]
+
+        self._changed.extend(written)
+        return written
+
+    def _paste_group(self, cells):
+        store = self.store
+        for row, col, text in cells:
+            store.set_formula(row, col, text.strip()[1:])
+
+        row, col, text = cells[0]
+        try:
+            program_id = self._compile(text.strip()[1:], row, col)
+        except Exception:
+            program_id = None
+
+        columns = {}
+        for row, col, _ in cells:
+            columns.setdefault(col, []).append(row)
+
+        program = None if program_id is None else self.programs.get(program_id)
+        written, nodes = [], []
+        for col, rows in columns.items():
+            rows.sort()
+            targets = [(row, col) for row in rows]
+            self._set_program_rows(col, rows, program_id)
+            if program is None:
+                for row in rows:
+                    self.graph.remove_cell(index_to_cell(row, col))
+                    self._link(index_to_cell(row, col), ())
+                nodes += [index_to_cell(row, col) for row in rows]
+            else:
+                nodes += self._bind_block(program, targets)
+            written += targets
+        return written, nodes
+
+    def _fill_line(self, src_row, src_col, top, bottom, left, right):
+        """
+        Dönüş: (doldurulan hücreler, recalc başlangıç düğümleri)
+        """
+        targets = [(r, c) for r in range(top, bottom + 1) for c in range(left, right + 1)]
+        if not targets:
+            return [], []
+
+        store = self.store
+        formula = store.formula(src_row, src_col)
+
+        # ---------------------------
+        # DEĞER
+        # ---------------------------
+        if not formula:
+            value = store.get(src_row, src_col)
+            for r, c in targets:
+                store.set_formula(r, c, None)
+                store.set(r, c, value)
+                self.graph.remove_cell(index_to_cell(r, c))
+                self._link(index_to_cell(r, c), ())
+            self._changed.extend(targets)
+            self._set_program_block(top, left, bottom, right, None)
+            return targets, [index_to_cell(r, c) for r, c in targets]
+
+        # ---------------------------
+        # FORMÜL: kaynak bir kez taranır, kopyalar şablondan
+        # ---------------------------
+        template = ReferenceTemplate(formula)
+        for r, c in targets:
+            store.set_formula(r, c, template.render(r - src_row, c - src_col))
+
+        program = self.program(src_row, src_col)
+        if program is None:
+            for r, c in targets:
+                self.graph.remove_cell(index_to_cell(r, c))
+                self._link(index_to_cell(r, c), ())
+            self._set_program_block(top, left, bottom, right, None)
+            return targets, [index_to_cell(r, c) for r, c in targets]
+
+        self._set_program_block(top, left, bottom, right, self.groups[src_col].get(src_row))
+        return targets, self._bind_block(program, targets)
+
+    def _bind_block(self, program, targets):
+        """
+        Aynı programı paylaşan hücrelerin bağımlılıklarını toplu kaydeder.
+        Bir sütunda yeterince uzun ardışık parçalar tek formül bloğu olur
+        (hücre başına kenar yok). Dönüş: recalc başlangıç düğümleri
+        """
+        nodes = []
+        if len(targets) >= BLOCK_ROWS:
+            rest = []
+            for col, top, bottom in _column_spans(targets):
+                reads = program.block_reads(col, top) if bottom - top + 1 >= BLOCK_ROWS else None
+                if reads is None:
+                    rest += [(row, col) for row in range(top, bottom + 1)]
+                    continue
+                self._unbind_rows(col, top, bottom)
+                nodes.append(self.graph.add_block(col, top, bottom, program.shape, *reads))
+            targets = rest
+            if not targets:
+                return nodes
+
+        if self.graph.block_runs:
+            for col, top, bottom in _column_spans(targets):
+                self.graph.remove_block_rows(col, top, bottom)
+
+        refs = [index_to_cell(r, c) for r, c in targets]
+        block = program.dependency_block(targets)
+        areas = {}
+        for ref, (r, c), deps in zip(refs, targets, block):
+            external = program.external_dependencies(r, c) if program.external else ()
+            local, local_areas = self._link(ref, external, program.external_areas)
+            deps |= local
+            if program.ranges:
+                local_areas = program.range_areas(r, c) + local_areas
+            if program.areas or local_areas:
+                areas[ref] = program.areas + local_areas
+        self.graph.set_dependencies_many(zip(refs, block))
+        for ref, cell_areas in areas.items():
+            self.graph.add_areas(ref, cell_areas)
+        if program.names:
+            for ref in refs:
+                self.graph.add_names(ref, program.names)
+        return nodes + refs
+
+    def _unbind_rows(self, col, top, bottom):
+        """
+        Blok olacak satırların önceki hücre kenarlarını ve sayfalar arası
+        bağlarını siler. Satırlar ya da (daha azsa) kayıtlar gezilir.
+        """
+        graph = self.graph
+        graph.remove_block_rows(col, top, bottom)
+
+        name = column_name(col)
+        for index in (graph.dependencies, graph.areas, graph.names):
+            for ref in _refs_in(index, name, col, top, bottom):
+                graph.remove_cell(ref)
+
+        if self.workbook is not None:
+            links = self.workbook.links
+            for index in (links.precedents, links.area_precedents):
+                if len(index) < bottom - top + 1:
+                    refs = [ref for sheet, ref in index if sheet == self.sheet]
+                    refs = _refs_in(dict.fromkeys(refs), name, col, top, bottom)
+                else:
+                    refs = [f"{name}{row + 1}" for row in range(top, bottom + 1) if (self.sheet, f"{name}{row + 1}") in index]
+                for ref in refs:
+                    links.remove(self.sheet, ref)
+
+    # =====================================================
+    # ENSTRÜMANTASYON
+    # =====================================================
+    def enable_instrumentation(self, **options) -> Instrumentation:
+        """
+        Hücre başına süre, düzenleme başına parse/kirli küme/grafik
+        gezintisi ve trace olaylarını toplamaya başlar
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(self.evaluator.aggregates, **options)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        self.instrumentation = None
+
+    def _edit(self, label: str, cells: int):
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.edit(label, cells)
+
+    def _span(self, name: str, category: str, **args):
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.span(name, category, **args)
+
+    def _compile(self, formula: str, row: int, col: int):
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self.programs.compile(formula, row, col)
+
+        start = time.perf_counter()
+        try:
+            return self.programs.compile(formula, row, col)
+        finally:
+            instrumentation.record_parse(start, time.perf_counter())
+
+    # =====================================================
+    # DİNLEYİCİLER
+    # =====================================================
+    def add_listener(self, fn):
+        self.listeners.append(fn)
 
+    def _notify(self):
+        if self.programs.sweep_due():
+            self._release_programs()
+
+        changed, self._changed = self._changed, []
+        if not changed:
+            return
+        for fn in self.listeners:
+            fn(changed)
+
+    def _release_programs(self):
+        """
+        Düzenleme sonunda: hiçbir formül grubunun kullanmadığı Program'lar
+        (ve yalnızca onların tuttuğu AST düğümleri) bırakılır
+        """
+        live = set()
+        for runs in self.groups.values():
+            live.update(runs.ids)
+        self.programs.release(live)
+
+    # =====================================================
+    # SORGULAR
+    # =====================================================
+    def value(self, row: int, col: int):
+        return self.store.get(row, col)
+
+    def formula(self, row: int, col: int):
+        return self.store.formula(row, col)
+
+    def recalculate(self, cell_refs):
+        """
+        Verilen hücreleri ve bağımlılarını yeniden hesaplar
+        (ör. okudukları sayfa sonradan eklendiğinde)
+        """
+        self._recalculate(list(cell_refs))
+        self._notify()
+
+    def program(self, row: int, col: int):
+        runs = self.groups.get(col)
+        if runs is None:
+            return None
+        program_id = runs.get(row)
+        return None if program_id is None else self.programs.get(program_id)
+
+    def formula_groups(self, col: int):
+        """
+        Sütundaki formül grupları: [(ilk satır, son satır, R1C1 şekli), ...]
+        """
+        runs = self.groups.get(col)
+        if runs is None:
+            return []
+        return [(s, e, self.programs.get(pid).shape) for s, e, pid in runs]
+
+    # =====================================================
+    # HÜCRE GÜNCELLEME
+    # =====================================================
+    def _update_cell(self, row: int, col: int, text: str):
+        text = text.strip()
+        cell_ref = index_to_cell(row, col)
 
         if not text.startswith("="):
-            item.setData(Qt.UserRole, None)
+            self.store.set_formula(row, col, None)
+            self.store.set(row, col, parse_literal(text))
+            self._changed.append((row, col))
+            self._set_program(row, col, None)
             self.graph.remove_cell(cell_ref)
-            self._recalculate_dependents(cell_ref)
-            return
+            self._link(cell_ref, ())
+            return cell_ref
 
         # ---------------------------
         # FORMÜL
         # ---------------------------
         formula = text[1:]
-        item.setData(Qt.UserRole, formula)
+        self.store.set_formula(row, col, formula)
 
         try:
-            ast = self.parser.parse(formula)
+            program_id = self._compile(formula, row, col)
         except Exception:
-            self._set_item_value(item, "#PARSE!")
-            return
+            self._set_program(row, col, None)
+            self.graph.remove_cell(cell_ref)
+            self._link(cell_ref, ())
+            return cell_ref
 
-        # Dependency çıkar
-        deps = self.extractor.extract(ast)
-        self.graph.set_dependencies((row, col), deps)
+        self._set_program(row, col, program_id)
 
-        # Evaluate
-        try:
-            value = self.evaluator.eval(ast)
-        except Exception:
-            value = "#ERROR"
+        # Dependency: paylaşılan programın referansları bu hücreye göre çözülür
+        program = self.programs.get(program_id)
+        deps = program.dependencies(row, col)
+        external = program.external_dependencies(row, col) if program.external else ()
+        local, local_areas = self._link(cell_ref, external, program.external_areas)
+        areas = program.areas + program.range_areas(row, col) + local_areas
+        self.graph.set_dependencies(cell_ref, deps | local, areas, program.names)
+
+        return cell_ref
+
+    def _link(self, cell_ref: str, external=(), external_areas=()):
+        """
+        Başka sayfa referanslarını (hücre ve A:A alanları) çalışma
+        kitabına kenar olarak yazar. Kendi sayfasını adıyla gösterenler
+        (Sheet1!A1, Sheet1'de) sayfa içi bağımlılıktır.
+        Dönüş: (grafiğe eklenecek A1 kümesi, alanlar)
+        """
+        if self.workbook is None:
+            return set(), []
+
+        local, local_areas = set(), []
+        links, link_areas = [], []
+        for name, ref in external:
+            if name.casefold() == self.sheet:
+                local.add(ref)
+            else:
+                links.append((name, ref))
+        for name, area in external_areas:
+            if name.casefold() == self.sheet:
+                local_areas.append(area)
+            else:
+                link_areas.append((name, area))
+        self.workbook.links.set(self.sheet, cell_ref, links, link_areas)
+        return local, local_areas
+
+    def _set_program(self, row: int, col: int, program_id):
+        runs = self.groups.get(col)
+        if runs is None:
+            if program_id is None:
+                return
+            runs = self.groups[col] = StyleRuns()
+        runs.replace(row, row, [program_id])
 
-        # UI güncelle
-        self._set_item_value(item, value)
+    def _set_program_block(self, top, left, bottom, right, program_id):
+        for col in range(left, right + 1):
+            runs = self.groups.get(col)
+            if runs is None:
+                if program_id is None:
+                    continue
+                runs = self.groups[col] = StyleRuns()
+            if program_id is None:
+                runs.replace(top, bottom, [None] * (bottom - top + 1))
+            else:
+                runs.assign(top, bottom, lambda _: program_id, lambda s, e: iter(((s, e, program_id),)))
+
+    def _set_program_rows(self, col, rows, program_id):
+        """
+        Sıralı satırları ardışık parçalar halinde tek programa bağlar
+        """
+        start = prev = None
+        for row in rows:
+            if start is not None and row == prev + 1:
+                prev = row
+                continue
+            if start is not None:
+                self._set_program_block(start, col, prev, col, program_id)
+            start = prev = row
+        if start is not None:
+            self._set_program_block(start, col, prev, col, program_id)
 
-        # Bağımlıları güncelle
-        self._recalculate_dependents(cell_ref)
-    
     # =====================================================
-    # DIŞTAN YENİDEN HESAPLAMA
+    # TOPLU YENİDEN HESAPLAMA
     # =====================================================
+    def _recalculate(self, cell_refs):
+        evaluator = self.evaluator
+        instrumentation = self.instrumentation
+        hits, misses = evaluator.memo_hits, evaluator.memo_misses
+
+        if self.workbook is not None and self.workbook.crosses(self.sheet):
+            # sayfa başka sayfalarca okunuyor: kirli küme sayfalar arası
+            # (hücre düzeyinde) sıralanır
+            self.last_recalc = self.workbook.recalculate(self.sheet, self.graph.expand(cell_refs))
+            visited = self.last_recalc["cells"]
+        else:
+            try:
+                levels = self.graph.recalculation_levels(cell_refs)
+                cyclic = ()
+            except CircularDependencyError as e:
+                levels, cyclic = e.levels, e.cells
+
+            # aynı katmandaki hücreler birbirine bağlı değil: birlikte hesaplanabilir
+            evaluator.begin_pass()
+            try:
+                for index, level in enumerate(levels):
+                    if instrumentation is None:
+                        self._recalculate_level(level)
+                    else:
+                        with instrumentation.span(f"level {index}", "recalc", cells=len(level)):
+                            self._recalculate_level(level)
+            finally:
+                evaluator.end_pass()
+
+            self._mark_cycles(cyclic)
+            self.last_recalc = {
+                "cells": sum(map(self.graph.node_size, (node for level in levels for node in level))),
+                "levels": len(levels),
+            }
+            visited = self.graph.last_visited
+
+        pass_hits = evaluator.memo_hits - hits
+        pass_lookups = pass_hits + evaluator.memo_misses - misses
+        self.last_recalc.update({
+            "memo_hits": pass_hits,
+            "memo_lookups": pass_lookups,
+            "memo_hit_rate": pass_hits / pass_lookups if pass_lookups else 0.0,
+        })
+        if instrumentation is not None:
+            instrumentation.record_recalc(self.last_recalc, visited)
+
+    def _mark_cycles(self, cell_refs):
+        for ref in self.graph.expand(cell_refs):
+            r, c = cell_to_index(ref)
+            if self.store.formula(r, c):
+                self._set_value(r, c, "#CYCLE!")
+
+    def _recalculate_level(self, refs):
+        """
+        Aynı programı paylaşan hücreler sütun bazlı (vektörel) hesaplanır;
+        uygun olmayanlar ya da hata verenler hücre hücre.
+        """
+        batches = {}
+        for ref in refs:
+            if is_block(ref):
+                # formül bloğunun tamamı: tek sütun geçişi
+                c = self.graph.block_specs[ref[1]].col
+                spans = self.graph.block_spans(ref[1])
+                program = self.program(spans[0][0], c)
+                rows = [r for s, e in spans for r in range(s, e + 1)]
+                if program is not None and program.vector:
+                    batches.setdefault((program, c), []).extend(rows)
+                else:
+                    for r in rows:
+                        self._recalculate_cell(r, c)
+                continue
+
+            r, c = cell_to_index(ref)
+            program = self.program(r, c)
+            if program is not None and program.vector:
+                batches.setdefault((program, c), []).append(r)
+            else:
+                self._recalculate_cell(r, c)
+
+        instrumentation = self.instrumentation
+        for (program, c), rows in batches.items():
+            values = None
+            if len(rows) > 1:
+                rows.sort()
+                start = time.perf_counter()
+                values = program.evaluate_column(self.store, rows, c)
+                if values is not None and instrumentation is not None:
+                    end = time.perf_counter()
+                    for r in rows:
+                        instrumentation.record_cell(r, c, start, end, len(rows))
+                    instrumentation.event(program.shape, "batch", start, end, {"col": c, "rows": len(rows)})
+
+            if values is None:
+                for r in rows:
+                    self._recalculate_cell(r, c)
+                continue
+
+            self._set_column_values(c, rows, values)
+
+    def rebind(self, keys, renamed=None):
+        """
+        Tanımı değişen (ya da silinen) isimleri kullanan formüller yeniden
+        derlenir ve hesaplanır; diğer formüllere dokunulmaz.
+        renamed: (eski anahtar, yeni ad) – kullanan formüllerin metni de değişir
+        """
+        self.programs.forget(keys)
+
+        users = set()
+        for key in keys:
+            users |= self.graph.name_dependents.get(key, set())
+        if not users:
+            return
+
+        with self._edit("rebind", len(users)):
+            changed = []
+            for ref in users:
+                row, col = cell_to_index(ref)
+                formula = self.store.formula(row, col)
+                if renamed is not None:
+                    formula = rename_in_formula(formula, *renamed)
+                changed.append(self._update_cell(row, col, "=" + formula))
+            self._recalculate(changed)
+        self._notify()
+
     def _recalculate_dependents(self, cell_ref):
-        for dep in self.graph.recalculate_dependents(cell_ref):
-            r, c = self._cell_to_index(dep)
-            self._recalculate_cell(r, c)
+        self._recalculate([cell_ref])
 
     def _recalculate_cell(self, row: int, col: int):
-        item = self.table.item(row, col)
-        if not item:
+        if not self.store.formula(row, col):
             return
 
-        formula = item.data(Qt.UserRole)
-        if not formula:
+        program = self.program(row, col)
+        if program is None:
+            self._set_value(row, col, "#PARSE!")
             return
 
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            start = time.perf_counter()
+
         try:
-            ast = self.parser.parse(formula)
-            value = self.evaluator.eval(ast)
+            value = self.evaluator.eval_at(program.ast, row, col)
         except Exception:
             value = "#ERROR"
 
-        self._set_item_value(item, value)
+        if instrumentation is not None:
+            end = time.perf_counter()
+            instrumentation.record_cell(row, col, start, end)
+            instrumentation.event(index_to_cell(row, col), "cell", start, end)
+
+        self._set_value(row, col, value)
 
     # =====================================================
     # UI SAFE UPDATE
     # =====================================================
-    def _set_item_value(self, item, value):
+    def _set_value(self, row: int, col: int, value):
+        self.store.set(row, col, value)
+        self._changed.append((row, col))
+
+        if self.table is None:
+            return
+
+        item = self.table.item(row, col)
+        if item is None:
+            return
+
         table = self.table
         table.blockSignals(True)
+        item.setText(display_value(value))
+        table.blockSignals(False)
 
-        if value is True:
-            item.setText("TRUE")
-        elif value is False:
-            item.setText("FALSE")
-        else:
-            item.setText(str(value))
+    def _set_column_values(self, col: int, rows, values):
+        """
+        Vektörel sonuçları sütun deposuna tek seferde yazar
+        """
+        self.store.update_column(col, dict(zip(rows, values)))
+        self._changed.extend((r, col) for r in rows)
 
+        if self.table is None:
+            return
+
+        table = self.table
+        table.blockSignals(True)
+        for row, value in zip(rows, values):
+            item = table.item(row, col)
+            if item is not None:
+                item.setText(display_value(value))
         table.blockSignals(False)
 
-    def _cell_to_index(self, ref):
-        from utils import cell_to_index
-        return cell_to_index(ref)
\ No newline at end of file
+
+def _column_spans(targets):
+    """
+    (row, col) listesi → sütun başına ardışık (col, ilk, son) parçalar
+    """
+    columns = {}
+    for row, col in targets:
+        columns.setdefault(col, []).append(row)
+
+    spans = []
+    for col, rows in columns.items():
+        rows.sort()
+        start = prev = rows[0]
+        for row in rows[1:]:
+            if row != prev + 1:
+                spans.append((col, start, prev))
+                start = row
+            prev = row
+        spans.append((col, start, prev))
+    return spans
+
+
+def _refs_in(index, name, col, top, bottom):
+    """
+    index'te anahtarı olan, col sütununun top..bottom satırlarındaki
+    hücreler: kayıt sayısı satırdan azsa kayıtlar, değilse satırlar gezilir
+    """
+    if len(index) < bottom - top + 1:
+        out = []
+        for ref in index:
+            row, c = cell_to_index(ref)
+            if c == col and top <= row <= bottom:
+                out.append(ref)
+        return out
+    return [ref for ref in (f"{name}{row + 1}" for row in range(top, bottom + 1)) if ref in index]
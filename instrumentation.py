@@ -0,0 +1,209 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils import index_to_cell
+
+
+class CellTiming:
+    """
+    Bir formül hücresinin toplam değerlendirme süresi ve sayısı
+    """
+    __slots__ = ("seconds", "count")
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.count = 0
+
+
+class EditRecord:
+    """
+    Tek bir düzenlemenin (set_cells / fill) özeti: parse süresi,
+    kirli küme boyutu, katman sayısı, gezilen grafik düğümleri ve
+    önbellek istatistikleri.
+    """
+    __slots__ = (
+        "label", "cells", "start", "seconds", "parse_seconds", "parsed",
+        "dirty", "levels", "visited", "memo_hits", "memo_lookups",
+        "aggregate_deltas", "aggregate_rescans",
+    )
+
+    def __init__(self, label: str, cells: int, start: float):
+        self.label = label
+        self.cells = cells
+        self.start = start
+        self.seconds = 0.0
+        self.parse_seconds = 0.0
+        self.parsed = 0
+        self.dirty = 0
+        self.levels = 0
+        self.visited = 0
+        self.memo_hits = 0
+        self.memo_lookups = 0
+        self.aggregate_deltas = 0
+        self.aggregate_rescans = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "start"}
+
+
+class Instrumentation:
+    """
+    FormulaEngine için isteğe bağlı (opt-in) ölçüm yüzeyi.
+
+    engine.enable_instrumentation() ile açılır; kapalıyken motorun
+    sıcak yollarında yalnızca bir None kontrolü kalır. Toplananlar:
+      - hücre başına değerlendirme süresi / sayısı (slowest())
+      - düzenleme başına parse süresi, kirli küme, katman, gezilen düğüm,
+        memo ve aralık toplamı önbellek istatistikleri (edits)
+      - Chrome trace-event olayları (export_chrome_trace())
+    """
+
+    def __init__(self, aggregates=None, max_events: int = 200_000, max_edits: int = 1000):
+        """
+        aggregates: değerlendiricinin AggregateCache'i (varsa); sayaçları
+        düzenleme başına farka çevrilir
+        """
+        self.max_events = max_events
+        self.max_edits = max_edits
+        self.origin = time.perf_counter()
+
+        self.aggregates = aggregates
+        self._aggregate_seen = self._aggregate_counters()
+
+        self.cells: Dict[Tuple[int, int], CellTiming] = {}
+        self.edits: List[EditRecord] = []
+        self.events: List[Dict[str, Any]] = []
+        self.dropped_events = 0
+        self.current: Optional[EditRecord] = None
+
+    # =====================================================
+    # KAYIT
+    # =====================================================
+    @contextmanager
+    def edit(self, label: str, cells: int):
+        """
+        Bir düzenlemenin tamamı (parse + recalc); iç içe çağrılar
+        dıştaki kayda eklenir
+        """
+        if self.current is not None:
+            yield self.current
+            return
+
+        record = EditRecord(label, cells, time.perf_counter())
+        self.current = record
+        try:
+            yield record
+        finally:
+            self.current = None
+            end = time.perf_counter()
+            record.seconds = end - record.start
+            self.edits.append(record)
+            if len(self.edits) > self.max_edits:
+                del self.edits[0]
+            self.event(label, "edit", record.start, end, record.as_dict())
+
+    @contextmanager
+    def span(self, name: str, category: str, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.event(name, category, start, time.perf_counter(), args)
+
+    def record_parse(self, start: float, end: float):
+        if self.current is not None:
+            self.current.parse_seconds += end - start
+            self.current.parsed += 1
+
+    def record_cell(self, row: int, col: int, start: float, end: float, batch: int = 1):
+        """
+        Hücre değerlendirmesi; vektörel grupta süre hücrelere eşit bölünür
+        """
+        seconds = (end - start) / batch
+        timing = self.cells.get((row, col))
+        if timing is None:
+            timing = self.cells[(row, col)] = CellTiming()
+        timing.seconds += seconds
+        timing.count += 1
+
+    def record_recalc(self, stats: Dict[str, Any], visited: int):
+        record = self.current
+        if record is None:
+            return
+        record.dirty += stats.get("cells", 0)
+        record.levels += stats.get("levels", 0)
+        record.memo_hits += stats.get("memo_hits", 0)
+        record.memo_lookups += stats.get("memo_lookups", 0)
+        record.visited += visited
+
+        deltas, rescans = self._aggregate_counters()
+        seen_deltas, seen_rescans = self._aggregate_seen
+        record.aggregate_deltas += deltas - seen_deltas
+        record.aggregate_rescans += rescans - seen_rescans
+        self._aggregate_seen = (deltas, rescans)
+
+    def _aggregate_counters(self) -> Tuple[int, int]:
+        if self.aggregates is None:
+            return 0, 0
+        return self.aggregates.deltas, self.aggregates.rescans
+
+    def event(self, name: str, category: str, start: float, end: float, args: Optional[Dict[str, Any]] = None):
+        if len(self.events) >= self.max_events:
+            self.dropped_events += 1
+            return
+        self.events.append({
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": 1,
+            "tid": 1,
+            "args": args or {},
+        })
+
+    # =====================================================
+    # RAPOR
+    # =====================================================
+    def slowest(self, limit: int = 20) -> List[Tuple[str, float, int, float]]:
+        """
+        [(hücre, toplam sn, değerlendirme sayısı, ortalama sn), ...]
+        toplam süreye göre azalan
+        """
+        ranked = sorted(self.cells.items(), key=lambda item: item[1].seconds, reverse=True)
+        return [
+            (index_to_cell(row, col), timing.seconds, timing.count, timing.seconds / timing.count)
+            for (row, col), timing in ranked[:limit]
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Tüm düzenlemelerin toplamı ve son düzenleme
+        """
+        total_lookups = sum(e.memo_lookups for e in self.edits)
+        return {
+            "edits": len(self.edits),
+            "cells_timed": len(self.cells),
+            "eval_seconds": sum(t.seconds for t in self.cells.values()),
+            "parse_seconds": sum(e.parse_seconds for e in self.edits),
+            "memo_hit_rate": sum(e.memo_hits for e in self.edits) / total_lookups if total_lookups else 0.0,
+            "last_edit": self.edits[-1].as_dict() if self.edits else None,
+            "dropped_events": self.dropped_events,
+        }
+
+    def export_chrome_trace(self, path: str):
+        """
+        chrome://tracing / Perfetto ile açılabilen trace-event JSON
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def reset(self):
+        self.cells.clear()
+        self.edits.clear()
+        self.events.clear()
+        self.dropped_events = 0
+        self.origin = time.perf_counter()
+        self._aggregate_seen = self._aggregate_counters()
@@ -0,0 +1,251 @@
+import sys
+import tracemalloc
+import types
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils import cell_to_index, index_to_cell
+
+# C++ tarafındaki QTableWidgetItem (QVariant rolleri dahil) için tahmin;
+# tracemalloc ve sys.getsizeof yalnızca Python sarmalayıcısını görür
+QT_ITEM_BYTES = 160
+
+# dict/set girişinin tahmini payı (hash + anahtar + değer işaretçileri)
+_ENTRY_BYTES = 3 * 8
+
+# izlenmeyen (yalnızca kendi boyutu sayılan) türler
+_OPAQUE = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+    types.LambdaType,
+)
+
+
+# =========================
+# YAPI FARKINDA BOYUT
+# =========================
+
+def deep_size(*roots: Any, seen: Optional[set] = None) -> int:
+    """
+    Nesneler ve ulaşılabilen alt nesnelerinin toplam boyutu (byte).
+    Paylaşılan nesneler bir kez sayılır (seen ortak verilirse alt
+    sistemler arasında da). Fonksiyon/metot/sınıf/modül ve Qt
+    nesneleri izlenmez: izleyici geri çağrıları tüm UI'yi saymasın.
+    Özyinelemesiz: derin AST/zincirlerde yığın taşmaz.
+    """
+    if seen is None:
+        seen = set()
+
+    total = 0
+    stack = list(roots)
+    while stack:
+        obj = stack.pop()
+        key = id(obj)
+        if key in seen:
+            continue
+        seen.add(key)
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, (str, bytes, int, float, bool, complex)) or obj is None:
+            continue
+        if isinstance(obj, _OPAQUE) or type(obj).__module__.startswith(("PySide6", "shiboken")):
+            continue
+
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+            continue
+        if isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+            continue
+
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                if hasattr(obj, name):
+                    stack.append(getattr(obj, name))
+        if hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+
+    return total
+
+
+# =========================
+# RAPOR
+# =========================
+
+def memory_report(
+    engine,
+    table=None,
+    styles=None,
+    journal=None,
+    region_rows: int = 100,
+    region_cols: int = 10,
+    top_regions: int = 20,
+) -> Dict[str, Any]:
+    """
+    Alt sistem ve sayfa bölgesi bazında bellek dökümü (JSON'a yazılabilir).
+
+    subsystems: alt sistem → byte (paylaşılan nesneler ilk sayan alt
+    sistemde; sıra aşağıdaki gibidir). qt_items C++ tarafı için tahmindir.
+    regions: region_rows × region_cols bloklarına düşen hücre başı
+    maliyet (değer, formül metni, bağımlılık kümeleri, Qt öğesi),
+    büyükten küçüğe ilk top_regions blok.
+    """
+    seen = set()
+    store = engine.store
+    graph = engine.graph
+
+    subsystems = {
+        "cell_values": deep_size(store.columns, store.occupied, store.versions, seen=seen),
+        "formula_text": deep_size(store.formulas, seen=seen),
+        "dependency_graph": deep_size(
+            graph.dependencies, graph.dependents, graph.areas,
+            graph.column_dependents, graph.row_dependents, graph.range_dependents,
+            graph.names, graph.name_dependents,
+            graph.block_runs, graph.block_specs, graph.block_readers, graph.block_absolute, seen=seen,
+        ),
+        "programs_ast": deep_size(engine.programs, seen=seen),
+        "formula_groups": deep_size(engine.groups, seen=seen),
+        "evaluator_caches": deep_size(engine.evaluator, seen=seen),
+    }
+    if engine.instrumentation is not None:
+        subsystems["instrumentation"] = deep_size(engine.instrumentation, seen=seen)
+    if styles is not None:
+        subsystems["styles"] = deep_size(styles, seen=seen)
+    if journal is not None:
+        subsystems["undo"] = deep_size(journal.undo_steps, journal.redo_steps, seen=seen)
+
+    items = _item_cells(table) if table is not None else []
+    if table is not None:
+        subsystems["qt_items"] = len(items) * QT_ITEM_BYTES
+
+    regions = _regions(engine, items, region_rows, region_cols)
+    ranked = sorted(regions.items(), key=lambda item: item[1], reverse=True)
+
+    return {
+        "total": sum(subsystems.values()),
+        "subsystems": subsystems,
+        "qt_items": len(items),
+        "regions": [
+            {"range": _region_name(key, region_rows, region_cols), "bytes": size}
+            for key, size in ranked[:top_regions]
+        ],
+    }
+
+
+def _item_cells(table) -> List[Tuple[int, int]]:
+    return [
+        (row, col)
+        for row in range(table.rowCount())
+        for col in range(table.columnCount())
+        if table.item(row, col) is not None
+    ]
+
+
+def _regions(engine, items, region_rows: int, region_cols: int) -> Dict[Tuple[int, int], int]:
+    store = engine.store
+    dependencies = engine.graph.dependencies
+    dependents = engine.graph.dependents
+    getsizeof = sys.getsizeof
+
+    sizes: Dict[Tuple[int, int], int] = {}
+
+    def add(row, col, size):
+        key = (row // region_rows, col // region_cols)
+        sizes[key] = sizes.get(key, 0) + size
+
+    for row, col, value in store.cells():
+        add(row, col, getsizeof(value) + _ENTRY_BYTES)
+
+    for (row, col), formula in store.formulas.items():
+        ref = index_to_cell(row, col)
+        size = getsizeof(formula) + _ENTRY_BYTES
+        deps = dependencies.get(ref)
+        if deps:
+            size += getsizeof(deps) + _ENTRY_BYTES
+        add(row, col, size)
+
+    # bağımlı kümeleri girdi hücresinin bölgesine yazılır
+    for ref, cells in dependents.items():
+        if cells:
+            row, col = _index(ref)
+            if row is not None:
+                add(row, col, getsizeof(cells) + _ENTRY_BYTES)
+
+    for row, col in items:
+        add(row, col, QT_ITEM_BYTES)
+
+    return sizes
+
+
+def _index(ref: str):
+    try:
+        return cell_to_index(ref)
+    except ValueError:
+        return None, None
+
+
+def _region_name(key: Tuple[int, int], region_rows: int, region_cols: int) -> str:
+    block_row, block_col = key
+    top, left = block_row * region_rows, block_col * region_cols
+    return f"{index_to_cell(top, left)}:{index_to_cell(top + region_rows - 1, left + region_cols - 1)}"
+
+
+# =========================
+# TRACEMALLOC
+# =========================
+
+class AllocationTracker:
+    """
+    tracemalloc anlık görüntüleri arasındaki farkı modül (dosya) bazında
+    özetler: başlangıçtan bu yana hangi alt sistemin kodu ne kadar
+    ayırdı. tracemalloc zaten açıksa ona dokunmaz.
+    """
+
+    def __init__(self, frames: int = 1):
+        self.frames = frames
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self._owns = False
+
+    @property
+    def active(self) -> bool:
+        return self.baseline is not None
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns = True
+        self.baseline = tracemalloc.take_snapshot()
+
+    def stop(self):
+        if self._owns:
+            tracemalloc.stop()
+            self._owns = False
+        self.baseline = None
+
+    def by_module(self, limit: int = 20) -> List[Tuple[str, int, int]]:
+        """
+        [(dosya, net byte farkı, net blok farkı), ...] büyükten küçüğe
+        """
+        if self.baseline is None:
+            return []
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.baseline, "filename")
+        return [
+            (stat.traceback[0].filename, stat.size_diff, stat.count_diff)
+            for stat in stats[:limit]
+        ]
+
+    def peak(self) -> int:
+        return tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+
+
+def format_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
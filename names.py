@@ -0,0 +1,302 @@
+import re
+from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from ast_nodes import ASTNode, Cell, Name, NodeFactory, Range, SheetRef, TableRef, BinaryOp, UnaryOp, Function, If, Lambda
+from parser import Parser, tokenize
+from tables import Table, TableIndex, appended_bottom, table_headers
+from utils import column_name
+
+# isim: harf ya da _ ile başlar; harf, rakam, _ ve . içerebilir
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_.]*$")
+
+# hücre referansına (TAX2024) ya da R1C1 şekline (R2C3, RC) benzeyen adlar
+# tokenizer'da referans olarak okunur / şekil anahtarlarıyla çakışır
+_REF_LIKE = re.compile(r"^([A-Za-z]{1,3}[0-9]+|[Rr][0-9]*([Cc][0-9]*)?|[Cc][0-9]*)$")
+
+
+def name_key(name: str) -> str:
+    """
+    İsimler büyük/küçük harf duyarsızdır: TaxRate == TAXRATE
+    """
+    return name.casefold()
+
+
+class DefinedName:
+    """
+    Çalışma kitabı düzeyinde tanımlı isim: Inputs!$B$2:$B$500, 0.18, ...
+    ast referansları mutlaktır: ismi kullanan formül nereye kopyalanırsa
+    kopyalansın aynı hücrelere bakar.
+    """
+    __slots__ = ("name", "key", "text", "ast")
+
+    def __init__(self, name: str, text: str, ast: ASTNode):
+        self.name = name
+        self.key = name_key(name)
+        self.text = text
+        self.ast = ast
+
+    def __repr__(self):
+        return f"DefinedName({self.name!r}, {self.text!r})"
+
+
+class NameManager:
+    """
+    Tanımlı isimler. İsimler değerlendirme anında aranmaz: ProgramTable
+    derlerken İsim düğümünü tanımın AST'siyle değiştirir (referans ya da
+    paylaşılan sabit). Hangi formülün hangi ismi kullandığı sayfaların
+    DependencyGraph'ında (isim → formül kenarları) tutulur; tanım
+    değişince yalnızca o formüller yeniden derlenir.
+    """
+
+    def __init__(self, engines: Callable[[], Iterable] = tuple):
+        """
+        engines: isimleri kullanan (yüklü) FormulaEngine'leri döndürür
+        """
+        self.engines = engines
+        self.parser = Parser()
+        self._names: Dict[str, DefinedName] = {}
+
+        # tablolar isimlerle aynı ad alanını ve aynı isim → formül kenarlarını paylaşır
+        self.tables = TableIndex()
+
+    # =====================================================
+    # TANIMLAMA
+    # =====================================================
+    def define(self, name: str, text: str) -> DefinedName:
+        """
+        text: "=" isteğe bağlı; Sheet1!B2:B500, 0.18, "EUR", Rate*2 ...
+        Aynı adla tekrar çağrılırsa tanım değişir.
+        """
+        _validate(name)
+        if name_key(name) in self.tables:
+            raise ValueError(f"Bu adda bir tablo var: {name}")
+        text = text.strip()
+        if text.startswith("="):
+            text = text[1:]
+        if not text:
+            raise ValueError(f"İsim tanımı boş: {name}")
+
+        ast = _absolute(self.parser.parse(text), self.parser.nodes)
+        defined = self._names[name_key(name)] = DefinedName(name, text, ast)
+        self._rebind({defined.key})
+        return defined
+
+    def remove(self, name: str):
+        key = name_key(name)
+        if key not in self._names:
+            raise KeyError(name)
+        del self._names[key]
+        self._rebind({key})
+
+    def rename(self, old: str, new: str) -> DefinedName:
+        """
+        Kullanan formüllerin metni de yeni adla yeniden yazılır
+        """
+        old_key = name_key(old)
+        defined = self._names.get(old_key)
+        if defined is None:
+            raise KeyError(old)
+        _validate(new)
+        new_key = name_key(new)
+        if new_key != old_key and (new_key in self._names or new_key in self.tables):
+            raise ValueError(f"İsim zaten var: {new}")
+
+        del self._names[old_key]
+        renamed = self._names[new_key] = DefinedName(new, defined.text, defined.ast)
+        self._rebind({old_key, new_key}, (old_key, new))
+        return renamed
+
+    # =====================================================
+    # TABLOLAR
+    # =====================================================
+    def add_table(self, name: str, sheet: Optional[str], top: int, left: int, bottom: int, right: int,
+                  headers: List[str]) -> Table:
+        """
+        top: başlık satırı, bottom: son gövde satırı; sheet kitapsız motorda None
+        """
+        _validate(name)
+        key = name_key(name)
+        if key in self._names or key in self.tables:
+            raise ValueError(f"İsim zaten var: {name}")
+
+        table = Table(name, sheet, top, left, bottom, right, headers)
+        self.tables.add(table)
+        self._rebind({key})
+        return table
+
+    def remove_table(self, name: str):
+        self.tables.remove(name_key(name))
+        self._rebind({name_key(name)})
+
+    def resize_table(self, name: str, bottom: int):
+        """
+        Tablonun son satırı değişir. Sütun toplamları (AggregateCache)
+        yeniden taranmaz, yalnızca eklenen/çıkan satırlar farkla uygulanır;
+        yalnızca bu tabloya başvuran formüller yeniden bağlanır.
+        """
+        table = self.tables.get(name_key(name))
+        if table is None:
+            raise KeyError(name)
+
+        before = table.column_bounds()
+        table.bottom = max(bottom, table.top)
+        after = table.column_bounds()
+
+        sheet = None if table.sheet is None else table.sheet.casefold()
+        for engine in self.engines():
+            aggregates = engine.evaluator.aggregates
+            if aggregates is not None and engine.sheet == sheet:
+                for old, new in zip(before, after):
+                    aggregates.resize(old, new)
+
+        self._rebind({table.key})
+
+    def on_write(self, sheet: Optional[str], store, cells: List[Tuple[int, int]]):
+        """
+        Sayfaya yazımdan sonra: tablonun hemen altına yazılan satırlar
+        tabloya katılır; başlık satırı değiştiyse sütun adları yenilenir
+        """
+        for table in list(self.tables.on_sheet(sheet)):
+            if any(row == table.top and table.left <= col <= table.right for row, col in cells):
+                headers = table_headers(store, table.top, table.left, table.right)
+                if headers != table.headers:
+                    table.headers = headers
+                    self._rebind({table.key})
+
+            bottom = appended_bottom(table, store, cells)
+            if bottom is not None:
+                self.resize_table(table.name, bottom)
+
+    def _rebind(self, keys: Set[str], renamed: Optional[Tuple[str, str]] = None):
+        for engine in self.engines():
+            engine.rebind(keys, renamed)
+
+    # =====================================================
+    # SORGU
+    # =====================================================
+    def get(self, name: str) -> Optional[DefinedName]:
+        return self._names.get(name_key(name))
+
+    def __contains__(self, name: str) -> bool:
+        return name_key(name) in self._names
+
+    def __iter__(self) -> Iterator[DefinedName]:
+        return iter(sorted(self._names.values(), key=lambda d: d.key))
+
+    def __len__(self):
+        return len(self._names)
+
+    # =====================================================
+    # DERLEME
+    # =====================================================
+    def resolve(self, node: ASTNode, make: NodeFactory, sheet: Optional[str] = None) -> Tuple[ASTNode, FrozenSet[str]]:
+        """
+        Formül AST'sindeki isimleri tanımlarıyla, tablo referanslarını
+        (Sales[Amount]) tablonun o anki kapsamıyla değiştirir (iç içe
+        isimler dahil). sheet: derlenen formülün sayfa anahtarı.
+        Dönüş: (yeni AST, kullanılan isim/tablo anahtarları).
+        Tanımsız ya da döngüsel isim düğüm olarak kalır (#NAME? / #REF!)
+        ama anahtarı yine döner: sonradan tanımlanınca formül bağlanır.
+        """
+        used: Set[str] = set()
+        return self._resolve(node, make, used, (), sheet), frozenset(used)
+
+    def _resolve(self, node: ASTNode, make: NodeFactory, used: Set[str], stack: tuple, sheet=None) -> ASTNode:
+        if isinstance(node, Name):
+            key = name_key(node.name)
+            used.add(key)
+            defined = self._names.get(key)
+            if defined is None or key in stack:
+                return node
+            return self._resolve(make.intern(defined.ast), make, used, stack + (key,), sheet)
+
+        if isinstance(node, TableRef):
+            key = name_key(node.table)
+            used.add(key)
+            table = self.tables.get(key)
+            if table is None:
+                return node
+            try:
+                r1, c1, r2, c2 = table.bounds(node.item)
+            except KeyError:
+                return node
+            ref = make(
+                Range,
+                make(Cell, f"${column_name(c1)}${r1 + 1}"),
+                make(Cell, f"${column_name(c2)}${r2 + 1}"),
+            )
+            # aynı sayfadaki tablo düz aralıktır (aralık toplamı önbelleği kullanılır)
+            if table.sheet is None or table.sheet.casefold() == sheet:
+                return ref
+            return make(SheetRef, table.sheet, ref)
+
+        if isinstance(node, BinaryOp):
+            return make(BinaryOp, self._resolve(node.left, make, used, stack, sheet), node.op,
+                        self._resolve(node.right, make, used, stack, sheet))
+        if isinstance(node, UnaryOp):
+            return make(UnaryOp, node.op, self._resolve(node.operand, make, used, stack, sheet))
+        if isinstance(node, Function):
+            return make(Function, node.name, [self._resolve(arg, make, used, stack, sheet) for arg in node.args])
+        if isinstance(node, If):
+            return make(If, *(self._resolve(n, make, used, stack, sheet) for n in (node.condition, node.true_expr, node.false_expr)))
+        if isinstance(node, Lambda):
+            return make(
+                Lambda,
+                node.params,
+                self._resolve(node.body, make, used, stack, sheet),
+                [(name, self._resolve(expr, make, used, stack, sheet)) for name, expr in node.bindings],
+            )
+        return node
+
+
+def rename_in_formula(formula: str, old: str, new: str) -> str:
+    """
+    Formül metnindeki old isim token'larını new ile değiştirir
+    (fonksiyon adları, metin sabitleri ve sayfa adları hariç)
+    """
+    try:
+        tokens = tokenize(formula)
+    except SyntaxError:
+        return formula
+
+    key = name_key(old)
+    out, pos = [], 0
+    for i, token in enumerate(tokens):
+        if token.type != "NAME" or name_key(token.value) != key:
+            continue
+        following = tokens[i + 1] if i + 1 < len(tokens) else None
+        if following is not None and following.type == "LPAREN":
+            continue
+        out.append(formula[pos:token.pos])
+        out.append(new)
+        pos = token.pos + len(token.value)
+    out.append(formula[pos:])
+    return "".join(out)
+
+
+def _validate(name: str):
+    if not _NAME_RE.match(name or ""):
+        raise ValueError(f"Geçersiz isim: {name}")
+    if _REF_LIKE.match(name) or name.upper() in ("TRUE", "FALSE"):
+        raise ValueError(f"İsim bir referansa benziyor: {name}")
+
+
+def _absolute(node: ASTNode, make: NodeFactory) -> ASTNode:
+    """
+    Tanımdaki A1 referanslarını $A$1'e çevirir
+    """
+    if isinstance(node, Cell):
+        return make(Cell, re.sub(r"^\$?([A-Z]+)\$?([0-9]+)$", r"$\1$\2", node.ref))
+    if isinstance(node, Range):
+        return make(Range, _absolute(node.start, make), _absolute(node.end, make))
+    if isinstance(node, SheetRef):
+        return make(SheetRef, node.sheet, _absolute(node.ref, make))
+    if isinstance(node, BinaryOp):
+        return make(BinaryOp, _absolute(node.left, make), node.op, _absolute(node.right, make))
+    if isinstance(node, UnaryOp):
+        return make(UnaryOp, node.op, _absolute(node.operand, make))
+    if isinstance(node, Function):
+        return make(Function, node.name, [_absolute(arg, make) for arg in node.args])
+    if isinstance(node, If):
+        return make(If, *(_absolute(n, make) for n in (node.condition, node.true_expr, node.false_expr)))
+    return node
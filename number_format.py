@@ -0,0 +1,58 @@
+from functools import lru_cache
+from typing import Any, Callable
+
+from cell_store import display_value
+
+Formatter = Callable[[Any], str]
+
+
+def _general(value: Any) -> str:
+    return display_value(value)
+
+
+def _numeric(fn: Callable[[float], str]) -> Formatter:
+    # bool da int alt sınıfı; TRUE/FALSE sayı gibi biçimlenmez
+    def formatter(value: Any) -> str:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return fn(value)
+        return display_value(value)
+    return formatter
+
+
+def split_format(fmt: str):
+    """
+    "Number:2" -> ("Number", 2), "General" -> ("General", 0)
+    """
+    if ":" in fmt:
+        kind, dec = fmt.split(":", 1)
+        return kind, int(dec)
+    return fmt, 0
+
+
+@lru_cache(maxsize=None)
+def compile_format(fmt: str) -> Formatter:
+    """
+    Format metnini bir kez çözer ve değer -> metin fonksiyonu döndürür.
+    Sonuç format metnine göre önbelleklenir.
+    """
+    if not fmt:
+        return _general
+
+    try:
+        kind, dec = split_format(fmt)
+    except ValueError:
+        return _general
+
+    if kind in ("Integer", "Number"):
+        return _numeric(lambda v: f"{v:.{dec}f}")
+
+    if kind == "Percent":
+        return _numeric(lambda v: f"{v * 100:.{dec}f}%")
+
+    if kind == "Currency":
+        return _numeric(lambda v: f"₺{v:,.{dec}f}")
+
+    if kind == "Accounting":
+        return _numeric(lambda v: f"₺ {v:,.{dec}f}")
+
+    return _general
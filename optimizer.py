@@ -0,0 +1,261 @@
+import math
+from typing import List, Optional, Set
+
+from ast_nodes import (
+    ASTNode,
+    NodeFactory,
+    Number,
+    String,
+    Boolean,
+    Cell,
+    Range,
+    SheetRef,
+    Symbol,
+    UnaryOp,
+    BinaryOp,
+    Function,
+    If,
+    Lambda,
+)
+from evaluator import Evaluator, PURE_FUNCTIONS
+
+# sonucu (başarılıysa) her zaman sayı olan fonksiyonlar
+# (MIN/MAX tekil argümanda TRUE döndürebilir: yalnızca aralık/sayı argümanlarıyla)
+NUMERIC_FUNCTIONS = {"SUM", "AVERAGE", "COUNT"}
+
+
+class _Constants:
+    """
+    Sabit katlama için boş depo: sabit alt ağaç hücre okumaz
+    """
+    def get(self, row, col):
+        return None
+
+    def column(self, col):
+        return {}
+
+    def rows(self, col, first=0, last=None):
+        return []
+
+
+class Optimizer:
+    """
+    Parse ile değerlendirme arasında çalışan sadeleştirme geçişi:
+      - sabit BinaryOp/UnaryOp/saf fonksiyon alt ağaçlarını katlar
+      - güvenli özdeşlikler: x*1, 1*x, x/1, x+0, 0+x, x-0, x^1, --x, +x
+        (yalnızca x'in sayı olduğu kesinse; "a"*1 hata verir, "a" değil)
+      - LAMBDA gövdesindeki parametreden bağımsız alt ifadeleri
+        bindings'e taşır (lambda oluşturulurken bir kez hesaplanır;
+        hata verirse hata yalnızca kullanıldığında yükselir)
+    Hata verecek sabit ifadeler (1/0) katlanmaz: hata çalışma anında oluşur.
+    """
+
+    def __init__(self, nodes: Optional[NodeFactory] = None):
+        self.nodes = nodes if nodes is not None else NodeFactory()
+        self._evaluator = Evaluator(_Constants())
+        self._hoisted = 0
+
+    def optimize(self, node: ASTNode) -> ASTNode:
+        make = self.nodes
+
+        if isinstance(node, BinaryOp):
+            left = self.optimize(node.left)
+            right = self.optimize(node.right)
+            folded = self._fold(make(BinaryOp, left, node.op, right))
+            if folded is not None:
+                return folded
+            simplified = self._identity(left, node.op, right)
+            if simplified is not None:
+                return simplified
+            return make(BinaryOp, left, node.op, right)
+
+        if isinstance(node, UnaryOp):
+            operand = self.optimize(node.operand)
+            folded = self._fold(make(UnaryOp, node.op, operand))
+            if folded is not None:
+                return folded
+            if node.op == "+" and is_numeric(operand):
+                return operand
+            if (
+                node.op == "-"
+                and isinstance(operand, UnaryOp)
+                and operand.op == "-"
+                and is_numeric(operand.operand)
+            ):
+                return operand.operand
+            return make(UnaryOp, node.op, operand)
+
+        if isinstance(node, Function):
+            args = [self.optimize(arg) for arg in node.args]
+            rebuilt = make(Function, node.name, args)
+            if node.name.upper() in PURE_FUNCTIONS and all(isinstance(a, Number) for a in args):
+                folded = self._fold(rebuilt)
+                if folded is not None:
+                    return folded
+            return rebuilt
+
+        if isinstance(node, If):
+            return make(
+                If,
+                self.optimize(node.condition),
+                self.optimize(node.true_expr),
+                self.optimize(node.false_expr),
+            )
+
+        if isinstance(node, Lambda):
+            return self._hoist(node)
+
+        return node
+
+    # =====================================================
+    # SABİT KATLAMA
+    # =====================================================
+    def _fold(self, node: ASTNode) -> Optional[ASTNode]:
+        if not _is_constant(node):
+            return None
+        try:
+            value = self._evaluator.eval(node)
+        except Exception:
+            return None
+        # yalnızca float: int sonuç (COUNT) Number'a dönünce tipi değişirdi
+        if type(value) is not float:
+            return None
+        if not math.isfinite(value):
+            return None
+        return self.nodes(Number, float(value))
+
+    # =====================================================
+    # ÖZDEŞLİKLER
+    # =====================================================
+    def _identity(self, left: ASTNode, op: str, right: ASTNode) -> Optional[ASTNode]:
+        # x float değilse x*1.0 tipi değiştirir (COUNT(..)*1 int değil float)
+        if op in ("*", "/", "^") and _is_value(right, 1) and is_float(left):
+            return left
+        if op == "*" and _is_value(left, 1) and is_float(right):
+            return right
+        if op in ("+", "-") and _is_value(right, 0) and is_float(left):
+            return left
+        if op == "+" and _is_value(left, 0) and is_float(right):
+            return right
+        return None
+
+    # =====================================================
+    # LAMBDA HOIST
+    # =====================================================
+    def _hoist(self, node: Lambda) -> ASTNode:
+        params = set(node.params)
+        bindings = [(name, self.optimize(expr)) for name, expr in node.bindings]
+        body = self._hoist_invariants(self.optimize(node.body), params, bindings)
+        return self.nodes(Lambda, node.params, body, bindings)
+
+    def _hoist_invariants(self, node: ASTNode, params: Set[str], bindings: List) -> ASTNode:
+        if _is_leaf(node):
+            return node
+
+        if not _uses(node, params | {name for name, _ in bindings}):
+            name = f"_h{self._hoisted}"
+            self._hoisted += 1
+            bindings.append((name, node))
+            return self.nodes(Symbol, name)
+
+        make = self.nodes
+        if isinstance(node, BinaryOp):
+            return make(
+                BinaryOp,
+                self._hoist_invariants(node.left, params, bindings),
+                node.op,
+                self._hoist_invariants(node.right, params, bindings),
+            )
+        if isinstance(node, UnaryOp):
+            return make(UnaryOp, node.op, self._hoist_invariants(node.operand, params, bindings))
+        if isinstance(node, Function):
+            return make(Function, node.name, [self._hoist_invariants(a, params, bindings) for a in node.args])
+        return node
+
+
+# =========================
+# YARDIMCI
+# =========================
+
+def is_numeric(node: ASTNode) -> bool:
+    """
+    Değerlendirme başarılıysa sonucun kesinlikle sayı olduğu düğümler
+    """
+    if isinstance(node, Number):
+        return True
+    if isinstance(node, UnaryOp):
+        # -x / +x yalnızca sayı ve mantıksal değerde başarılı olur
+        return node.op in ("-", "+")
+    if isinstance(node, BinaryOp):
+        if node.op in ("-", "/", "^"):
+            return True
+        if node.op in ("+", "*"):
+            # "a"+"b" ve "a"*TRUE metin döndürür
+            return is_numeric(node.left) and is_numeric(node.right)
+        return False
+    if isinstance(node, Function):
+        name = node.name.upper()
+        if name in NUMERIC_FUNCTIONS:
+            return True
+        if name in ("MIN", "MAX"):
+            return all(isinstance(a, Range) or is_numeric(a) for a in node.args)
+    return False
+
+
+def is_float(node: ASTNode) -> bool:
+    """
+    Değerlendirme başarılıysa sonucun kesinlikle float (ya da karmaşık)
+    olduğu düğümler: bir sayı katsayısıyla işlem tipi korur
+    """
+    if isinstance(node, Number):
+        return True
+    if isinstance(node, UnaryOp):
+        return node.op in ("-", "+") and is_float(node.operand)
+    if isinstance(node, BinaryOp):
+        if node.op == "/":
+            return True
+        if node.op in ("+", "-", "*", "^"):
+            return (is_float(node.left) and is_numeric(node.right)) or (is_numeric(node.left) and is_float(node.right))
+    return False
+
+
+def _is_value(node: ASTNode, value: float) -> bool:
+    return isinstance(node, Number) and node.value == value
+
+
+def _is_leaf(node: ASTNode) -> bool:
+    return not isinstance(node, (BinaryOp, UnaryOp, Function, If, Lambda))
+
+
+def _is_constant(node: ASTNode) -> bool:
+    if isinstance(node, Number):
+        return True
+    if isinstance(node, UnaryOp):
+        return _is_constant(node.operand)
+    if isinstance(node, BinaryOp):
+        return _is_constant(node.left) and _is_constant(node.right)
+    if isinstance(node, Function):
+        return node.name.upper() in PURE_FUNCTIONS and all(_is_constant(a) for a in node.args)
+    return False
+
+
+def _uses(node: ASTNode, names: Set[str]) -> bool:
+    if isinstance(node, (Number, String, Boolean, SheetRef)):
+        return False
+    if isinstance(node, Symbol):
+        return node.name in names
+    if isinstance(node, Cell):
+        return node.ref in names
+    if isinstance(node, Range):
+        return node.start.ref in names or node.end.ref in names
+    if isinstance(node, BinaryOp):
+        return _uses(node.left, names) or _uses(node.right, names)
+    if isinstance(node, UnaryOp):
+        return _uses(node.operand, names)
+    if isinstance(node, Function):
+        return any(_uses(a, names) for a in node.args)
+    if isinstance(node, If):
+        return any(_uses(n, names) for n in (node.condition, node.true_expr, node.false_expr))
+    if isinstance(node, Lambda):
+        return _uses(node.body, names - set(node.params))
+    return True
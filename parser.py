@@ -3,68 +3,229 @@ from typing import List
 
 from ast_nodes import (
     ASTNode,
+    NodeFactory,
     Number,
+    String,
+    Boolean,
     Cell,
     Range,
+    ColumnRange,
+    RowRange,
+    SheetRef,
     BinaryOp,
     Function,
     Lambda,
+    Name,
+    TableRef,
     UnaryOp
 )
+from utils import column_index
 
 # ======================================================
 # TOKEN
 # ======================================================
 
 class Token:
-    def __init__(self, type_, value):
+    __slots__ = ("type", "value", "pos")
+
+    def __init__(self, type_, value, pos=0):
         self.type = type_
         self.value = value
+        self.pos = pos      # formül metnindeki başlangıç ofseti
 
     def __repr__(self):
-        return f"Token({self.type}, {self.value})"
-    
+        return f"Token({self.type}, {self.value}, {self.pos})"
+
+
+class FormulaSyntaxError(SyntaxError):
+    """
+    Konumlu sözdizimi hatası: position formül metnindeki ofsettir
+    """
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} (konum {position})")
+        self.position = position
+
 # ======================================================
 # TOKENIZER
 # ======================================================
 
-TOKEN_SPEC = [
-    ("NUMBER",   r"\d+(\.\d+)?"),
-    ("CELL",     r"[A-Z]+[0-9]+"),
-    ("OP",       r"<=|>=|<>|==|!=|[+\-*/<>]=?"),
-    ("COMMA",    r","),
-    ("COLON",    r":"),
-    ("LPAREN",   r"\("),
-    ("RPAREN",   r"\)"),
-    ("NAME",     r"[A-Z_]+"),
-    ("SKIP",     r"[ \t]+"),
-]
-
-MASTER_RE = re.compile("|".join(
-    f"(?P<{name}>{pattern})" for name, pattern in TOKEN_SPEC
-))
+# kelime: önce hücre referansı ($A$1, a1), değilse isim (SUM, LOG10, Sheet1)
+_WORD_RE = re.compile(
+    r"(\$?[A-Za-z]{1,3}\$?[0-9]+)(?![A-Za-z0-9_.(!])"
+    r"|[A-Za-z_][A-Za-z0-9_.]*"
+)
+_NUMBER_RE = re.compile(r"[0-9]*\.?[0-9]+(?:[eE][+-]?[0-9]+)?")
+
+# tüm sütun / satır aralıkları: A:C, $A:$A, 1:3, $2:$2
+_COLUMNS_RE = re.compile(r"\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}(?![A-Za-z0-9_.(!])")
+_ROWS_RE = re.compile(r"\$?[0-9]+:\$?[0-9]+(?![0-9.])")
+
+_WORD_START = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$")
+_NUMBER_START = frozenset("0123456789.")
+_SPACE = frozenset(" \t\r\n")
+
+_SINGLE = {
+    ",": "COMMA",
+    ":": "COLON",
+    "(": "LPAREN",
+    ")": "RPAREN",
+    "+": "OP",
+    "-": "OP",
+    "*": "OP",
+    "/": "OP",
+    "^": "OP",
+}
+_COMPARE_START = frozenset("<>=!")
+_COMPARE = {"<", ">", "=", "<=", ">=", "<>", "==", "!="}
+
 
 def tokenize(text: str) -> List[Token]:
+    """
+    Tek geçişli elle yazılmış tarayıcı: ilk karaktere göre dallanır,
+    yalnızca kelime ve sayı gövdeleri için bağlı (anchored) regex kullanır.
+
+    Token türleri: NUMBER, STRING ("a""b" → a"b), BOOL (TRUE/FALSE),
+    CELL (büyük harfe normalize, $ korunur), COLUMNS (A:C), ROWS (1:3),
+    SHEET (Sheet1! / 'My Sheet'!), TABLE (Sales[Amount] → ("Sales", "Amount")),
+    NAME, OP, COMMA, COLON, LPAREN, RPAREN.
+    Tanınmayan karakter sessizce atlanmaz: FormulaSyntaxError.
+    """
     tokens = []
-    for match in MASTER_RE.finditer(text):
-        kind = match.lastgroup
-        value = match.group()
+    append = tokens.append
+    pos = 0
+    length = len(text)
+
+    while pos < length:
+        ch = text[pos]
+
+        if ch in _WORD_START:
+            match = _COLUMNS_RE.match(text, pos) or (ch == "$" and _ROWS_RE.match(text, pos))
+            if match:
+                append(Token("COLUMNS" if match.re is _COLUMNS_RE else "ROWS", match.group().upper(), pos))
+                pos = match.end()
+                continue
+
+            match = _WORD_RE.match(text, pos)
+            if match is None:
+                raise FormulaSyntaxError(f"Geçersiz referans '{ch}'", pos)
+            end = match.end()
+            if match.lastindex:
+                append(Token("CELL", match.group().upper(), pos))
+            elif end < length and text[end] == "!":
+                append(Token("SHEET", match.group(), pos))
+                end += 1
+            else:
+                word = match.group()
+                upper = word.upper()
+                if (upper == "TRUE" or upper == "FALSE") and not text.startswith("(", end):
+                    append(Token("BOOL", upper, pos))
+                elif text.startswith("[", end):
+                    close = text.find("]", end)
+                    if close < 0:
+                        raise FormulaSyntaxError("Kapanmamış köşeli parantez", end)
+                    item = text[end + 1:close]
+                    if "[" in item:
+                        raise FormulaSyntaxError("İç içe tablo belirteci desteklenmiyor", end)
+                    append(Token("TABLE", (word, item.strip()), pos))
+                    end = close + 1
+                else:
+                    append(Token("NAME", word, pos))
+            pos = end
+            continue
+
+        kind = _SINGLE.get(ch)
+        if kind is not None:
+            append(Token(kind, ch, pos))
+            pos += 1
+            continue
+
+        if ch in _NUMBER_START:
+            match = _ROWS_RE.match(text, pos)
+            if match:
+                append(Token("ROWS", match.group(), pos))
+                pos = match.end()
+                continue
+
+            match = _NUMBER_RE.match(text, pos)
+            if match is None:
+                raise FormulaSyntaxError("Geçersiz sayı", pos)
+            append(Token("NUMBER", match.group(), pos))
+            pos = match.end()
+            continue
+
+        if ch in _COMPARE_START:
+            two = text[pos:pos + 2]
+            op = two if two in _COMPARE else ch
+            if op not in _COMPARE:
+                raise FormulaSyntaxError(f"Beklenmeyen karakter '{ch}'", pos)
+            append(Token("OP", op, pos))
+            pos += len(op)
+            continue
+
+        if ch in _SPACE:
+            pos += 1
+            continue
+
+        if ch == '"':
+            value, end = _quoted(text, pos, '"')
+            append(Token("STRING", value, pos))
+            pos = end
+            continue
 
-        if kind == "SKIP":
+        if ch == "'":
+            value, end = _quoted(text, pos, "'")
+            if not text.startswith("!", end):
+                raise FormulaSyntaxError("Sayfa adından sonra '!' bekleniyor", end)
+            append(Token("SHEET", value, pos))
+            pos = end + 1
             continue
 
-        tokens.append(Token(kind, value))
+        raise FormulaSyntaxError(f"Beklenmeyen karakter '{ch}'", pos)
 
     return tokens
 
+
+def _quoted(text: str, pos: int, quote: str):
+    """
+    pos'taki tırnaktan başlayan metni okur (çift tırnak = kaçış).
+    Dönüş: (içerik, kapanıştan sonraki ofset)
+    """
+    parts = []
+    start = pos + 1
+    while True:
+        end = text.find(quote, start)
+        if end < 0:
+            raise FormulaSyntaxError("Kapanmamış tırnak", pos)
+        parts.append(text[start:end])
+        if not text.startswith(quote, end + 1):
+            return quote.join(parts), end + 1
+        start = end + 2
+
 # ======================================================
 # PARSER
 # ======================================================
 
+# karşılaştırma operatörleri → değerlendiricinin kullandığı biçim
+COMPARISON_OPS = {
+    "=": "==",
+    "==": "==",
+    "<>": "!=",
+    "!=": "!=",
+    "<": "<",
+    "<=": "<=",
+    ">": ">",
+    ">=": ">=",
+}
+
 class Parser:
-    def __init__(self):
+    def __init__(self, nodes: NodeFactory = None):
         self.tokens = []
         self.pos = 0
+        self.length = 0
+
+        # tüm formüller arasında paylaşılan (hash-consed) düğümler
+        self.nodes = nodes if nodes is not None else NodeFactory()
 
     # ------------------
     # Helpers
@@ -76,10 +237,12 @@ class Parser:
     def eat(self, token_type=None):
         token = self.current()
         if token is None:
+            if token_type:
+                raise FormulaSyntaxError(f"Beklenen {token_type}, formül bitti", self.length)
             return None
 
         if token_type and token.type != token_type:
-            raise SyntaxError(f"Beklenen {token_type}, gelen {token.type}")
+            raise FormulaSyntaxError(f"Beklenen {token_type}, gelen {token.type}", token.pos)
 
         self.pos += 1
         return token
@@ -91,10 +254,12 @@ class Parser:
     def parse(self, formula: str) -> ASTNode:
         self.tokens = tokenize(formula)
         self.pos = 0
+        self.length = len(formula)
 
         node = self.expression()
-        if self.current() is not None:
-            raise SyntaxError("Beklenmeyen token")
+        token = self.current()
+        if token is not None:
+            raise FormulaSyntaxError(f"Beklenmeyen token: {token.value}", token.pos)
         return node
 
     # ==================================================
@@ -105,14 +270,14 @@ class Parser:
     def expression(self):
         return self.comparison()
 
-    # comparison → term ( (== | != | < | > | <= | >=) term )*
+    # comparison → term ( (= | == | != | <> | < | > | <= | >=) term )*
     def comparison(self):
         node = self.term()
 
-        while self.current() and self.current().type == "OP":
-            op = self.eat("OP").value
+        while self.current() and self.current().value in COMPARISON_OPS:
+            op = COMPARISON_OPS[self.eat("OP").value]
             right = self.term()
-            node = BinaryOp(node, op, right)
+            node = self.nodes(BinaryOp, node, op, right)
 
         return node
 
@@ -123,7 +288,7 @@ class Parser:
         while self.current() and self.current().value in ("+", "-"):
             op = self.eat("OP").value
             right = self.factor()
-            node = BinaryOp(node, op, right)
+            node = self.nodes(BinaryOp, node, op, right)
 
         return node
     
@@ -133,7 +298,7 @@ class Parser:
         if self.current() and self.current().value == "^":
             self.eat("OP")
             right = self.power()   # sağa bağlı (right associative)
-            return BinaryOp(node, "^", right)
+            return self.nodes(BinaryOp, node, "^", right)
 
         return node
 
@@ -144,7 +309,7 @@ class Parser:
         while self.current() and self.current().value in ("*", "/"):
             op = self.eat("OP").value
             right = self.power()
-            node = BinaryOp(node, op, right)
+            node = self.nodes(BinaryOp, node, op, right)
 
         return node
     
@@ -154,7 +319,7 @@ class Parser:
         if token and token.type == "OP" and token.value in ("+", "-"):
             op = self.eat("OP").value
             operand = self.unary()
-            return UnaryOp(op, operand)
+            return self.nodes(UnaryOp, op, operand)
 
         return self.primary()
 
@@ -162,37 +327,75 @@ class Parser:
     def primary(self):
         token = self.current()
 
+        if token is None:
+            raise FormulaSyntaxError("Beklenmeyen formül sonu", self.length)
+
         if token.type == "NUMBER":
             self.eat("NUMBER")
-            return Number(float(token.value))
+            return self.nodes(Number, float(token.value))
 
-        if token.type == "CELL":
-            start = self.eat("CELL").value
+        if token.type == "STRING":
+            self.eat("STRING")
+            return self.nodes(String, token.value)
 
-            if self.current() and self.current().type == "COLON":
-                self.eat("COLON")
-                end = self.eat("CELL").value
-                return Range(Cell(start), Cell(end))
+        if token.type == "BOOL":
+            self.eat("BOOL")
+            return self.nodes(Boolean, token.value == "TRUE")
 
-            return Cell(start)
+        if token.type == "SHEET":
+            sheet = self.eat("SHEET").value
+            return self.nodes(SheetRef, sheet, self.reference())
+
+        if token.type in ("CELL", "COLUMNS", "ROWS"):
+            return self.reference()
 
         if token.type == "NAME":
             return self.function_or_name()
 
+        if token.type == "TABLE":
+            table, item = self.eat("TABLE").value
+            return self.nodes(TableRef, table, item)
+
         if token.type == "LPAREN":
             self.eat("LPAREN")
             node = self.expression()
             self.eat("RPAREN")
             return node
 
-        raise SyntaxError(f"Beklenmeyen token: {token}")
+        raise FormulaSyntaxError(f"Beklenmeyen token: {token.value}", token.pos)
     
+    # reference → CELL ( : CELL )? | COLUMNS | ROWS
+    def reference(self):
+        token = self.current()
+
+        if token is not None and token.type == "COLUMNS":
+            self.eat("COLUMNS")
+            start, end = (column_index(part) for part in token.value.split(":"))
+            return self.nodes(ColumnRange, min(start, end), max(start, end))
+
+        if token is not None and token.type == "ROWS":
+            self.eat("ROWS")
+            start, end = (int(part.replace("$", "")) - 1 for part in token.value.split(":"))
+            if min(start, end) < 0:
+                raise FormulaSyntaxError(f"Geçersiz satır aralığı: {token.value}", token.pos)
+            return self.nodes(RowRange, min(start, end), max(start, end))
+
+        start = self.eat("CELL").value
+
+        if self.current() and self.current().type == "COLON":
+            self.eat("COLON")
+            end = self.eat("CELL").value
+            return self.nodes(Range, self.nodes(Cell, start), self.nodes(Cell, end))
+
+        return self.nodes(Cell, start)
+
     # ==================================================
     # FUNCTIONS & LAMBDA
     # ==================================================
 
     def function_or_name(self):
-        name = self.eat("NAME").value.upper()
+        token = self.eat("NAME")
+        name = token.value.upper()
 
         if self.current() and self.current().type == "LPAREN":
             self.eat("LPAREN")
@@ -205,13 +408,14 @@ class Parser:
                     if isinstance(a, Cell):
                         params.append(a.ref)
                     else:
-                        raise SyntaxError("LAMBDA parametreleri isim olmalı")
+                        raise FormulaSyntaxError("LAMBDA parametreleri isim olmalı", token.pos)
 
-                return Lambda(params, args[-1])
+                return self.nodes(Lambda, params, args[-1])
 
-            return Function(name, args)
+            return self.nodes(Function, name, args)
 
-        raise SyntaxError(f"Fonksiyon çağrısı bekleniyor: {name}")
+        # parantezsiz isim: tanımlı isim (derlemede çözülür)
+        return self.nodes(Name, token.value)
 
     def arguments(self):
         args = []
@@ -0,0 +1,295 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from aggregates import ExactSum
+from cell_store import display_value
+from sorting import typed_sort_key
+
+AGGREGATES = ("SUM", "COUNT", "AVERAGE", "MIN", "MAX")
+
+Key = Tuple[Any, ...]
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class Aggregate:
+    """
+    Bir grubun toplu durumu. SUM/COUNT/AVERAGE çıkarmayla güncellenir
+    (toplam tam tutulur: refresh build ile aynı sonucu verir);
+    MIN/MAX'ta uç değer silinirse grup satırlarından yeniden hesaplanır.
+    """
+    __slots__ = ("rows", "total", "count", "low", "high", "stale")
+
+    def __init__(self):
+        self.rows: Set[int] = set()
+        self.total = ExactSum()
+        self.count = 0
+        self.low = None
+        self.high = None
+        self.stale = False
+
+    def add(self, row: int, value: Any):
+        self.rows.add(row)
+        if not _is_number(value):
+            return
+        self.total.add(value)
+        self.count += 1
+        if self.low is None or value < self.low:
+            self.low = value
+        if self.high is None or value > self.high:
+            self.high = value
+
+    def remove(self, row: int, value: Any):
+        self.rows.discard(row)
+        if not _is_number(value):
+            return
+        self.total.remove(value)
+        self.count -= 1
+        if value == self.low or value == self.high:
+            self.stale = True
+
+    def result(self, func: str) -> Any:
+        if func == "SUM":
+            return self.total.value()
+        if func == "COUNT":
+            return self.count
+        if func == "AVERAGE":
+            return self.total.mean(self.count) if self.count else 0
+        if func == "MIN":
+            return self.low if self.low is not None else 0
+        if func == "MAX":
+            return self.high if self.high is not None else 0
+        raise ValueError(f"Bilinmeyen fonksiyon: {func}")
+
+
+class PivotTable:
+    """
+    Kaynak aralığı (ilk satır başlık) satır/sütun alanlarına göre
+    hash ile gruplayıp tek geçişte toplar; sonucu target hücresinden
+    başlayan bloğa yazılacak (row, col, text) listesi olarak üretir.
+
+    Kaynak değişince refresh() yalnızca değişen satırların katkısını
+    geri alıp yeniden ekler: maliyet O(değişen satır).
+    """
+
+    def __init__(
+        self,
+        store,
+        source: Tuple[int, int, int, int],
+        row_fields: Sequence[int],
+        value_field: int,
+        func: str = "SUM",
+        column_fields: Sequence[int] = (),
+        target: Optional[Tuple[int, int]] = None,
+    ):
+        if func not in AGGREGATES:
+            raise ValueError(f"Bilinmeyen fonksiyon: {func}")
+
+        self.store = store
+        self.top, self.left, self.bottom, self.right = source
+        self.row_fields = tuple(row_fields)
+        self.column_fields = tuple(column_fields)
+        self.value_field = value_field
+        self.func = func
+        self.target = target or (self.top, self.right + 2)
+
+        self.groups: Dict[Tuple[Key, Key], Aggregate] = {}
+        self._contrib: Dict[int, Tuple[Key, Key, Any]] = {}
+        self._row_keys: Dict[Key, int] = {}
+        self._col_keys: Dict[Key, int] = {}
+
+        # son çizilen yerleşim: anahtar → blok içi konum, hücre → metin
+        self._row_pos: Dict[Key, int] = {}
+        self._col_pos: Dict[Key, int] = {}
+        self._cells: Dict[Tuple[int, int], str] = {}
+        self._layout_dirty = True
+        self._dirty: Set[Tuple[Key, Key]] = set()
+
+        self._fields = set(self.row_fields) | set(self.column_fields) | {value_field}
+
+    # =====================================================
+    # BUILD
+    # =====================================================
+    def build(self) -> List[Tuple[int, int, str]]:
+        self.groups.clear()
+        self._contrib.clear()
+        self._row_keys.clear()
+        self._col_keys.clear()
+        self._layout_dirty = True
+
+        for row in range(self.top + 1, self.bottom + 1):
+            self._add_row(row)
+
+        return self._render()
+
+    def refresh(self, cells: Iterable[Tuple[int, int]]) -> List[Tuple[int, int, str]]:
+        """
+        Değişen kaynak hücreleri → yazılması gereken çıktı hücreleri
+        """
+        rows = {
+            r for r, c in cells
+            if self.top < r <= self.bottom and c in self._fields
+        }
+        if not rows:
+            return []
+
+        for row in rows:
+            self._remove_row(row)
+            self._add_row(row)
+
+        return self._render()
+
+    def _add_row(self, row: int):
+        get = self.store.get
+        if all(get(row, c) is None for c in self._fields):
+            return
+
+        row_key = tuple(get(row, c) for c in self.row_fields)
+        col_key = tuple(get(row, c) for c in self.column_fields)
+        value = get(row, self.value_field)
+        self._contrib[row] = (row_key, col_key, value)
+
+        self._retain(self._row_keys, row_key)
+        self._retain(self._col_keys, col_key)
+
+        for key in self._group_keys(row_key, col_key):
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = Aggregate()
+            group.add(row, value)
+            self._dirty.add(key)
+
+    def _remove_row(self, row: int):
+        contrib = self._contrib.pop(row, None)
+        if contrib is None:
+            return
+
+        row_key, col_key, value = contrib
+        self._release(self._row_keys, row_key)
+        self._release(self._col_keys, col_key)
+
+        for key in self._group_keys(row_key, col_key):
+            group = self.groups[key]
+            group.remove(row, value)
+            if not group.rows:
+                del self.groups[key]
+            self._dirty.add(key)
+
+    def _group_keys(self, row_key: Key, col_key: Key):
+        # satır toplamı + genel toplam (+ sütun alanı varsa kesişim ve sütun toplamı)
+        if not self.column_fields:
+            return ((row_key, None), (None, None))
+        return ((row_key, col_key), (row_key, None), (None, col_key), (None, None))
+
+    def _retain(self, counter: Dict[Key, int], key: Key):
+        count = counter.get(key, 0)
+        if not count:
+            self._layout_dirty = True
+        counter[key] = count + 1
+
+    def _release(self, counter: Dict[Key, int], key: Key):
+        counter[key] -= 1
+        if not counter[key]:
+            del counter[key]
+            self._layout_dirty = True
+
+    # =====================================================
+    # RENDER
+    # =====================================================
+    def _result(self, key) -> str:
+        group = self.groups.get(key)
+        if group is None:
+            return ""
+        if group.stale:
+            self._rebuild_extremes(group)
+        return display_value(group.result(self.func))
+
+    def _rebuild_extremes(self, group: Aggregate):
+        numbers = [
+            v for v in (self.store.get(r, self.value_field) for r in group.rows)
+            if _is_number(v)
+        ]
+        group.low = min(numbers) if numbers else None
+        group.high = max(numbers) if numbers else None
+        group.stale = False
+
+    def _render(self) -> List[Tuple[int, int, str]]:
+        """
+        Yerleşim (anahtar kümesi) değişmediyse yalnızca kirli grupların
+        hücreleri; değiştiyse tüm blok yeniden dizilir. Her iki durumda da
+        yalnızca metni değişen hücreler döner.
+        """
+        if not self._layout_dirty:
+            entries = []
+            for key in self._dirty:
+                pos = self._position(key)
+                text = self._result(key)
+                if self._cells.get(pos) != text:
+                    self._cells[pos] = text
+                    entries.append((pos[0], pos[1], text))
+            self._dirty.clear()
+            return entries
+
+        cells = self._render_layout()
+        self._dirty.clear()
+
+        entries = [(r, c, text) for (r, c), text in cells.items() if self._cells.get((r, c)) != text]
+        entries += [(r, c, "") for (r, c) in self._cells if (r, c) not in cells]
+
+        self._cells = cells
+        return entries
+
+    def _render_layout(self) -> Dict[Tuple[int, int], str]:
+        row_keys = sorted(self._row_keys, key=_key_order)
+        col_keys = sorted(self._col_keys, key=_key_order) if self.column_fields else []
+        self._row_pos = {key: i for i, key in enumerate(row_keys)}
+        self._col_pos = {key: j for j, key in enumerate(col_keys)}
+        self._layout_dirty = False
+
+        t_row, t_col = self.target
+        cells: Dict[Tuple[int, int], str] = {}
+
+        # başlık
+        cells[(t_row, t_col)] = " / ".join(self._header(c) for c in self.row_fields)
+        if col_keys:
+            for j, col_key in enumerate(col_keys):
+                cells[(t_row, t_col + 1 + j)] = _label(col_key)
+            cells[(t_row, t_col + 1 + len(col_keys))] = "Grand Total"
+        else:
+            cells[(t_row, t_col + 1)] = f"{self.func} of {self._header(self.value_field)}"
+
+        # satır etiketleri + genel toplam satırı
+        for row_key, i in self._row_pos.items():
+            cells[(t_row + 1 + i, t_col)] = _label(row_key)
+        cells[(t_row + 1 + len(row_keys), t_col)] = "Grand Total"
+
+        # değerler: önce boş ızgara, sonra dolu gruplar
+        for i in range(len(row_keys) + 1):
+            for j in range(len(col_keys) + 1):
+                cells[(t_row + 1 + i, t_col + 1 + j)] = ""
+        for key in self.groups:
+            cells[self._position(key)] = self._result(key)
+
+        return cells
+
+    def _position(self, key: Tuple[Key, Key]) -> Tuple[int, int]:
+        row_key, col_key = key
+        t_row, t_col = self.target
+        i = self._row_pos[row_key] if row_key is not None else len(self._row_pos)
+        j = self._col_pos[col_key] if col_key is not None else len(self._col_pos)
+        return t_row + 1 + i, t_col + 1 + j
+
+    def _header(self, col: int) -> str:
+        return display_value(self.store.get(self.top, col)) or f"Column {col + 1}"
+
+    def covers(self, row: int, col: int) -> bool:
+        return self.top <= row <= self.bottom and self.left <= col <= self.right
+
+
+def _label(key: Key) -> str:
+    return " / ".join(display_value(v) if v is not None else "(blank)" for v in key)
+
+
+def _key_order(key: Key):
+    return tuple((1, 0) if v is None else (0, typed_sort_key(v)) for v in key)
@@ -0,0 +1,483 @@
+import operator
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from ast_nodes import (
+    ASTNode,
+    Number,
+    Cell,
+    Range,
+    ColumnRange,
+    RowRange,
+    RelCell,
+    RelRange,
+    SheetRef,
+    UnaryOp,
+    BinaryOp,
+    Function,
+    If,
+    Lambda,
+    NodeFactory,
+)
+from bulk_parse import parse_many
+from optimizer import Optimizer
+from utils import cell_to_index, column_name, index_to_cell, to_r1c1
+
+_REF_PARTS = re.compile(r"^(\$?)([A-Z]+)(\$?)([0-9]+)$")
+
+# bu kadar hücreden büyük aralıklar grafiğe hücre hücre değil tek
+# ("rect", ...) alanı olarak yazılır: SUM(A1:A100000) 100000 kenar açmaz
+RANGE_AREA_CELLS = 256
+
+# kullanılmayan Program'lar en az bu kadar yeni şekil eklenince taranır
+SWEEP_PROGRAMS = 256
+
+# sütun bazlı (vektörel) değerlendirilebilen operatörler
+VECTOR_OPS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "^": operator.pow,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+
+# =========================
+# A1 → GÖRELİ AST
+# =========================
+
+def relativize(node: ASTNode, row: int, col: int, make: NodeFactory) -> ASTNode:
+    """
+    A1 referanslı AST'yi (row, col) hücresine göre göreli AST'ye çevirir;
+    sonuç aynı şekle sahip tüm hücrelerde paylaşılabilir. Düğümler
+    make (NodeFactory) ile üretilir: programlar arası ortak alt ağaçlar tekil.
+    """
+    if isinstance(node, Cell):
+        return _relative_cell(node.ref, row, col, make)
+
+    if isinstance(node, Range):
+        return make(
+            RelRange,
+            _relative_cell(node.start.ref, row, col, make),
+            _relative_cell(node.end.ref, row, col, make),
+        )
+
+    if isinstance(node, SheetRef):
+        return make(SheetRef, node.sheet, relativize(node.ref, row, col, make))
+
+    if isinstance(node, BinaryOp):
+        return make(BinaryOp, relativize(node.left, row, col, make), node.op, relativize(node.right, row, col, make))
+
+    if isinstance(node, UnaryOp):
+        return make(UnaryOp, node.op, relativize(node.operand, row, col, make))
+
+    if isinstance(node, Function):
+        return make(Function, node.name, [relativize(arg, row, col, make) for arg in node.args])
+
+    if isinstance(node, If):
+        return make(
+            If,
+            relativize(node.condition, row, col, make),
+            relativize(node.true_expr, row, col, make),
+            relativize(node.false_expr, row, col, make),
+        )
+
+    if isinstance(node, Lambda):
+        return make(
+            Lambda,
+            node.params,
+            relativize(node.body, row, col, make),
+            [(name, relativize(expr, row, col, make)) for name, expr in node.bindings],
+        )
+
+    return node
+
+
+def _relative_cell(ref: str, row: int, col: int, make: NodeFactory) -> RelCell:
+    col_abs, col_name, row_abs, row_text = _REF_PARTS.match(ref).groups()
+    r, c = cell_to_index(col_name + row_text)
+    return make(
+        RelCell,
+        r if row_abs else r - row,
+        c if col_abs else c - col,
+        bool(row_abs),
+        bool(col_abs),
+    )
+
+
+def _walk(node: ASTNode):
+    yield node
+    if isinstance(node, BinaryOp):
+        yield from _walk(node.left)
+        yield from _walk(node.right)
+    elif isinstance(node, UnaryOp):
+        yield from _walk(node.operand)
+    elif isinstance(node, Function):
+        for arg in node.args:
+            yield from _walk(arg)
+    elif isinstance(node, If):
+        yield from _walk(node.condition)
+        yield from _walk(node.true_expr)
+        yield from _walk(node.false_expr)
+    elif isinstance(node, Lambda):
+        for _, expr in node.bindings:
+            yield from _walk(expr)
+        yield from _walk(node.body)
+
+
+# =========================
+# PROGRAM
+# =========================
+
+class _NotVector(Exception):
+    pass
+
+
+class Program:
+    """
+    Bir formül şeklinin (R1C1) derlenmiş hali. Aynı şekle sahip tüm
+    hücreler tek bir Program'ı paylaşır; hücreye özgü tek bilgi anchor'dır.
+    """
+    __slots__ = ("shape", "ast", "cells", "ranges", "areas", "external", "external_areas", "names", "vector")
+
+    def __init__(self, shape: str, ast: ASTNode, names: FrozenSet[str] = frozenset()):
+        self.shape = shape
+        self.ast = ast
+
+        # derlemede çözülen tanımlı isimler (isim → formül kenarları için)
+        self.names = names
+
+        # bağımlılıklar: anchor'a göre çözülecek referanslar (bir kez toplanır);
+        # tüm sütun/satırlar (mutlak) grafiğe tek alan olarak, başka
+        # sayfaya olanlar (SheetRef) ayrı tutulur
+        self.ranges = []
+        self.cells = []
+        self.areas = []
+        self.external = []
+        self.external_areas = []
+        for n in _walk(ast):
+            if isinstance(n, RelRange):
+                self.ranges.append(n)
+            elif isinstance(n, RelCell):
+                self.cells.append(n)
+            elif isinstance(n, (ColumnRange, RowRange)):
+                self.areas.append(_area(n))
+            elif isinstance(n, SheetRef):
+                if isinstance(n.ref, (ColumnRange, RowRange)):
+                    self.external_areas.append((n.sheet, _area(n.ref)))
+                else:
+                    self.external.append(n)
+
+        self.vector = _vectorizable(ast)
+
+    def dependencies(self, row: int, col: int) -> Set[str]:
+        deps = set()
+        for ref in self.cells:
+            r, c = _resolve(ref, row, col)
+            if r >= 0 and c >= 0:
+                deps.add(index_to_cell(r, c))
+
+        for r1, c1, r2, c2 in self._range_bounds(row, col):
+            if (r2 - r1 + 1) * (c2 - c1 + 1) > RANGE_AREA_CELLS:
+                continue
+            for r in range(r1, r2 + 1):
+                for c in range(c1, c2 + 1):
+                    deps.add(index_to_cell(r, c))
+
+        return deps
+
+    def range_areas(self, row: int, col: int) -> list:
+        """
+        dependencies()'in genişletmediği büyük aralıklar: [("rect", r1, c1, r2, c2), ...]
+        """
+        return [
+            ("rect", r1, c1, r2, c2)
+            for r1, c1, r2, c2 in self._range_bounds(row, col)
+            if (r2 - r1 + 1) * (c2 - c1 + 1) > RANGE_AREA_CELLS
+        ]
+
+    def _range_bounds(self, row: int, col: int):
+        for rng in self.ranges:
+            r1, c1 = _resolve(rng.start, row, col)
+            r2, c2 = _resolve(rng.end, row, col)
+            if min(r1, r2, c1, c2) >= 0:
+                yield min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2)
+
+    def external_dependencies(self, row: int, col: int) -> Set[tuple]:
+        """
+        Başka sayfalardaki girdiler: {(sayfa adı, "A1"), ...}
+        """
+        deps = set()
+        for ref in self.external:
+            target = ref.ref
+            if isinstance(target, RelCell):
+                r, c = _resolve(target, row, col)
+                if r >= 0 and c >= 0:
+                    deps.add((ref.sheet, index_to_cell(r, c)))
+                continue
+
+            r1, c1 = _resolve(target.start, row, col)
+            r2, c2 = _resolve(target.end, row, col)
+            if min(r1, r2, c1, c2) < 0:
+                continue
+            for r in range(min(r1, r2), max(r1, r2) + 1):
+                for c in range(min(c1, c2), max(c1, c2) + 1):
+                    deps.add((ref.sheet, index_to_cell(r, c)))
+        return deps
+
+    def dependency_block(self, targets: List[tuple]):
+        """
+        Çok hücre için bağımlılık kümeleri (fill). Yalnızca tekil
+        referanslı programlarda hızlı yol; sütun adları bir kez çözülür.
+        """
+        if self.ranges:
+            return [self.dependencies(r, c) for r, c in targets]
+
+        refs = [(ref.row, ref.col, ref.row_abs, ref.col_abs) for ref in self.cells]
+        if not all(col_abs for _, _, _, col_abs in refs) and len({c for _, c in targets}) > 1:
+            return [self.dependencies(r, c) for r, c in targets]
+
+        # tek sütun (ya da sütunu sabit referanslar): sütun adları sabit
+        col = targets[0][1]
+        fixed = []
+        for dr, dc, row_abs, col_abs in refs:
+            c = dc if col_abs else col + dc
+            if c < 0:
+                return [self.dependencies(r, c) for r, c in targets]
+            fixed.append((dr, row_abs, column_name(c)))
+
+        absolute = {f"{name}{dr + 1}" for dr, row_abs, name in fixed if row_abs}
+        relative = [(dr, name) for dr, row_abs, name in fixed if not row_abs]
+
+        block = []
+        for r, _ in targets:
+            deps = set(absolute)
+            for dr, name in relative:
+                if r + dr >= 0:
+                    deps.add(f"{name}{r + dr + 1}")
+            block.append(deps)
+        return block
+
+    def block_reads(self, col: int, top: int):
+        """
+        col sütununda top'tan başlayan blok olarak bağlanabilirse okuma
+        şekli: ([(satır farkı, okunan sütun)], {"B1", ...}). Yalnızca tekil
+        hücre referanslı ve kendi sütununu okumayan programlar; aksi
+        halde None (hücre hücre bağlanır).
+        """
+        if self.ranges or self.areas or self.external or self.external_areas or self.names:
+            return None
+
+        relative, absolute = set(), set()
+        for ref in self.cells:
+            c = ref.col if ref.col_abs else col + ref.col
+            if c < 0 or c == col:
+                return None
+            if ref.row_abs:
+                absolute.add(index_to_cell(ref.row, c))
+            elif top + ref.row < 0:
+                return None
+            else:
+                relative.add((ref.row, c))
+        return sorted(relative), frozenset(absolute)
+
+    def evaluate_column(self, store, rows: List[int], col: int) -> Optional[List[Any]]:
+        """
+        Aynı sütundaki birbirinden bağımsız hücreleri tek geçişte hesaplar.
+        Herhangi bir hata olursa None döner (çağıran hücre hücre hesaplar).
+        """
+        try:
+            values = _vector(self.ast, store, rows, col)
+        except (_NotVector, ArithmeticError, TypeError, ValueError):
+            return None
+
+        if not isinstance(values, list):
+            return [values] * len(rows)
+        return values
+
+
+def _area(node) -> tuple:
+    """
+    DependencyGraph alanı: ("col", ilk, son) / ("row", ilk, son)
+    """
+    return ("col" if isinstance(node, ColumnRange) else "row", node.start, node.end)
+
+
+def _resolve(ref: RelCell, row: int, col: int):
+    return (
+        ref.row if ref.row_abs else row + ref.row,
+        ref.col if ref.col_abs else col + ref.col,
+    )
+
+
+def _vectorizable(node: ASTNode) -> bool:
+    if isinstance(node, (Number, RelCell)):
+        return True
+    if isinstance(node, BinaryOp):
+        return node.op in VECTOR_OPS and _vectorizable(node.left) and _vectorizable(node.right)
+    return False
+
+
+def _vector(node: ASTNode, store, rows: List[int], col: int):
+    """
+    Skaler (tüm satırlar için aynı) ya da satır başına değer listesi
+    """
+    if isinstance(node, Number):
+        return node.value
+
+    if isinstance(node, RelCell):
+        c = node.col if node.col_abs else col + node.col
+        if c < 0:
+            raise _NotVector()
+
+        if node.row_abs:
+            value = store.get(node.row, c)
+            return 0 if value is None else value
+
+        if rows[0] + node.row < 0:
+            raise _NotVector()
+
+        column = store.column(c)
+        dr = node.row
+        return [0 if v is None else v for v in (column.get(r + dr) for r in rows)]
+
+    if isinstance(node, BinaryOp):
+        fn = VECTOR_OPS[node.op]
+        left = _vector(node.left, store, rows, col)
+        right = _vector(node.right, store, rows, col)
+
+        if isinstance(left, list):
+            if isinstance(right, list):
+                return list(map(fn, left, right))
+            return [fn(x, right) for x in left]
+        if isinstance(right, list):
+            return [fn(left, x) for x in right]
+        return fn(left, right)
+
+    raise _NotVector()
+
+
+# =========================
+# PROGRAM TABLE
+# =========================
+
+class ProgramTable:
+    """
+    Şekil anahtarı (R1C1 metni) → tekilleştirilmiş Program.
+    Bir şekil yalnızca ilk görüldüğünde parse edilir ve optimize edilir.
+    Tanımlı isimler ve tablo referansları (names verilmişse)
+    optimizasyondan önce çözülür: sabit isimler katlanabilir,
+    referanslar normal bağımlılık olur. sheet: derlenen sayfanın anahtarı.
+    Hiçbir hücrenin kullanmadığı Program'lar release() ile düşer; boşalan
+    id'ler yeniden kullanılır (düğüm fabrikası AST'leri zayıf tutar).
+    """
+
+    def __init__(self, parser, names=None, sheet=None):
+        self.parser = parser
+        self.names = names
+        self.sheet = sheet
+        self.optimizer = Optimizer(parser.nodes)
+        self._programs: List[Optional[Program]] = []
+        self._ids: Dict[str, int] = {}
+        self._free: List[int] = []
+
+        # son release'ten beri eklenen / o an canlı Program sayısı
+        self.added = 0
+        self.live = 0
+
+        # isim anahtarı -> o ismi kullanan şekiller
+        self._by_name: Dict[str, Set[str]] = {}
+
+    def compile(self, formula: str, row: int, col: int) -> int:
+        shape = to_r1c1(formula, row, col)
+        program_id = self._ids.get(shape)
+        if program_id is None:
+            program_id = self._add(shape, self.parser.parse(formula), row, col)
+        return program_id
+
+    def precompile(self, entries: List[tuple]):
+        """
+        Toplu yükleme öncesi: henüz görülmemiş şekillerin temsilci
+        formülleri parse_many ile (yeterince çoksa paralel) parse edilir.
+        Sonraki compile() çağrıları önbellekten döner; parse edilemeyen
+        formüller kaydedilmez (compile hatayı yine kendisi verir).
+        entries: [(formula, row, col), ...]
+        """
+        pending = {}
+        for formula, row, col in entries:
+            shape = to_r1c1(formula, row, col)
+            if shape not in self._ids and shape not in pending:
+                pending[shape] = (formula, row, col)
+
+        parsed = parse_many([formula for formula, _, _ in pending.values()], nodes=self.parser.nodes)
+        for (shape, (_, row, col)), result in zip(pending.items(), parsed):
+            if result.ast is not None:
+                self._add(shape, result.ast, row, col)
+
+    def _add(self, shape: str, ast: ASTNode, row: int, col: int) -> int:
+        names = frozenset()
+        if self.names is not None:
+            ast, names = self.names.resolve(ast, self.parser.nodes, self.sheet)
+            for key in names:
+                self._by_name.setdefault(key, set()).add(shape)
+
+        ast = relativize(self.optimizer.optimize(ast), row, col, self.parser.nodes)
+        program = Program(shape, ast, names)
+        if self._free:
+            program_id = self._free.pop()
+            self._programs[program_id] = program
+        else:
+            program_id = len(self._programs)
+            self._programs.append(program)
+        self._ids[shape] = program_id
+        self.added += 1
+        return program_id
+
+    def sweep_due(self) -> bool:
+        """
+        Yeni şekil sayısı son taramadaki canlı sayıyı aşınca (amortize)
+        """
+        return self.added > max(SWEEP_PROGRAMS, self.live)
+
+    def release(self, live: Set[int]):
+        """
+        live dışındaki Program'lar düşer; şekilleri sonraki compile()'da
+        yeniden derlenir
+        """
+        for program_id, program in enumerate(self._programs):
+            if program is None or program_id in live:
+                continue
+            self._programs[program_id] = None
+            self._free.append(program_id)
+            if self._ids.get(program.shape) == program_id:
+                del self._ids[program.shape]
+                for key in program.names:
+                    shapes = self._by_name.get(key)
+                    if shapes is not None:
+                        shapes.discard(program.shape)
+                        if not shapes:
+                            del self._by_name[key]
+        self.added = 0
+        self.live = len(self._programs) - len(self._free)
+
+    def forget(self, keys: Iterable[str]):
+        """
+        Tanımı değişen isimleri kullanan şekiller önbellekten düşer:
+        sonraki compile() onları yeni tanımla derler. Eski Program'lar
+        yeniden bağlanana kadar hücrelerde geçerli kalır.
+        """
+        for key in keys:
+            for shape in self._by_name.pop(key, ()):
+                self._ids.pop(shape, None)
+
+    def get(self, program_id: int) -> Program:
+        return self._programs[program_id]
+
+    def __len__(self):
+        return len(self._programs) - len(self._free)
@@ -0,0 +1,391 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from cell_store import display_value
+
+Cell = Tuple[int, int]   # (row, col)
+
+# Excel'in "Look in" seçenekleri: formül kaynağı / görünen değer
+LOOK_IN = ("formulas", "values")
+
+GRAM = 3
+
+# düzenli ifadede literal parçayı kesen karakterler
+_QUANTIFIERS = frozenset("*?")
+_META = frozenset(".^$+()[]{}|") | _QUANTIFIERS
+
+
+class _CaseFold(dict):
+    """
+    str.translate tablosu: karakter -> tek karakterlik harf duyarsız
+    karşılığı, ilk görüldüğünde hesaplanır. re.IGNORECASE'in eşdeğerlerini
+    birleştirir (I/ı/İ/i, S/ſ, Σ/ς/σ ...): casefold() İ'yi iki karaktere,
+    ı'yı kendisine çevirir ve dizin "İstanbul" ile "istanbul"u ayırırdı.
+    Karakter başına tek karakter: sorgunun n-gram'ları eşleşen metinde kalır.
+    """
+
+    # büyük harfi de çok karakterli olup re'nin eşdeğer saydıkları
+    _PAIRS = {"\u1fd3": "\u0390", "\u1fe3": "\u03b0", "\ufb05": "\ufb06"}
+
+    def __missing__(self, code: int) -> str:
+        char = chr(code)
+        folded = self._PAIRS.get(char)
+        if folded is None:
+            upper = char.upper()
+            folded = upper.lower() if len(upper) == 1 else char.lower()
+            folded = folded[0] if folded else char
+        self[code] = folded
+        return folded
+
+
+_FOLD = _CaseFold()
+
+
+def _grams(text: str) -> Set[str]:
+    """
+    Metnin harf duyarsız n-gram'ları (kısa metinde boş küme)
+    """
+    # ASCII'de karşılık lower() ile aynı (ı, ſ, K da ASCII'ye katlanır)
+    text = text.lower() if text.isascii() else text.translate(_FOLD)
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+# =========================
+# TERS DİZİN
+# =========================
+
+class TextIndex:
+    """
+    Hücre metinleri üzerinde n-gram ters dizini.
+
+    texts  : hücre -> metin (boş hücreler yok)
+    grams  : n-gram -> o n-gram'ı içeren hücreler
+    Bir hücrenin yeniden yazılması yalnızca eski ve yeni metninin
+    n-gram'larına dokunur; sorgu en küçük listeden başlayarak kesişir.
+    """
+    __slots__ = ("texts", "grams")
+
+    def __init__(self):
+        self.texts: Dict[Cell, str] = {}
+        self.grams: Dict[str, Set[Cell]] = {}
+
+    def set(self, cell: Cell, text: str):
+        old = self.texts.get(cell)
+        if old == (text or None):
+            return
+
+        grams = self.grams
+        if old is not None:
+            del self.texts[cell]
+            for gram in _grams(old):
+                postings = grams[gram]
+                postings.discard(cell)
+                if not postings:
+                    del grams[gram]
+
+        if text:
+            self.texts[cell] = text
+            for gram in _grams(text):
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = set()
+                postings.add(cell)
+
+    def load(self, items: Iterable[Tuple[Cell, str]]):
+        """
+        Boş dizine toplu yükleme (ilk arama): eski metin aranmaz
+        """
+        texts, grams = self.texts, self.grams
+        for cell, text in items:
+            if not text:
+                continue
+            texts[cell] = text
+            for gram in _grams(text):
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = set()
+                postings.add(cell)
+
+    def candidates(self, literal: Optional[str]) -> Iterable[Cell]:
+        """
+        literal'i (harf duyarsız) içerebilecek hücreler. literal n-gram'dan
+        kısaysa ya da yoksa tüm dolu hücreler (yalnızca metinler taranır).
+        """
+        wanted = _grams(literal) if literal else ()
+        if not wanted:
+            return self.texts.keys()
+
+        postings = sorted((self.grams.get(gram, ()) for gram in wanted), key=len)
+        result = set(postings[0])
+        for cells in postings[1:]:
+            if not result:
+                break
+            result &= cells
+        return result
+
+    def __len__(self):
+        return len(self.texts)
+
+
+# =========================
+# SORGU
+# =========================
+
+class Query:
+    """
+    Bul/Değiştir sorgusu; her kip tek bir derlenmiş desene indirgenir.
+
+    match_case : harf duyarlı
+    whole_cell : metin hücrenin tamamı olmalı
+    regex      : text düzenli ifadedir (aksi halde literal)
+    literal    : dizin ön süzgeci için desende mutlaka geçen parça
+                 (None → ön süzgeç yok, tüm metinler denenir)
+    Geçersiz düzenli ifade ValueError verir.
+    """
+    __slots__ = ("text", "match_case", "whole_cell", "regex", "pattern", "literal")
+
+    def __init__(self, text: str, match_case: bool = False, whole_cell: bool = False, regex: bool = False):
+        if not text:
+            raise ValueError("Aranacak metin boş")
+
+        self.text = text
+        self.match_case = match_case
+        self.whole_cell = whole_cell
+        self.regex = regex
+
+        try:
+            self.pattern = re.compile(text if regex else re.escape(text), 0 if match_case else re.IGNORECASE)
+        except re.error as error:
+            raise ValueError(f"Geçersiz düzenli ifade: {error}") from None
+
+        self.literal = _required_literal(text) if regex else text
+
+    def matches(self, text: str) -> bool:
+        if self.whole_cell:
+            return self.pattern.fullmatch(text) is not None
+        return self.pattern.search(text) is not None
+
+    def replace(self, text: str, replacement: str) -> str:
+        """
+        Eşleşen parçaları (tüm hücre kipinde hücrenin tamamını) değiştirir.
+        Literal kipte replacement olduğu gibi yazılır; regex kipte \\1, \\g<ad>
+        grupları açılır.
+        """
+        try:
+            if self.whole_cell:
+                match = self.pattern.fullmatch(text)
+                if match is None:
+                    return text
+                return match.expand(replacement) if self.regex else replacement
+            if self.regex:
+                return self.pattern.sub(replacement, text)
+            return self.pattern.sub(lambda _: replacement, text)
+        except (re.error, IndexError) as error:
+            raise ValueError(f"Geçersiz değiştirme metni: {error}") from None
+
+    def __repr__(self):
+        return f"Query({self.text!r}, case={self.match_case}, whole={self.whole_cell}, regex={self.regex})"
+
+
+def _required_literal(pattern: str) -> Optional[str]:
+    """
+    Düzenli ifadenin her eşleşmesinde geçen en uzun literal parça (kaba
+    ama güvenli): yalnızca üst düzey karakterler okunur; alternatif (|)
+    ya da satır içi bayrak (?x...) varsa ön süzgeç kullanılmaz.
+    """
+    if "|" in pattern or "(?" in pattern:
+        return None
+
+    runs: List[str] = []
+    run: List[str] = []
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+
+        if char == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            i += 2
+            if depth or escaped.isalnum():
+                # \d, \w, \1 ... ya da grup içi: parça biter
+                runs.append("".join(run))
+                run = []
+            else:
+                run.append(escaped)
+            continue
+
+        if char == "[":
+            # karakter sınıfı: kapanışa kadar atla
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] == "]" else i + 1)
+            i = len(pattern) if end < 0 else end + 1
+            runs.append("".join(run))
+            run = []
+            continue
+
+        if char == "{":
+            # {m,n} tekrarı: önceki karakter isteğe bağlı olabilir
+            end = pattern.find("}", i)
+            if run:
+                run.pop()
+            runs.append("".join(run))
+            run = []
+            i = len(pattern) if end < 0 else end + 1
+            continue
+
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth = max(depth - 1, 0)
+
+        if char in _QUANTIFIERS and run:
+            # önceki karakter isteğe bağlı olabilir
+            run.pop()
+        if char in _META or depth:
+            runs.append("".join(run))
+            run = []
+        else:
+            run.append(char)
+        i += 1
+
+    runs.append("".join(run))
+    return max(runs, key=len) or None
+
+
+# =========================
+# SAYFA DİZİNİ
+# =========================
+
+class SheetIndex:
+    """
+    Bir sayfanın arama dizinleri (Look in başına bir TextIndex).
+
+    Dizin ilk aramada hücre deposundan kurulur; sonra motorun
+    dinleyicisiyle değişen hücreler bekleyen kümeye eklenir ve bir
+    sonraki sorguda yalnızca onlar yeniden dizinlenir: düzenleme ve
+    yapıştırma hızı etkilenmez.
+    """
+    __slots__ = ("engine", "indexes", "pending")
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.indexes: Dict[str, TextIndex] = {}
+        self.pending: Dict[str, Set[Cell]] = {}
+        engine.add_listener(self._on_changed)
+
+    def _on_changed(self, cells):
+        for pending in self.pending.values():
+            pending.update(cells)
+
+    def index(self, look_in: str) -> TextIndex:
+        if look_in not in LOOK_IN:
+            raise ValueError(f"Bilinmeyen arama yeri: {look_in}")
+
+        index = self.indexes.get(look_in)
+        if index is None:
+            index = self.indexes[look_in] = TextIndex()
+            self.pending[look_in] = set()
+            store = self.engine.store
+            if look_in == "values":
+                index.load(((row, col), display_value(value)) for row, col, value in store.cells())
+            else:
+                formulas = store.formulas
+                index.load(
+                    ((row, col), display_value(value)) for row, col, value in store.cells()
+                    if (row, col) not in formulas
+                )
+                index.load((cell, "=" + formula) for cell, formula in formulas.items())
+            return index
+
+        pending = self.pending[look_in]
+        if pending:
+            self.pending[look_in] = set()
+            for cell in pending:
+                index.set(cell, self._text(look_in, cell))
+        return index
+
+    def _text(self, look_in: str, cell: Cell) -> str:
+        store = self.engine.store
+        if look_in == "formulas":
+            return store.source(*cell)
+        return display_value(store.get(*cell))
+
+    def find(self, query: Query, look_in: str = "formulas", limit: Optional[int] = None) -> List[Tuple[int, int, str]]:
+        """
+        Eşleşen hücreler satır sırasıyla: [(row, col, metin)].
+        limit: yazarken arama için ilk limit eşleşmede durulur
+        (adaylar sıralanır, yalnızca gerekenler doğrulanır)
+        """
+        index = self.index(look_in)
+        texts = index.texts
+        matches = query.matches
+        found = []
+        for cell in sorted(index.candidates(query.literal)):
+            text = texts[cell]
+            if matches(text):
+                found.append(cell + (text,))
+                if len(found) == limit:
+                    break
+        return found
+
+    def replacements(self, query: Query, replacement: str) -> List[Tuple[int, int, str]]:
+        """
+        Değiştir: her zaman hücre kaynağı üzerinde (Excel gibi);
+        yalnızca metni gerçekten değişen hücreler [(row, col, yeni kaynak)]
+        """
+        out = []
+        for row, col, text in self.find(query, "formulas"):
+            new = query.replace(text, replacement)
+            if new != text:
+                out.append((row, col, new))
+        return out
+
+
+# =========================
+# ÇALIŞMA KİTABI ARAMASI
+# =========================
+
+class WorkbookSearch:
+    """
+    Sayfa başına SheetIndex; dizin sayfa ilk arandığında kurulur.
+    Aranan ama yüklenmemiş sayfa o an yüklenir.
+    """
+
+    def __init__(self, workbook):
+        self.workbook = workbook
+        self._sheets: Dict[str, SheetIndex] = {}
+
+    def sheet(self, name: str) -> SheetIndex:
+        sheet = self.workbook.sheet(name)
+        index = self._sheets.get(sheet.key)
+        if index is None:
+            index = self._sheets[sheet.key] = SheetIndex(sheet.engine)
+        return index
+
+    def find(self, query: Query, look_in: str = "formulas", sheets: Optional[Iterable[str]] = None,
+             limit: Optional[int] = None) -> List[Tuple[str, int, int, str]]:
+        """
+        [(sayfa, row, col, metin)] – sayfa sırası, sonra satır sırası.
+        sheets None → tüm sayfalar; limit toplam eşleşme sınırı
+        """
+        names = self.workbook.names if sheets is None else list(sheets)
+        found = []
+        for name in names:
+            left = None if limit is None else limit - len(found)
+            if left == 0:
+                break
+            found += [(name, row, col, text) for row, col, text in self.sheet(name).find(query, look_in, left)]
+        return found
+
+    def replace_all(self, query: Query, replacement: str, sheets: Optional[Iterable[str]] = None) -> int:
+        """
+        Başsız Tümünü Değiştir: sayfa başına tek set_cells (tek recalc).
+        Değişen hücre sayısını döndürür.
+        """
+        names = self.workbook.names if sheets is None else list(sheets)
+        total = 0
+        for name in names:
+            entries = self.sheet(name).replacements(query, replacement)
+            if entries:
+                self.workbook.engine(name).set_cells(entries)
+                total += len(entries)
+        return total
@@ -0,0 +1,60 @@
+from typing import Any, List, Sequence, Tuple
+
+from cell_store import display_value
+from utils import shift_references
+
+SortKey = Tuple[int, bool]   # (sütun, artan mı)
+
+
+def typed_sort_key(value: Any):
+    """
+    Excel sırası: sayılar < metin < mantıksal < hatalar
+    (boşlar sort_order içinde her zaman sona alınır)
+    """
+    if isinstance(value, bool):
+        return (2, value)
+    if isinstance(value, (int, float)):
+        return (0, value)
+    text = str(value)
+    if text.startswith("#"):
+        return (3, text)
+    return (1, text.lower())
+
+
+def sort_order(store, top: int, bottom: int, keys: Sequence[SortKey]) -> List[int]:
+    """
+    top..bottom satırlarının yeni sırası (eski satır numaraları listesi).
+    Kararlı, çok anahtarlı: son anahtardan başlayarak ardışık kararlı sıralama.
+    Sıralama anahtarları her sütun için bir kez, sütun deposundan çıkarılır.
+    """
+    order = list(range(top, bottom + 1))
+
+    for col, ascending in reversed(keys):
+        column = store.column(col)
+        typed = {r: typed_sort_key(column[r]) for r in store.rows(col, top, bottom) if column[r] != ""}
+
+        filled = [r for r in order if r in typed]
+        blanks = [r for r in order if r not in typed]
+
+        filled.sort(key=typed.__getitem__, reverse=not ascending)
+        order = filled + blanks
+
+    return order
+
+
+def permuted_sources(store, top: int, left: int, bottom: int, right: int, order: Sequence[int]):
+    """
+    Satır permütasyonu sonrası hücre kaynakları: [(row, col, text), ...]
+    Taşınan formüllerdeki göreli referanslar tek geçişte kaydırılır.
+    """
+    entries = []
+    for offset, old_row in enumerate(order):
+        new_row = top + offset
+        for col in range(left, right + 1):
+            formula = store.formula(old_row, col)
+            if formula:
+                text = "=" + shift_references(formula, new_row - old_row, 0)
+            else:
+                text = display_value(store.get(old_row, col))
+            entries.append((new_row, col, text))
+    return entries
@@ -0,0 +1,350 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# =========================
+# STYLE
+# =========================
+
+@dataclass(frozen=True)
+class Style:
+    font_family: Optional[str] = None
+    font_size: Optional[int] = None
+    bold: bool = False
+    background: Optional[str] = None     # "#RRGGBB"
+    foreground: Optional[str] = None
+    alignment: Optional[int] = None      # Qt.Alignment (int)
+    border: Optional[str] = None         # "all"
+    number_format: Optional[str] = None  # "Number:2"
+
+
+DEFAULT_STYLE_ID = 0
+
+
+class StyleTable:
+    """
+    Tekilleştirilmiş stil tablosu: her farklı Style bir kez saklanır,
+    hücreler yalnızca küçük bir tamsayı id tutar.
+    """
+
+    def __init__(self):
+        self._styles: List[Style] = [Style()]
+        self._ids: Dict[Style, int] = {Style(): DEFAULT_STYLE_ID}
+        self._derived: Dict[Tuple[int, tuple], int] = {}
+
+    def intern(self, style: Style) -> int:
+        style_id = self._ids.get(style)
+        if style_id is None:
+            style_id = len(self._styles)
+            self._styles.append(style)
+            self._ids[style] = style_id
+        return style_id
+
+    def get(self, style_id: int) -> Style:
+        return self._styles[style_id]
+
+    def derive(self, style_id: int, changes: tuple) -> int:
+        """
+        style_id + değişiklikler → yeni id (sonuç önbelleklenir)
+        changes: (("bold", True), ...)
+        """
+        key = (style_id, changes)
+        derived = self._derived.get(key)
+        if derived is None:
+            derived = self.intern(replace(self._styles[style_id], **dict(changes)))
+            self._derived[key] = derived
+        return derived
+
+    def __len__(self):
+        return len(self._styles)
+
+
+# =========================
+# RUN-LENGTH STYLE RUNS
+# =========================
+
+Segments = Callable[[int, int], Iterator[Tuple[int, int, int]]]
+
+
+class StyleRuns:
+    """
+    Sıralı, çakışmasız [start, end] aralıkları → style id.
+    Bir sütundaki satırlar (ya da tablodaki satırlar) için kullanılır;
+    aralık işlemleri O(log n + etkilenen run) maliyetlidir.
+    """
+    __slots__ = ("starts", "ends", "ids")
+
+    def __init__(self, runs=()):
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.ids: List[int] = []
+        for start, end, style_id in runs:
+            self.starts.append(start)
+            self.ends.append(end)
+            self.ids.append(style_id)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return zip(self.starts, self.ends, self.ids)
+
+    def get(self, pos: int) -> Optional[int]:
+        i = bisect_right(self.starts, pos) - 1
+        if i >= 0 and self.ends[i] >= pos:
+            return self.ids[i]
+        return None
+
+    def overlaps(self, start: int, end: int) -> bool:
+        i = bisect_left(self.ends, start)
+        return i < len(self.starts) and self.starts[i] <= end
+
+    def segments(self, start: int, end: int, default: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        [start, end] aralığını eksiksiz kaplayan (s, e, id) parçaları;
+        boşluklar default ile doldurulur.
+        """
+        pos = start
+        i = bisect_left(self.ends, start)
+        while i < len(self.starts) and self.starts[i] <= end:
+            s, e = self.starts[i], self.ends[i]
+            if s > pos:
+                yield pos, s - 1, default
+            yield max(s, pos), min(e, end), self.ids[i]
+            pos = min(e, end) + 1
+            i += 1
+        if pos <= end:
+            yield pos, end, default
+
+    def assign(
+        self,
+        start: int,
+        end: int,
+        mapper: Callable[[int], int],
+        gaps: Optional[Segments] = None,
+        remap: bool = True,
+    ):
+        """
+        [start, end] içindeki run'ları mapper(eski_id) ile günceller.
+        gaps verilirse boşluklar gaps(s, e) parçalarından türetilerek doldurulur.
+        remap=False ise yalnızca boşluklar doldurulur.
+        """
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+
+        new: List[Tuple[int, int, int]] = []
+        pos = start
+
+        for i in range(lo, hi):
+            s, e, style_id = self.starts[i], self.ends[i], self.ids[i]
+
+            if s < start:
+                new.append((s, start - 1, style_id))
+            elif s > pos and gaps is not None:
+                new.extend((gs, ge, mapper(b)) for gs, ge, b in gaps(pos, s - 1))
+
+            inner_s, inner_e = max(s, start), min(e, end)
+            new.append((inner_s, inner_e, mapper(style_id) if remap else style_id))
+
+            if e > end:
+                new.append((end + 1, e, style_id))
+            pos = inner_e + 1
+
+        if pos <= end and gaps is not None:
+            new.extend((gs, ge, mapper(b)) for gs, ge, b in gaps(pos, end))
+
+        self._splice(lo, hi, new)
+
+    def replace(self, start: int, end: int, ids: List[Optional[int]]):
+        """
+        [start, end] aralığını satır başına id listesiyle değiştirir
+        (None = run yok, üst seviyeden miras)
+        """
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+
+        new: List[Tuple[int, int, int]] = []
+        if lo < hi and self.starts[lo] < start:
+            new.append((self.starts[lo], start - 1, self.ids[lo]))
+
+        for offset, style_id in enumerate(ids):
+            if style_id is not None:
+                row = start + offset
+                new.append((row, row, style_id))
+
+        if lo < hi and self.ends[hi - 1] > end:
+            new.append((end + 1, self.ends[hi - 1], self.ids[hi - 1]))
+
+        self._splice(lo, hi, new)
+
+    def map_all(self, mapper: Callable[[int], int]):
+        self.ids = [mapper(style_id) for style_id in self.ids]
+        self._splice(0, len(self.starts), list(self))
+
+    def _splice(self, lo: int, hi: int, new: List[Tuple[int, int, int]]):
+        # komşu run'lar: aynı id + bitişik ise birleştir
+        if lo > 0:
+            lo -= 1
+            new.insert(0, (self.starts[lo], self.ends[lo], self.ids[lo]))
+        if hi < len(self.starts):
+            new.append((self.starts[hi], self.ends[hi], self.ids[hi]))
+            hi += 1
+
+        merged: List[Tuple[int, int, int]] = []
+        for s, e, style_id in new:
+            if merged and merged[-1][2] == style_id and merged[-1][1] + 1 == s:
+                merged[-1] = (merged[-1][0], e, style_id)
+            else:
+                merged.append((s, e, style_id))
+
+        self.starts[lo:hi] = [m[0] for m in merged]
+        self.ends[lo:hi] = [m[1] for m in merged]
+        self.ids[lo:hi] = [m[2] for m in merged]
+
+
+# =========================
+# STYLE INDEX
+# =========================
+
+class StyleIndex:
+    """
+    Sayfanın stil bilgisi.
+
+    Öncelik (Excel gibi): hücre run'ı > satır stili > sütun stili > varsayılan.
+    - columns : sütun -> StyleRuns (satır aralıkları)
+    - rows    : tüm satır stilleri (StyleRuns, satır aralıkları)
+    - col_styles : tüm sütun stilleri
+    """
+
+    def __init__(self, table: Optional[StyleTable] = None):
+        self.table = table or StyleTable()
+        self.columns: Dict[int, StyleRuns] = {}
+        self.rows = StyleRuns()
+        self.col_styles: Dict[int, int] = {}
+
+    # =====================================================
+    # SORGULAR
+    # =====================================================
+    def style_id(self, row: int, col: int) -> int:
+        runs = self.columns.get(col)
+        if runs is not None:
+            style_id = runs.get(row)
+            if style_id is not None:
+                return style_id
+
+        style_id = self.rows.get(row)
+        if style_id is not None:
+            return style_id
+
+        return self.col_styles.get(col, DEFAULT_STYLE_ID)
+
+    def style(self, row: int, col: int) -> Style:
+        return self.table.get(self.style_id(row, col))
+
+    def segments(self, col: int, top: int, bottom: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        Sütunun [top, bottom] aralığındaki etkin stil parçaları (s, e, id):
+        hücre run'ı yoksa satır/sütun stili (kopyalama için)
+        """
+        runs = self.columns.get(col)
+        gaps = self._gaps(col)
+        if runs is None:
+            yield from gaps(top, bottom)
+            return
+        for s, e, style_id in runs.segments(top, bottom, None):
+            if style_id is None:
+                yield from gaps(s, e)
+            else:
+                yield s, e, style_id
+
+    # =====================================================
+    # FORMAT UYGULAMA
+    # =====================================================
+    def apply(self, top: int, left: int, bottom: int, right: int, **changes):
+        """
+        Dikdörtgen aralığa format uygular – sütun başına O(run)
+        """
+        mapper = self._mapper(changes)
+        for col in range(left, right + 1):
+            self._runs(col).assign(top, bottom, mapper, self._gaps(col))
+
+    def set_style_id(self, top: int, left: int, bottom: int, right: int, style_id: int):
+        for col in range(left, right + 1):
+            self._runs(col).assign(top, bottom, lambda _: style_id, self._gaps(col))
+
+    def apply_columns(self, left: int, right: int, **changes):
+        """
+        Tüm sütun(lar)a format: sütun stili + o sütundaki mevcut run'lar
+        """
+        mapper = self._mapper(changes)
+        for col in range(left, right + 1):
+            runs = self._runs(col)
+            runs.map_all(mapper)
+
+            # satır stili olan kesişimler sütun formatını da almalı
+            gaps = self._gaps(col)
+            for start, end, _ in list(self.rows):
+                runs.assign(start, end, mapper, gaps, remap=False)
+
+            self.col_styles[col] = mapper(self.col_styles.get(col, DEFAULT_STYLE_ID))
+
+    def apply_rows(self, top: int, bottom: int, **changes):
+        """
+        Tüm satır(lar)a format: satır stili + kesişen hücre run'ları
+        """
+        mapper = self._mapper(changes)
+        for col in set(self.columns) | set(self.col_styles):
+            gaps = self._gaps(col) if col in self.col_styles else None
+            self._runs(col).assign(top, bottom, mapper, gaps)
+
+        self.rows.assign(top, bottom, mapper, lambda s, e: iter(((s, e, DEFAULT_STYLE_ID),)))
+
+    def permute_rows(self, top: int, left: int, bottom: int, right: int, order: List[int]):
+        """
+        Sıralama sonrası hücre stillerini satırlarla birlikte taşır.
+        order: yeni sıradaki eski satır numaraları
+        """
+        for col in range(left, right + 1):
+            runs = self.columns.get(col)
+            if runs is None or not runs.overlaps(top, bottom):
+                continue
+            runs.replace(top, bottom, [runs.get(r) for r in order])
+
+    # =====================================================
+    # UNDO SNAPSHOT
+    # =====================================================
+    def snapshot_column(self, col: int):
+        runs = self.columns.get(col)
+        return (tuple(runs) if runs else (), self.col_styles.get(col))
+
+    def restore_column(self, col: int, snapshot):
+        runs, col_style = snapshot if snapshot is not None else ((), None)
+        self.columns[col] = StyleRuns(runs)
+        if col_style is None:
+            self.col_styles.pop(col, None)
+        else:
+            self.col_styles[col] = col_style
+
+    def snapshot_rows(self):
+        return tuple(self.rows)
+
+    def restore_rows(self, snapshot):
+        self.rows = StyleRuns(snapshot or ())
+
+    # =====================================================
+    # YARDIMCI
+    # =====================================================
+    def _runs(self, col: int) -> StyleRuns:
+        runs = self.columns.get(col)
+        if runs is None:
+            runs = self.columns[col] = StyleRuns()
+        return runs
+
+    def _gaps(self, col: int) -> Segments:
+        default = self.col_styles.get(col, DEFAULT_STYLE_ID)
+        return lambda s, e: self.rows.segments(s, e, default)
+
+    def _mapper(self, changes: dict) -> Callable[[int], int]:
+        key = tuple(sorted(changes.items()))
+        derive = self.table.derive
+        return lambda style_id: derive(style_id, key)
@@ -0,0 +1,151 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cell_store import display_value
+
+Bounds = Tuple[int, int, int, int]   # (r1, c1, r2, c2)
+
+
+def table_headers(store, top: int, left: int, right: int) -> List[str]:
+    """
+    Başlık satırındaki sütun adları; boş ya da tekrar eden başlık
+    Excel gibi Column1, Column2... olur
+    """
+    headers = []
+    seen = set()
+    for i, col in enumerate(range(left, right + 1), 1):
+        header = display_value(store.get(top, col)).strip()
+        if not header or header.casefold() in seen:
+            header = f"Column{i}"
+        seen.add(header.casefold())
+        headers.append(header)
+    return headers
+
+
+class Table:
+    """
+    Başlık satırı + gövdeden oluşan adlandırılmış aralık (Sales).
+    Yapılandırılmış referanslar (Sales[Amount]) derlemede tablonun o
+    anki kapsamına çözülür; tablo büyüyünce yalnızca ona başvuran
+    formüller yeniden bağlanır (NameManager.resize_table).
+    """
+    __slots__ = ("name", "key", "sheet", "top", "left", "bottom", "right", "headers")
+
+    def __init__(self, name: str, sheet: Optional[str], top: int, left: int, bottom: int, right: int, headers: List[str]):
+        self.name = name
+        self.key = name.casefold()
+        self.sheet = sheet          # sayfa adı; kitapsız motorda None
+        self.top = top              # başlık satırı
+        self.left = left
+        self.bottom = bottom        # son gövde satırı (gövde boşsa top)
+        self.right = right
+        self.headers = headers
+
+    def column(self, header: str) -> int:
+        """
+        Başlık adı → sayfa sütunu (büyük/küçük harf duyarsız); yoksa KeyError
+        """
+        folded = header.strip().casefold()
+        for i, name in enumerate(self.headers):
+            if name.casefold() == folded:
+                return self.left + i
+        raise KeyError(header)
+
+    def bounds(self, item: str) -> Bounds:
+        """
+        Yapılandırılmış referansın kapsamı: "Amount", "#All", "#Headers",
+        "#Data" ya da "" (Sales[] == Sales[#Data])
+        """
+        folded = item.strip().casefold()
+        if folded == "#all":
+            return self.top, self.left, max(self.bottom, self.top + 1), self.right
+        if folded == "#headers":
+            return self.top, self.left, self.top, self.right
+
+        # gövde boşken bile tek (boş) satır: SUM(Sales[Amount]) = 0
+        first, last = self.top + 1, max(self.bottom, self.top + 1)
+        if folded in ("", "#data"):
+            return first, self.left, last, self.right
+        col = self.column(item)
+        return first, col, last, col
+
+    def column_bounds(self) -> List[Bounds]:
+        """
+        Gövdenin sütun sütun kapsamı (aralık toplamı önbelleği için)
+        """
+        first, last = self.top + 1, max(self.bottom, self.top + 1)
+        return [(first, col, last, col) for col in range(self.left, self.right + 1)]
+
+    def __repr__(self):
+        return f"Table({self.name!r}, {self.sheet!r}, {self.top}, {self.left}, {self.bottom}, {self.right})"
+
+
+class TableIndex:
+    """
+    Çalışma kitabının tabloları: ada ve sayfaya göre
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, Table] = {}
+
+        # sayfa anahtarı (kitapsızda None) -> o sayfadaki tablolar
+        self._by_sheet: Dict[Optional[str], List[Table]] = {}
+
+    def add(self, table: Table):
+        self._tables[table.key] = table
+        self._by_sheet.setdefault(_sheet_key(table.sheet), []).append(table)
+
+    def remove(self, key: str) -> Table:
+        table = self._tables.pop(key)
+        tables = self._by_sheet[_sheet_key(table.sheet)]
+        tables.remove(table)
+        if not tables:
+            del self._by_sheet[_sheet_key(table.sheet)]
+        return table
+
+    def get(self, key: str) -> Optional[Table]:
+        return self._tables.get(key)
+
+    def on_sheet(self, sheet: Optional[str]) -> List[Table]:
+        return self._by_sheet.get(sheet, [])
+
+    def overlapping(self, sheet: Optional[str], top: int, left: int, bottom: int, right: int) -> Optional[Table]:
+        """
+        Verilen dikdörtgenle kesişen tablo (yoksa None)
+        """
+        for table in self.on_sheet(sheet):
+            if top <= table.bottom and table.top <= bottom and left <= table.right and table.left <= right:
+                return table
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._tables
+
+    def __iter__(self):
+        return iter(sorted(self._tables.values(), key=lambda t: t.key))
+
+    def __len__(self):
+        return len(self._tables)
+
+
+def appended_bottom(table: Table, store, cells: Iterable[Tuple[int, int]]) -> Optional[int]:
+    """
+    Tablonun hemen altındaki satıra yazılmışsa (Excel'in otomatik
+    genişlemesi) yeni son satır: alttaki ardışık dolu satırlar da
+    katılır. Genişleme yoksa None.
+    """
+    below = table.bottom + 1
+    if not any(row == below and table.left <= col <= table.right for row, col in cells):
+        return None
+
+    bottom = table.bottom
+    # yalnızca değer satırları katılır: alttaki toplam formülü tabloya girmez
+    while any(
+        store.get(bottom + 1, col) is not None and not store.formula(bottom + 1, col)
+        for col in range(table.left, table.right + 1)
+    ):
+        bottom += 1
+    return bottom if bottom > table.bottom else None
+
+
+def _sheet_key(sheet: Optional[str]) -> Optional[str]:
+    return None if sheet is None else sheet.casefold()
@@ -0,0 +1,137 @@
+import math
+import random
+
+from aggregates import AGGREGATE_FUNCTIONS, AggregateCache, RangeAggregate, exact_sum
+from cell_store import CellStore
+from formula_engine import FormulaEngine
+
+VALUES = (0.1, 0.2, 0.3, 1e16, -1e16, 1.0, 3, 7, 1e-300, 2.5, -0.7, 1e308, None, "metin", True)
+
+
+def _numbers(values):
+    return [v for v in values if isinstance(v, (int, float)) and not isinstance(v, bool)]
+
+
+def _full(values, name):
+    """
+    Baştan hesap: aralığın güncel değerlerinden yeni durum
+    """
+    return RangeAggregate((0, 0, len(values) - 1, 0), _numbers(values)).result(name)
+
+
+def _same(a, b):
+    if isinstance(a, float) and math.isnan(a):
+        return isinstance(b, float) and math.isnan(b)
+    return a == b and type(a) is type(b)
+
+
+def test_cancellation_does_not_leave_residue():
+    entry = RangeAggregate((0, 0, 1, 0), [0.1, 0.2])
+    entry.apply(0.2, 0)
+    assert entry.result("SUM") == 0.1
+
+    entry = RangeAggregate((0, 0, 1, 0), [1e16, 1])
+    entry.apply(1e16, 0)
+    assert entry.result("SUM") == 1
+    assert entry.result("AVERAGE") == 0.5
+
+
+def test_exact_sum_matches_fsum():
+    rng = random.Random(7)
+    for _ in range(200):
+        values = [rng.choice((0.1, 1e16, -1e16, 1e-9, 3.3)) * rng.randint(-9, 9) for _ in range(20)]
+        assert exact_sum(values) == math.fsum(values)
+    assert exact_sum([1, 2, 3]) == 6 and type(exact_sum([1, 2, 3])) is int
+    assert exact_sum([1e308, 1e308]) == math.inf
+    assert math.isnan(exact_sum([math.inf, -math.inf]))
+
+
+def test_delta_updates_match_full_recomputation():
+    rng = random.Random(2024)
+    for trial in range(50):
+        values = [rng.choice(VALUES) for _ in range(12)]
+        entry = RangeAggregate((0, 0, 11, 0), _numbers(values))
+
+        for step in range(200):
+            row = rng.randrange(len(values))
+            new = rng.choice(VALUES + (math.inf, -math.inf, rng.uniform(-1e6, 1e6)))
+            entry.apply(values[row], new)
+            values[row] = new
+
+            for name in ("SUM", "COUNT", "AVERAGE"):
+                assert _same(entry.result(name), _full(values, name)), (trial, step, name, values)
+
+
+def test_cache_deltas_match_rescan():
+    rng = random.Random(11)
+    store = CellStore()
+    cache = AggregateCache(store, min_cells=1)
+    for row in range(30):
+        store.set(row, 0, rng.choice(VALUES))
+
+    for _ in range(500):
+        store.set(rng.randrange(30), 0, rng.choice(VALUES + (rng.uniform(-1e3, 1e3),)))
+        fresh = AggregateCache(store, min_cells=1)
+        for name in AGGREGATE_FUNCTIONS:
+            assert _same(cache.result(name, (0, 0, 29, 0)), fresh.result(name, (0, 0, 29, 0))), name
+        fresh.clear()
+    assert cache.deltas > 0
+
+
+def test_engine_sum_after_edits():
+    engine = FormulaEngine()
+    engine.set_cells([(0, 0, "0.1"), (1, 0, "0.2"), (0, 1, "=SUM(A1:A2)")])
+    engine.set_cell(1, 0, "0")
+    assert engine.value(0, 1) == 0.1
+
+
+def test_write_touches_only_covering_windows():
+    store = CellStore()
+    for row in range(3000):
+        store.set(row, 0, float(row))
+    cache = AggregateCache(store, max_entries=4096, min_cells=1)
+    windows = [(row, 0, row + 9, 0) for row in range(2990)] + [(0, 0, 2999, 0)]
+    for bounds in windows:
+        cache.result("SUM", bounds)
+
+    before = cache.deltas
+    store.set(1500, 0, 0.5)
+    # 10 pencere + tüm sütun; diğer 2980 giriş gezilmez
+    assert cache.deltas - before == 11
+    for bounds in windows:
+        assert cache.result("SUM", bounds) == sum(store.get(r, 0) for r in range(bounds[0], bounds[2] + 1))
+
+
+def test_cache_evicts_least_recently_used():
+    store = CellStore()
+    for row in range(100):
+        store.set(row, 0, 1.0)
+    cache = AggregateCache(store, max_entries=3, min_cells=1)
+    hot = (0, 0, 99, 0)
+    for row in range(10):
+        cache.result("SUM", hot)
+        cache.result("SUM", (row, 0, row + 5, 0))
+    assert hot in cache.entries and len(cache.entries) == 3
+
+
+def test_filled_down_window_matches_uncached():
+    engines = FormulaEngine(), FormulaEngine()
+    engines[1].evaluator.aggregates = None
+    rng = random.Random(37)
+    for engine in engines:
+        engine.set_cells([(row, 0, str(row % 7)) for row in range(3000)])
+        engine.set_cells([(0, 1, "=SUM(A1:A10)"), (0, 2, "=AVERAGE(A1:A100)")])
+        engine.fill(0, 1, 2989, 2)
+
+    # 10 hücrelik pencereler önbelleğe girmez; 100 hücrelikler sınıra kadar
+    cache = engines[0].evaluator.aggregates
+    assert len(cache.entries) == cache.max_entries
+    assert all(r2 - r1 == 99 for r1, _, r2, _ in cache.entries)
+    for _ in range(50):
+        row, text = rng.randrange(3000), str(rng.uniform(-5, 5))
+        for engine in engines:
+            engine.set_cell(row, 0, text)
+        for row in range(0, 2990, 13):
+            assert engines[0].value(row, 1) == engines[1].value(row, 1)
+            assert engines[0].value(row, 2) == engines[1].value(row, 2)
+    assert len(cache.entries) == cache.max_entries and cache.deltas > 0
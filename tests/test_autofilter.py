@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from autofilter import AutoFilter, Between, TopN
+from formula_engine import FormulaEngine
+
+FIRST, LAST = 1, 60
+
+
+def _criteria(bottom):
+    # B: ilk/son 5 (formül sütunu C'den türer), A: yerel koşul
+    return {1: TopN(5, bottom), 0: Between(-5, 8)}
+
+
+def _rebuilt(store, bottom):
+    fresh = AutoFilter(store, FIRST, LAST)
+    for col, predicate in _criteria(bottom).items():
+        fresh.criteria[col] = predicate
+    fresh.apply()
+    return fresh
+
+
+@pytest.mark.parametrize("bottom", [False, True])
+def test_topn_refresh_matches_rebuild(bottom):
+    rng = random.Random(30)
+    engine = FormulaEngine()
+    engine.set_cells([(row, 0, str(rng.randint(-9, 9))) for row in range(FIRST, LAST + 1)])
+    engine.set_cells([(row, 2, str(rng.randint(0, 50))) for row in range(FIRST, LAST + 1)])
+    engine.set_cells([(row, 1, f"=C{row + 1}*2") for row in range(FIRST, LAST + 1)])
+
+    autofilter = AutoFilter(engine.store, FIRST, LAST)
+    for col, predicate in _criteria(bottom).items():
+        autofilter.set_criteria(col, predicate)
+    changes = []
+    engine.add_listener(changes.append)
+
+    entered = left = 0
+    for _ in range(300):
+        before = set(autofilter.selected[1])
+        hidden = set(autofilter.hidden)
+
+        row = rng.randint(FIRST, LAST)
+        if rng.random() < 0.7:
+            # C → B formülü: değer ilk/son 5'e girer ya da çıkar
+            engine.set_cell(row, 2, str(rng.choice((0, rng.randint(0, 50), 100 + rng.randint(0, 9)))))
+        else:
+            engine.set_cell(row, 0, str(rng.randint(-9, 9)))
+
+        blocks = autofilter.refresh(changes.pop())
+        fresh = _rebuilt(engine.store, bottom)
+        assert autofilter.hidden == fresh.hidden
+        assert autofilter.selected == fresh.selected
+
+        # bloklar yalnızca değişen satırları, doğru durumla verir
+        for first, last, state in blocks:
+            for r in range(first, last + 1):
+                if state:
+                    hidden.add(r)
+                else:
+                    hidden.discard(r)
+        assert hidden == autofilter.hidden
+
+        entered += len(autofilter.selected[1] - before)
+        left += len(before - autofilter.selected[1])
+
+    assert entered > 20 and left > 20
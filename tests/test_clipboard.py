@@ -0,0 +1,59 @@
+from clipboard import copy_block, decode, encode, paste_cells
+from formula_engine import FormulaEngine
+from styles import StyleIndex
+
+
+def _engine():
+    """
+    A2:B4 bloğu: B sütunu bloğun içini (A), dışını (E, $E$1) ve
+    bir üst satırı (B2 için A1 dışarıda, B3/B4 için içeride) okur
+    """
+    engine = FormulaEngine()
+    engine.set_cells([(0, 0, "7"), (0, 4, "100")] + [(row, 4, str(row * 10)) for row in range(1, 4)])
+    engine.set_cells([(row, 0, str(row)) for row in range(1, 4)])
+    engine.set_cells([(row, 1, f"=A{row + 1}*2+A{row}+$E$1+E{row + 1}") for row in range(1, 4)])
+    return engine
+
+
+def _paste(engine, block, top, left):
+    # ui: panodan geçer (encode/decode), tek toplu yazım
+    block = decode(encode(block))
+    values, groups = paste_cells(block, top, left, engine.store)
+    engine.paste(values, groups)
+
+
+def test_cut_paste_moves_references_into_the_block():
+    engine = _engine()
+    block = copy_block(engine, StyleIndex(), [(1, 0, 3, 1)], relative=False, moved=True)
+    engine.paste([(block.rows[i], block.cols[j], None) for i, j, _ in block.values + block.cells])
+    _paste(engine, block, 10, 2)
+
+    assert [engine.formula(row, 3) for row in range(10, 13)] == [
+        "C11*2+A1+$E$1+E2",
+        "C12*2+C11+$E$1+E3",
+        "C13*2+C12+$E$1+E4",
+    ]
+    assert [engine.value(row, 3) for row in range(10, 13)] == [2 + 7 + 100 + 10, 4 + 1 + 100 + 20, 6 + 2 + 100 + 30]
+    assert all(engine.value(row, col) is None for row in range(1, 4) for col in (0, 1))
+
+    # taşınan formüller yeni yerlerinden de dışarıyı okumaya devam eder
+    engine.set_cell(0, 0, "1")
+    engine.set_cell(10, 2, "5")
+    engine.set_cell(0, 4, "0")
+    assert [engine.value(row, 3) for row in range(10, 13)] == [10 + 1 + 10, 4 + 5 + 20, 6 + 2 + 30]
+
+
+def test_copy_paste_shifts_relative_references():
+    engine = _engine()
+    block = copy_block(engine, StyleIndex(), [(1, 0, 3, 1)])
+    _paste(engine, block, 10, 2)
+
+    assert [engine.formula(row, 3) for row in range(10, 13)] == [
+        "C11*2+C10+$E$1+G11",
+        "C12*2+C11+$E$1+G12",
+        "C13*2+C12+$E$1+G13",
+    ]
+    engine.set_cells([(9, 2, "4"), (10, 6, "1"), (11, 6, "2"), (12, 6, "3")])
+    assert [engine.value(row, 3) for row in range(10, 13)] == [2 + 4 + 100 + 1, 4 + 1 + 100 + 2, 6 + 2 + 100 + 3]
+    # kaynak yerinde kalır
+    assert engine.value(1, 1) == 2 + 7 + 100 + 10
@@ -0,0 +1,27 @@
+from formula_engine import FormulaEngine
+
+
+def test_whole_column_average_is_memoized_within_a_recalc():
+    engine = FormulaEngine()
+    engine.set_cells([(row, 2, str(row)) for row in range(100)])
+    engine.set_cells([(row, 3, f"=AVERAGE(C:C)+{row}") for row in range(50)])
+    assert engine.value(0, 3) == 49.5 and engine.value(49, 3) == 98.5
+
+    engine.set_cell(0, 2, "100")
+    # 50 hücre aynı C:C'yi okur: ilki hesaplar, kalanı bellekten
+    assert engine.last_recalc["memo_lookups"] == 50
+    assert engine.last_recalc["memo_hits"] == 49
+    assert engine.value(0, 3) == 50.5 and engine.value(49, 3) == 99.5
+
+
+def test_whole_row_sum_sees_new_columns():
+    engine = FormulaEngine()
+    engine.set_cells([(0, col, "1") for col in range(3)])
+    engine.set_cells([(row, 0, "=SUM(1:1)") for row in range(5, 10)])
+    assert engine.value(9, 0) == 3
+
+    # yeni dolan sütun anahtarı değiştirir, eski kayıt kullanılmaz
+    engine.set_cell(0, 7, "4")
+    assert [engine.value(row, 0) for row in range(5, 10)] == [7] * 5
+    engine.set_cell(0, 1, "2")
+    assert [engine.value(row, 0) for row in range(5, 10)] == [8] * 5
@@ -0,0 +1,70 @@
+import random
+
+from formula_engine import FormulaEngine
+from utils import column_name
+
+
+def _down(row: int) -> str:
+    r = row + 1
+    return f"=$A{r}+B$1*$C$1+SUM(A$1:$A{r})-IF(B{r}>C{r},$B{r},C$2)"
+
+
+def _right(col: int) -> str:
+    this, next_ = column_name(col - 4), column_name(col - 3)
+    return f"={this}1*$A$1+{next_}$2-$B2+SUM({this}$1:{next_}3)"
+
+
+def _inputs(engine: FormulaEngine, rng: random.Random):
+    engine.set_cells([(row, col, str(rng.randint(-9, 9))) for row in range(40) for col in range(3)])
+
+
+def _pair(seed: int):
+    rng = random.Random(seed)
+    filled, typed = FormulaEngine(), FormulaEngine()
+    for engine in (filled, typed):
+        _inputs(engine, random.Random(seed))
+    return rng, filled, typed
+
+
+def _compare(filled, typed, cells):
+    for row, col in cells:
+        assert filled.formula(row, col) == typed.formula(row, col), (row, col)
+        assert filled.value(row, col) == typed.value(row, col), (row, col)
+
+
+def test_fill_down_matches_cell_by_cell_entry():
+    rng, filled, typed = _pair(34)
+    cells = [(row, 4) for row in range(40)]
+
+    filled.set_cell(0, 4, _down(0))
+    filled.fill(0, 4, 39, 4)
+    assert [(first, last) for first, last, _ in filled.formula_groups(4)] == [(0, 39)]
+    for row, col in cells:
+        typed.set_cell(row, col, _down(row))
+    _compare(filled, typed, cells)
+
+    for _ in range(20):
+        row, col, text = rng.randrange(40), rng.randrange(3), str(rng.randint(-9, 9))
+        filled.set_cell(row, col, text)
+        typed.set_cell(row, col, text)
+        _compare(filled, typed, cells)
+
+
+def test_fill_right_matches_cell_by_cell_entry():
+    rng, filled, typed = _pair(35)
+    cells = [(row, col) for row in range(3) for col in range(4, 12)]
+
+    # her satır kendi ilk hücresinden sağa doldurulur; kopyalar
+    # soldaki doldurulmuş hücreleri de okur (E1, F1 ...)
+    for row in range(3):
+        filled.set_cell(row, 4, _right(4))
+    filled.fill(0, 4, 2, 11, "right")
+    for row, col in cells:
+        typed.set_cell(row, col, _right(col))
+    _compare(filled, typed, cells)
+
+    for _ in range(20):
+        row, col, text = rng.randrange(3), rng.randrange(3), str(rng.randint(-9, 9))
+        filled.set_cell(row, col, text)
+        typed.set_cell(row, col, text)
+        _compare(filled, typed, cells)
@@ -0,0 +1,76 @@
+import random
+
+from formula_engine import FormulaEngine
+
+# (satır, sütun, formül); {Ad} yer tutucuları başvuru motorunda tanımla açılır
+FORMULAS = [
+    (0, 2, "=Total"),
+    (1, 2, "=C1+Rate"),
+    (2, 2, "=AVERAGE(Data)"),
+    (3, 2, "=IF(Rate>1,MAX(Data),MIN(Data))"),
+    (4, 2, "=C2*2"),
+]
+FILLED = "=A1*Rate+B1"
+
+
+def _expand(text, names):
+    # iç içe isimler: Total → SUM(Data)*Rate → SUM(A1:A8)*(0.5)
+    for _ in range(len(names)):
+        for name, definition in names.items():
+            text = text.replace(name, f"({definition})" if name != "Data" else definition)
+    return text
+
+
+def _engines(names):
+    named, typed = FormulaEngine(), FormulaEngine()
+    for engine in (named, typed):
+        engine.set_cells([(row, col, str(row * 3 + col)) for row in range(20) for col in range(2)])
+    for name, definition in names.items():
+        named.names.define(name, definition)
+
+    named.set_cells(FORMULAS)
+    named.set_cell(0, 3, FILLED)
+    named.fill(0, 3, 19, 3)
+    return named, typed
+
+
+def _retype(typed, names):
+    typed.set_cells([(row, col, _expand(text, names)) for row, col, text in FORMULAS])
+    typed.set_cells([(row, 3, _expand(f"=A{row + 1}*Rate+B{row + 1}", names)) for row in range(20)])
+
+
+def _compare(named, typed):
+    for row in range(20):
+        for col in (2, 3):
+            assert named.value(row, col) == typed.value(row, col), (row, col)
+
+
+def test_redefining_a_name_recalculates_every_user():
+    names = {"Total": "SUM(Data)*Rate", "Data": "A1:A8", "Rate": "0.5"}
+    named, typed = _engines(names)
+    _retype(typed, names)
+    _compare(named, typed)
+
+    rng = random.Random(47)
+    changes = []
+    named.add_listener(changes.append)
+    for _ in range(30):
+        name = rng.choice(("Data", "Rate", "Total"))
+        names[name] = {
+            "Data": lambda: f"A{rng.randint(1, 5)}:B{rng.randint(6, 20)}",
+            "Rate": lambda: str(rng.choice((0.5, 2, -1, 3.25))),
+            "Total": lambda: rng.choice(("SUM(Data)*Rate", "COUNT(Data)+Rate", "MAX(Data)")),
+        }[name]()
+        named.names.define(name, names[name])
+        _retype(typed, names)
+        _compare(named, typed)
+
+        # doldurulmuş sütunun tamamı Rate'i doğrudan kullanır
+        if name == "Rate":
+            assert {(row, 3) for row in range(20)} <= set(changes[-1])
+
+    # isim silinince kullanan formüller hata verir, geri tanımlanınca döner
+    named.names.remove("Rate")
+    assert named.value(1, 2) == "#ERROR" and named.value(5, 3) == "#ERROR"
+    named.names.define("Rate", names["Rate"])
+    _compare(named, typed)
@@ -0,0 +1,178 @@
+import cmath
+import math
+import random
+
+from ast_nodes import Lambda, Number
+from evaluator import Evaluator
+from optimizer import Optimizer
+from parser import Parser
+
+CELLS = ("A1", "B2", "C3", "A2")
+NUMBERS = ("0", "1", "2", "3.5", "10")
+
+
+# =========================
+# RASTGELE GİRDİ
+# =========================
+
+class _RandomStore:
+    """
+    Formülün okuduğu her hücreye rastgele (sayı/boş/metin/mantıksal)
+    değer veren depo; aynı hücre aynı tur içinde hep aynı değeri döner.
+    """
+    CHOICES = (None, 0.0, 1.0, -1.0, 2.5, 1e9, "a", True, False)
+
+    def __init__(self, rng: random.Random):
+        self.rng = rng
+        self.values = {}
+
+    def get(self, row, col):
+        key = (row, col)
+        if key not in self.values:
+            self.values[key] = self.rng.choice(self.CHOICES + (self.rng.uniform(-100, 100),))
+        return self.values[key]
+
+    def column(self, col):
+        return {r: self.get(r, col) for r in range(0, 20)}
+
+    def rows(self, col, first=0, last=None):
+        return list(range(first, 20 if last is None else min(last + 1, 20)))
+
+
+class _Formulas:
+    """
+    Tohumlu formül üreteci: katlanabilir sabit alt ağaçlar, dalı hata
+    verebilen IF'ler ve parametreden bağımsız gövdeli LAMBDA'lar
+    """
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+
+    def formula(self) -> str:
+        if self.rng.random() < 0.25:
+            return self.lambda_()
+        return self.expr(0)
+
+    def expr(self, depth: int, params=()) -> str:
+        rng = self.rng
+        k = rng.random()
+        if depth > 3 or k < 0.25:
+            return rng.choice(CELLS + NUMBERS + params)
+        if k < 0.35:
+            return "-" + self.expr(depth + 1, params)
+        if k < 0.45:
+            # sabit alt ağaç: katlanır (1/0 gibi hatalılar katlanmaz)
+            return "(" + rng.choice(NUMBERS) + rng.choice("+-*/^") + rng.choice(NUMBERS) + ")"
+        if k < 0.55:
+            return "IF(" + self.expr(depth + 1, params) + "," + self.branch(depth, params) + "," + self.branch(depth, params) + ")"
+        if k < 0.65:
+            name = rng.choice(("SUM", "MIN", "MAX", "AVERAGE", "COUNT"))
+            return f"{name}({self.expr(depth + 1, params)},{self.expr(depth + 1, params)})"
+        if k < 0.7:
+            return "SUM(A1:B2)"
+        if k < 0.8:
+            # özdeşlikler: x*1, x+0, x^1 ...
+            return self.expr(depth + 1, params) + rng.choice(("*1", "+0", "-0", "/1", "^1"))
+        return self.expr(depth + 1, params) + rng.choice(("+", "-", "*", "/", "^", "<", ">=", "=")) + self.expr(depth + 1, params)
+
+    def branch(self, depth: int, params) -> str:
+        if self.rng.random() < 0.2:
+            return self.rng.choice(("1/0", '"a"*1', "SUM(A1:B2)/0"))
+        return self.expr(depth + 1, params)
+
+    def lambda_(self) -> str:
+        params = ("X1",) if self.rng.random() < 0.5 else ("X1", "Y1")
+        body = self.expr(1, params) + "+" + params[0] + "*(" + self.expr(1) + ")"
+        return "LAMBDA(" + ",".join(params) + "," + body + ")"
+
+
+# =========================
+# KARŞILAŞTIRMA
+# =========================
+
+def _outcome(evaluator: Evaluator, node, args=()):
+    try:
+        value = evaluator.eval(node)
+        if callable(value):
+            value = value(*args)
+    except Exception:
+        return ("error",)
+    if isinstance(value, (float, complex)) and cmath.isnan(value):
+        return ("nan",)
+    return ("value", type(value) is bool, value)
+
+
+def _same(a, b) -> bool:
+    if a[0] != b[0]:
+        return False
+    if a[0] != "value":
+        return True
+    _, a_bool, a_value = a
+    _, b_bool, b_value = b
+    if a_bool != b_bool:
+        return False
+    if isinstance(a_value, (int, float)) and isinstance(b_value, (int, float)):
+        return a_value == b_value or math.isclose(a_value, b_value, rel_tol=1e-12, abs_tol=1e-12)
+    return a_value == b_value
+
+
+def check_equivalence(parser, formula: str, trials: int = 60, seed: int = 0):
+    """
+    Optimize edilmiş ağacı optimize edilmemişle rastgele girdilerde
+    karşılaştırır (LAMBDA rastgele argümanlarla çağrılır). Dönüş:
+    uyuşmayan örnekler [(girdi değerleri, ham sonuç, optimize sonuç), ...]
+    """
+    raw = parser.parse(formula)
+    optimized = Optimizer(parser.nodes).optimize(raw)
+    rng = random.Random(seed)
+
+    mismatches = []
+    for _ in range(trials):
+        store = _RandomStore(rng)
+        args = [store.get(100, i) for i in range(len(raw.params))] if isinstance(raw, Lambda) else ()
+        expected = _outcome(Evaluator(store), raw, args)
+        actual = _outcome(Evaluator(store), optimized, args)
+        if not _same(expected, actual):
+            mismatches.append((formula, dict(store.values), expected, actual))
+    return mismatches
+
+
+# =========================
+# TESTLER
+# =========================
+
+def test_random_formulas_keep_their_meaning():
+    parser = Parser()
+    formulas = _Formulas(seed=38)
+    folded = hoisted = guarded = 0
+
+    for i in range(600):
+        formula = formulas.formula()
+        raw = parser.parse(formula)
+        optimized = Optimizer(parser.nodes).optimize(raw)
+        folded += optimized is not raw and not isinstance(raw, Lambda)
+        hoisted += isinstance(optimized, Lambda) and bool(optimized.bindings)
+        guarded += "IF(" in formula and "/0" in formula
+
+        assert check_equivalence(parser, formula, seed=i) == []
+
+    # üreteç her dönüşümü gerçekten çalıştırıyor
+    assert folded > 50 and hoisted > 50 and guarded > 10
+
+
+def test_constant_folding_and_identities():
+    parser = Parser()
+    optimized = Optimizer(parser.nodes).optimize(parser.parse("(2*3)+(A1/2)*1+0"))
+    assert optimized == parser.parse("6+A1/2")
+    # A1 metin/int olabilir: A1*1 korunur; COUNT int döner, katlanmaz
+    assert Optimizer(parser.nodes).optimize(parser.parse("A1*1")) == parser.parse("A1*1")
+    assert Optimizer(parser.nodes).optimize(parser.parse("COUNT(1,2)")) == parser.parse("COUNT(1,2)")
+    assert Optimizer(parser.nodes).optimize(parser.parse("1/0")) == parser.parse("1/0")
+    assert Optimizer(parser.nodes).optimize(parser.parse("SUM(1,2)")) == parser.nodes(Number, 3.0)
+
+
+def test_lambda_hoists_parameter_free_parts():
+    parser = Parser()
+    optimized = Optimizer(parser.nodes).optimize(parser.parse("LAMBDA(X1, X1*(B1+2*C1)+SUM(A1:A9))"))
+    assert [expr for _, expr in optimized.bindings] == [parser.parse("B1+2*C1"), parser.parse("SUM(A1:A9)")]
+    assert check_equivalence(parser, "LAMBDA(X1, X1*(B1+2*C1)+SUM(A1:A9))") == []
@@ -0,0 +1,60 @@
+import random
+
+from cell_store import CellStore
+from pivot import AGGREGATES, PivotTable
+
+REGIONS = ("Kuzey", "Güney", "Doğu", None)
+VALUES = (0.1, 0.2, 0.3, 1e16, 1, 2, 7, -0.7, None, "metin")
+
+
+def _source(rng, rows):
+    store = CellStore()
+    store.set(0, 0, "Bölge")
+    store.set(0, 1, "Ay")
+    store.set(0, 2, "Tutar")
+    for row in range(1, rows + 1):
+        store.set(row, 0, rng.choice(REGIONS))
+        store.set(row, 1, rng.choice(("Oca", "Şub")))
+        store.set(row, 2, rng.choice(VALUES))
+    return store
+
+
+def test_refresh_after_cancellation_matches_build():
+    store = CellStore()
+    for row, (region, value) in enumerate((("Bölge", "Tutar"), ("K", 0.1), ("K", 0.2))):
+        store.set(row, 0, region)
+        store.set(row, 1, value)
+    pivot = PivotTable(store, (0, 0, 2, 1), [0], 1)
+    pivot.build()
+
+    store.set(2, 1, 0)
+    pivot.refresh([(2, 1)])
+    assert pivot.groups[(("K",), None)].result("SUM") == 0.1
+
+
+def test_integer_sum_stays_integer():
+    store = CellStore()
+    for row, value in enumerate(("Tutar", 1, 2)):
+        store.set(row, 0, "K" if row else "Bölge")
+        store.set(row, 1, value)
+    pivot = PivotTable(store, (0, 0, 2, 1), [0], 1)
+    pivot.build()
+    assert type(pivot.groups[(("K",), None)].result("SUM")) is int
+
+
+def test_random_refresh_matches_rebuild():
+    rng = random.Random(32)
+    for func in AGGREGATES:
+        for column_fields in ((), (1,)):
+            store = _source(rng, 30)
+            pivot = PivotTable(store, (0, 0, 30, 2), [0], 2, func, column_fields)
+            pivot.build()
+
+            for _ in range(150):
+                row, col = rng.randint(1, 30), rng.choice((0, 1, 2, 2))
+                store.set(row, col, rng.choice(REGIONS if col == 0 else VALUES))
+                pivot.refresh([(row, col)])
+
+                fresh = PivotTable(store, (0, 0, 30, 2), [0], 2, func, column_fields)
+                fresh.build()
+                assert pivot._cells == fresh._cells, (func, column_fields)
@@ -0,0 +1,107 @@
+import random
+
+from cell_store import display_value
+from formula_engine import FormulaEngine
+from search import Query, SheetIndex, _required_literal
+
+WORDS = ("Total", "TOTAL", "total", "İstanbul", "ISTANBUL", "ıi", "II", "a.b", "axb", "abc", "ac", "ABBC", "x", "ab")
+
+
+def _scan(engine, query, look_in):
+    """
+    Dizinsiz karşılaştırma: tüm hücreler tek tek sınanır
+    """
+    store = engine.store
+    cells = {(row, col) for row, col, _ in store.cells()} | set(store.formulas)
+    found = []
+    for row, col in sorted(cells):
+        text = store.source(row, col) if look_in == "formulas" else display_value(store.get(row, col))
+        if text and query.matches(text):
+            found.append((row, col, text))
+    return found
+
+
+def _engine():
+    engine = FormulaEngine()
+    engine.set_cells([(row, 0, word) for row, word in enumerate(WORDS)])
+    engine.set_cells([(row, 1, f'=A{row + 1}&"-{row}"') for row in range(len(WORDS))])
+    return engine
+
+
+def test_case_insensitive_and_case_sensitive_find():
+    engine = _engine()
+    index = SheetIndex(engine)
+
+    assert [row for row, col, _ in index.find(Query("total"), "values") if col == 0] == [0, 1, 2]
+    assert [row for row, col, _ in index.find(Query("total", match_case=True), "values") if col == 0] == [2]
+    assert [text for _, col, text in index.find(Query("Total", whole_cell=True), "values") if col == 0] == ["Total", "TOTAL", "total"]
+
+    # re.IGNORECASE eşdeğerleri dizinde ayrılmaz: İ/i/I/ı
+    assert [row for row, col, _ in index.find(Query("istanbul"), "values") if col == 0] == [3, 4]
+    assert [row for row, col, _ in index.find(Query("İSTANBUL"), "values") if col == 0] == [3, 4]
+    assert [row for row, col, _ in index.find(Query("ıi"), "values") if col == 0] == [5, 6]
+
+    for text in ("total", "İstanbul", "ıi", "TAL-", "=a"):
+        for match_case in (False, True):
+            for look_in in ("formulas", "values"):
+                query = Query(text, match_case=match_case)
+                assert index.find(query, look_in) == _scan(engine, query, look_in), (text, match_case, look_in)
+
+
+def test_regex_prefilter_keeps_every_match():
+    assert _required_literal("ab?c") == "a"
+    assert _required_literal(r"\.") == "."
+    assert _required_literal(r"a\.b") == "a.b"
+    assert _required_literal("abc+") == "abc"
+    assert _required_literal("x{2}yz") == "yz"
+    assert _required_literal("(total)s") == "s"
+    assert _required_literal("a|b") is None
+
+    engine = _engine()
+    index = SheetIndex(engine)
+    assert [row for row, col, _ in index.find(Query("ab?c", regex=True), "values") if col == 0] == [9, 10]
+    assert [row for row, col, _ in index.find(Query(r"a\.b", regex=True), "values") if col == 0] == [7]
+    assert [row for row, col, _ in index.find(Query("a.b", regex=True), "values") if col == 0] == [3, 4, 7, 8, 11]
+
+    for pattern in ("ab?c", r"\.", "a.b", "abc+", "AB+C", "^t.t", "l$", "(total)", "[ai]i", "a|x", r"\d$", "İst"):
+        for match_case in (False, True):
+            for look_in in ("formulas", "values"):
+                query = Query(pattern, match_case=match_case, regex=True)
+                assert index.find(query, look_in) == _scan(engine, query, look_in), (pattern, match_case, look_in)
+
+
+def test_short_queries_scan_every_cell():
+    engine = _engine()
+    index = SheetIndex(engine)
+    for text in ("x", "ab", "I", "-1", "."):
+        query = Query(text)
+        # n-gram'dan kısa: ön süzgeç yok, tüm dolu hücreler adaydır
+        assert len(index.index("values").candidates(query.literal)) == len(index.index("values"))
+        assert index.find(query, "values") == _scan(engine, query, "values")
+        assert index.find(query, "formulas") == _scan(engine, query, "formulas")
+
+
+def test_index_follows_edits():
+    rng = random.Random(50)
+    engine = _engine()
+    index = SheetIndex(engine)
+    queries = [Query(word) for word in ("total", "abc", "stan", "xyz", "-1")] + [Query("a.?b", regex=True)]
+    for query in queries:
+        index.find(query, "formulas")
+        index.find(query, "values")
+
+    for _ in range(200):
+        row = rng.randrange(len(WORDS) + 3)
+        k = rng.random()
+        if k < 0.5:
+            engine.set_cell(row, 0, rng.choice(WORDS + ("xyz", "")))
+        elif k < 0.7:
+            engine.set_cell(row, 1, rng.choice(("", f'=A{row + 1}&"abc"', "totally")))
+        else:
+            block = [(r, 0, rng.choice(WORDS)) for r in range(row, row + 3)]
+            engine.paste([(r, c, text) for r, c, text in block])
+
+        query = rng.choice(queries)
+        # formül değerleri (B) A düzenlenince değişir: "values" dizini onları da izler
+        assert index.find(query, "values") == _scan(engine, query, "values")
+        assert index.find(query, "formulas") == _scan(engine, query, "formulas")
@@ -0,0 +1,66 @@
+import random
+
+from formula_engine import FormulaEngine
+from sorting import permuted_sources, sort_order
+
+TOP, BOTTOM = 1, 8
+
+
+def _engine(rng):
+    """
+    A2:D9 sıralanır. C: bir üst satırı okuyan yürüyen toplam (C2 için C1
+    blok dışında), D: mutlak blok toplamı, dışarıdaki $F$1 ve F sütunu
+    """
+    engine = FormulaEngine()
+    engine.set_cells([(0, 2, "0"), (0, 5, "1000")])
+    for row in range(TOP, BOTTOM + 1):
+        r = row + 1
+        engine.set_cells([
+            (row, 0, str(rng.randint(1, 4))),
+            (row, 1, str(rng.randint(-9, 9))),
+            (row, 2, f"=C{r - 1}+B{r}"),
+            (row, 3, f"=SUM($B$2:$B$9)-B{r}+$F$1+F{r}"),
+            (row, 5, str(row * 100)),
+        ])
+    return engine
+
+
+def _sort(engine, keys):
+    order = sort_order(engine.store, TOP, BOTTOM, keys)
+    engine.set_cells(permuted_sources(engine.store, TOP, 0, BOTTOM, 3, order))
+    return order
+
+
+def test_sort_rewrites_relative_references_by_row():
+    rng = random.Random(31)
+    engine = _engine(rng)
+    before = {row: (engine.value(row, 0), engine.value(row, 1)) for row in range(TOP, BOTTOM + 1)}
+
+    order = _sort(engine, [(0, True), (1, False)])
+    keys = [before[row] for row in order]
+    assert keys == sorted(keys, key=lambda k: (k[0], -k[1]))
+
+    total, running = sum(b for _, b in keys), 0
+    for row, (a, b) in zip(range(TOP, BOTTOM + 1), keys):
+        r = row + 1
+        # formül metni satırıyla taşınır: göreli satırlar yeni yere göre
+        assert engine.formula(row, 2) == f"C{r - 1}+B{r}"
+        assert engine.formula(row, 3) == f"SUM($B$2:$B$9)-B{r}+$F$1+F{r}"
+
+        running += b
+        assert (engine.value(row, 0), engine.value(row, 1)) == (a, b)
+        assert engine.value(row, 2) == running
+        assert engine.value(row, 3) == total - b + 1000 + row * 100
+
+    # sıralama sonrası düzenleme yeni sırayla yayılır
+    engine.set_cell(TOP, 1, "50")
+    engine.set_cell(0, 5, "0")
+    assert engine.value(BOTTOM, 2) == running - keys[0][1] + 50
+    assert engine.value(BOTTOM, 3) == total - keys[0][1] + 50 - keys[-1][1] + BOTTOM * 100
+
+
+def test_sort_is_stable_and_blanks_go_last():
+    engine = FormulaEngine()
+    engine.set_cells([(row, 0, text) for row, text in enumerate(["b", "", "2", "a", "1", "TRUE", ""], 1)])
+    order = sort_order(engine.store, 1, 7, [(0, True)])
+    assert order == [5, 3, 4, 1, 6, 2, 7]
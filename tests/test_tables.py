@@ -0,0 +1,87 @@
+import random
+
+from formula_engine import FormulaEngine
+from tables import table_headers
+
+# (satır, sütun, formül); {Amount}, {Price}, {Data} tablonun o anki aralığıyla açılır
+FORMULAS = [
+    (0, 5, "=SUM({Amount})"),
+    (1, 5, "=COUNT({Price})"),
+    (2, 5, "=F1/F2"),
+    (3, 5, "=AVERAGE({Price})"),
+    (4, 5, "=MAX({Data})+MIN({Amount})"),
+]
+STRUCTURED = {"Amount": "Sales[Amount]", "Price": "Sales[Price]", "Data": "Sales[]"}
+
+
+def _ranges(bottom):
+    last = max(bottom, 1) + 1
+    return {
+        "Amount": f"B2:B{last}",
+        "Price": f"C2:C{last}",
+        "Data": f"A2:C{last}",
+    }
+
+
+def _engines(rng, rows):
+    cells = [(0, 0, "Item"), (0, 1, "Amount"), (0, 2, "Price")]
+    for row in range(1, rows + 1):
+        cells += [(row, 0, str(row)), (row, 1, str(rng.randint(-9, 9))), (row, 2, str(rng.uniform(0, 5)))]
+
+    tabled, typed = FormulaEngine(), FormulaEngine()
+    for engine in (tabled, typed):
+        engine.set_cells(cells)
+    tabled.names.add_table("Sales", None, 0, 0, rows, 2, table_headers(tabled.store, 0, 0, 2))
+    tabled.set_cells([(row, col, text.format(**STRUCTURED)) for row, col, text in FORMULAS])
+    tabled.set_cell(0, 6, "=$B1*MAX(Sales[Price])")
+    tabled.fill(0, 6, 9, 6)
+    return tabled, typed
+
+
+def _retype(typed, bottom):
+    ranges = _ranges(bottom)
+    typed.set_cells([(row, col, text.format(**ranges)) for row, col, text in FORMULAS])
+    typed.set_cells([(row, 6, f"=$B{row + 1}*MAX({ranges['Price']})") for row in range(10)])
+
+
+def _compare(tabled, typed):
+    for row, col, _ in FORMULAS:
+        assert tabled.value(row, col) == typed.value(row, col), (row, col)
+    for row in range(10):
+        assert tabled.value(row, 6) == typed.value(row, 6), row
+
+
+def test_growing_and_shrinking_a_table_recalculates_its_users():
+    rng = random.Random(48)
+    # 100+ satır: sütun toplamları aralık önbelleğine girer (resize farkla uygulanır)
+    tabled, typed = _engines(rng, 120)
+    table = tabled.names.tables.get("sales")
+    _retype(typed, table.bottom)
+    _compare(tabled, typed)
+
+    for _ in range(40):
+        action = rng.random()
+        if action < 0.4:
+            # altına yazılan satır tabloyu büyütür
+            row = table.bottom + 1
+            entries = [(row, 1, str(rng.randint(-9, 9))), (row, 2, str(rng.uniform(0, 5)))]
+            for engine in (tabled, typed):
+                engine.set_cells(entries)
+        elif action < 0.7:
+            tabled.names.resize_table("Sales", rng.randint(0, table.bottom))
+        else:
+            row, col, text = rng.randint(1, 130), rng.choice((1, 2)), str(rng.randint(-9, 9))
+            for engine in (tabled, typed):
+                engine.set_cell(row, col, text)
+        _retype(typed, table.bottom)
+        _compare(tabled, typed)
+
+    assert tabled.evaluator.aggregates.deltas > 0
+
+
+def test_appended_row_joins_table():
+    tabled, typed = _engines(random.Random(1), 3)
+    tabled.set_cell(4, 1, "100")
+    assert tabled.names.tables.get("sales").bottom == 4
+    assert tabled.value(0, 5) == sum(tabled.value(row, 1) for row in range(1, 5))
+    assert tabled.value(2, 5) == tabled.value(0, 5) / 3
@@ -0,0 +1,57 @@
+from workbook import Workbook
+
+
+def _workbook():
+    workbook = Workbook()
+    workbook.add_sheet("Sheet1")
+    workbook.add_sheet("Sheet2")
+    workbook.engine("Sheet1").set_cells([(0, 0, "1"), (1, 0, "2")])
+    workbook.engine("Sheet2").set_cells([(0, 0, "=Sheet1!A1*10"), (1, 0, "=SUM(Sheet1!A:A)+A1")])
+    return workbook
+
+
+def test_edit_reaches_dependent_sheet():
+    workbook = _workbook()
+    sheet2 = workbook.engine("Sheet2")
+    changes = []
+    sheet2.add_listener(changes.append)
+
+    workbook.engine("Sheet1").set_cell(0, 0, "5")
+    assert (sheet2.value(0, 0), sheet2.value(1, 0)) == (50, 57)
+    assert changes == [[(0, 0), (1, 0)]]
+
+    # yalnızca tüm sütun alanına düşen hücre: tek okuyucu
+    workbook.engine("Sheet1").set_cell(9, 0, "3")
+    assert sheet2.value(1, 0) == 60
+    assert changes[-1] == [(1, 0)]
+
+
+def test_unloaded_sheet_sees_edits_made_before_it_loads():
+    workbook = _workbook()
+    workbook.add_sheet("Lazy", loader=lambda: [(0, 0, "=Sheet1!A2+Sheet2!A1")])
+
+    workbook.engine("Sheet1").set_cell(0, 0, "5")
+    assert not workbook.sheet("Lazy").loaded
+    lazy = workbook.engine("Lazy")
+    assert lazy.value(0, 0) == 52
+
+    # yüklendikten sonra kenarları kayıtlı: düzenleme ona da yayılır
+    changes = []
+    lazy.add_listener(changes.append)
+    workbook.engine("Sheet1").set_cell(1, 0, "7")
+    assert lazy.value(0, 0) == 57
+    assert changes == [[(0, 0)]]
+
+
+def test_reading_an_unloaded_sheet_loads_it():
+    workbook = _workbook()
+    workbook.add_sheet("Data", loader=lambda: [(0, 0, "4"), (1, 0, "=A1*2")])
+    sheet2 = workbook.engine("Sheet2")
+    sheet2.set_cell(2, 0, "=Data!A2+A1")
+    assert workbook.sheet("Data").loaded and sheet2.value(2, 0) == 18
+
+    changes = []
+    sheet2.add_listener(changes.append)
+    workbook.engine("Data").set_cell(0, 0, "1")
+    assert sheet2.value(2, 0) == 12
+    assert changes == [[(2, 0)]]
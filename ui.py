@@ -17,16 +17,40 @@ from PySide6.QtWidgets import (
     QComboBox,
     QColorDialog,
     QTabWidget,
-    QDialog
+    QDialog,
+    QInputDialog,
+    QFileDialog,
+    QHeaderView,
+    QStackedWidget,
+    QTabBar,
+    QCheckBox,
+    QGridLayout
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QGuiApplication, QColor, QBrush
-from formula_engine import FormulaEngine
-from utils import index_to_cell
+from contextlib import contextmanager
+from itertools import count
+from PySide6.QtCore import QByteArray, QMimeData, Qt
+from PySide6.QtGui import QGuiApplication, QKeySequence, QShortcut
+from autofilter import AutoFilter, Between, Contains, Equals, NonBlank, TopN
+from cell_store import display_value
+from clipboard import MIME_TYPE, block_text, copy_block, decode, encode, from_text, paste_cells, paste_origins, paste_styles
+from memory import AllocationTracker, format_bytes, memory_report
+from sorting import permuted_sources, sort_order
+from number_format import split_format
+from pivot import AGGREGATES, PivotTable
+from search import Query
+from delegate import CellDelegate, WORD_WRAP
+from styles import StyleIndex
+from tables import table_headers
+from undo import UndoJournal
+from utils import cell_to_index, column_name, index_to_cell
+from workbook import Workbook
 
 ROWS = 60
 COLS = 30
 
+# sayfa başına UI durumu: sayfa değişince bu öznitelikler takas edilir
+SHEET_STATE = ("table", "engine", "styles", "journal", "delegate", "autofilter", "pivots", "_edit_snapshots")
+
 
 class MiniExcelUI(QMainWindow):
     def __init__(self):
@@ -38,10 +62,10 @@ class MiniExcelUI(QMainWindow):
         # ===============================
         # STATE
         # ===============================
-        self.undo_stack = []
         self._undo_block = False
         self._format_painter_active = False
         self._copied_format = None
+        self._find_dialog = None
 
         # ===============================
         # CENTRAL + LAYOUT
@@ -120,6 +144,10 @@ class MiniExcelUI(QMainWindow):
         self.undo_button.setFixedWidth(32)
         home_layout.addWidget(self.undo_button)
 
+        self.redo_button = QPushButton("⟳")
+        self.redo_button.setFixedWidth(32)
+        home_layout.addWidget(self.redo_button)
+
         self.clipboard_button = QToolButton()
         self.clipboard_button.setText("📋")
         self.clipboard_button.setPopupMode(QToolButton.InstantPopup)
@@ -237,9 +265,15 @@ class MiniExcelUI(QMainWindow):
         self.filter_button = QToolButton()
         self.filter_button.setText("Filter")
         self.filter_button.setCheckable(True)
-        self.filter_button.setFixedWidth(50)
+        self.filter_button.setPopupMode(QToolButton.MenuButtonPopup)
+        self.filter_button.setFixedWidth(62)
         home_layout.addWidget(self.filter_button)
 
+        self.find_button = QToolButton()
+        self.find_button.setText("Find")
+        self.find_button.setFixedWidth(44)
+        home_layout.addWidget(self.find_button)
+
         sizes = [
             "8", "9", "10", "11", "12", "14", "16",
             "18", "20", "22", "24", "26", "28", "36", "48", "72"
@@ -269,32 +303,113 @@ class MiniExcelUI(QMainWindow):
         insert_layout.addWidget(self.insert_chart_btn)
 
         # ===============================
-        # TABLE
+        # FORMULAS TAB
         # ===============================
-        self.table = QTableWidget(ROWS, COLS)
-        main_layout.addWidget(self.table)
+        formulas_layout = QHBoxLayout(self.formulas_tab)
+        formulas_layout.setContentsMargins(6, 4, 6, 4)
+        formulas_layout.setSpacing(8)
 
-        self._setup_headers()
-        self._setup_table_behavior()
+        self.profile_btn = QPushButton("Profile Recalc")
+        self.profile_btn.setCheckable(True)
+        formulas_layout.addWidget(self.profile_btn)
+        self.profile_btn.toggled.connect(self._toggle_profiling)
+
+        self.slowest_btn = QPushButton("Slowest Formulas…")
+        formulas_layout.addWidget(self.slowest_btn)
+        self.slowest_btn.clicked.connect(self._show_profiler)
+
+        self.names_btn = QPushButton("Name Manager…")
+        formulas_layout.addWidget(self.names_btn)
+        self.names_btn.clicked.connect(self._show_names)
+
+        # ===============================
+        # DATA TAB
+        # ===============================
+        data_layout = QHBoxLayout(self.data_tab)
+        data_layout.setContentsMargins(6, 4, 6, 4)
+        data_layout.setSpacing(8)
+
+        self.custom_sort_btn = QPushButton("Sort…")
+        data_layout.addWidget(self.custom_sort_btn)
+        self.custom_sort_btn.clicked.connect(self._custom_sort)
+
+        self.fill_down_btn = QPushButton("Fill Down")
+        data_layout.addWidget(self.fill_down_btn)
+        self.fill_down_btn.clicked.connect(lambda: self._fill("down"))
+
+        self.fill_right_btn = QPushButton("Fill Right")
+        data_layout.addWidget(self.fill_right_btn)
+        self.fill_right_btn.clicked.connect(lambda: self._fill("right"))
 
         # ===============================
-        # ENGINE
+        # VIEW TAB
+        # ===============================
+        view_layout = QHBoxLayout(self.view_tab)
+        view_layout.setContentsMargins(6, 4, 6, 4)
+        view_layout.setSpacing(8)
+
+        self.memory_btn = QPushButton("Memory Report…")
+        view_layout.addWidget(self.memory_btn)
+        self.memory_btn.clicked.connect(self._show_memory)
+
         # ===============================
-        self.engine = FormulaEngine(self.table)
+        # SHEETS (her sayfa kendi tablosu + motoru)
+        # ===============================
+        self.sheet_stack = QStackedWidget()
+        main_layout.addWidget(self.sheet_stack)
+
+        sheet_layout = QHBoxLayout()
+        sheet_layout.setContentsMargins(6, 0, 6, 2)
+        sheet_layout.setSpacing(4)
+
+        self.sheet_tabs = QTabBar()
+        self.sheet_tabs.setShape(QTabBar.RoundedSouth)
+        sheet_layout.addWidget(self.sheet_tabs)
+
+        self.add_sheet_btn = QToolButton()
+        self.add_sheet_btn.setText("+")
+        sheet_layout.addWidget(self.add_sheet_btn)
+        sheet_layout.addStretch()
+
+        main_layout.addLayout(sheet_layout)
+
+        self.workbook = Workbook()
+        self.sheet_states = []
+        self.sheet_index = 0
+        self.workbook.add_sheet("Sheet1")
+        self.sheet_states.append(None)
+        self.sheet_tabs.addTab("Sheet1")
+        self._open_sheet("Sheet1")
 
         # ===============================
         # MENUS
         # ===============================
         self._setup_function_menu()
         self._setup_clipboard_menu()
+        self._setup_filter_menu()
 
         # ===============================
         # SIGNALS
         # ===============================
-        self.table.itemChanged.connect(self._on_item_changed)
-        self.table.currentItemChanged.connect(self._on_cell_selected)
+        self.sheet_tabs.currentChanged.connect(self._switch_sheet)
+        self.add_sheet_btn.clicked.connect(self._add_sheet)
         self.formula_bar.returnPressed.connect(self._apply_formula_from_bar)
         self.undo_button.clicked.connect(self._undo)
+        self.redo_button.clicked.connect(self._redo)
+        QShortcut(QKeySequence.Undo, self, self._undo)
+        QShortcut(QKeySequence.Redo, self, self._redo)
+        QShortcut(QKeySequence.Copy, self, self._copy_selection)
+        QShortcut(QKeySequence.Cut, self, self._cut_selection)
+        QShortcut(QKeySequence.Paste, self, self._paste_selection)
+        # panodaki QMimeData Python'da oluşturuldu: yorumlayıcı kapanmadan
+        # Qt'nin kendi (düz metin) kopyasıyla değiştirilir, TSV diğer uygulamalarda kalır
+        QGuiApplication.instance().aboutToQuit.connect(self._release_clipboard)
+        QShortcut(QKeySequence("Ctrl+D"), self, lambda: self._fill("down"))
+        QShortcut(QKeySequence("Ctrl+R"), self, lambda: self._fill("right"))
+        QShortcut(QKeySequence("Ctrl+Up"), self, lambda: self._jump(-1, 0))
+        QShortcut(QKeySequence("Ctrl+Down"), self, lambda: self._jump(1, 0))
+        QShortcut(QKeySequence("Ctrl+Left"), self, lambda: self._jump(0, -1))
+        QShortcut(QKeySequence("Ctrl+Right"), self, lambda: self._jump(0, 1))
         self.format_button.clicked.connect(self._toggle_format_painter)
         self.font_box.currentFontChanged.connect(self._change_font)
         self.font_size_box.currentTextChanged.connect(self._change_font_size)
@@ -314,6 +429,74 @@ class MiniExcelUI(QMainWindow):
         self.sort_asc_button.clicked.connect(lambda: self._sort_column(Qt.AscendingOrder))
         self.sort_desc_button.clicked.connect(lambda: self._sort_column(Qt.DescendingOrder))
         self.filter_button.clicked.connect(self._toggle_filter)
+        self.find_button.clicked.connect(lambda: self._show_find(False))
+        QShortcut(QKeySequence.Find, self, lambda: self._show_find(False))
+        QShortcut(QKeySequence("Ctrl+H"), self, lambda: self._show_find(True))
+
+    # ==================================================
+    # SHEETS
+    # ==================================================
+    def _open_sheet(self, name):
+        """
+        Sayfanın tablosunu ilk açılışta kurar; sayfa motoru gerekirse
+        bu an yüklenir (lazy) ve değerleri tabloya yazılır.
+        """
+        self.table = QTableWidget(ROWS, COLS)
+        self.sheet_stack.addWidget(self.table)
+        self.sheet_stack.setCurrentWidget(self.table)
+
+        self._setup_headers()
+        self._setup_table_behavior()
+
+        self.engine = self.workbook.engine(name)
+        self.engine.table = self.table
+        self.styles = StyleIndex()
+        self.journal = UndoJournal(self._capture)
+        self.autofilter = None
+        self.pivots = []
+        self._edit_snapshots = {}
+
+        self.delegate = CellDelegate(self.styles, self.engine.store, self.table)
+        self.table.setItemDelegate(self.delegate)
+
+        store = self.engine.store
+        cells = {(row, col) for row, col, _ in store.cells()} | set(store.formulas)
+        self.table.blockSignals(True)
+        for row, col in cells:
+            if row < ROWS and col < COLS:
+                self.table.setItem(row, col, QTableWidgetItem(display_value(store.get(row, col))))
+        self.table.blockSignals(False)
+
+        engine = self.engine
+        self.table.itemChanged.connect(self._on_item_changed)
+        self.table.currentItemChanged.connect(self._on_cell_selected)
+        self.table.currentCellChanged.connect(self._remember_cell)
+        # başka sayfadan tetiklenen recalc etkin olmayan sayfanın filtresine dokunmaz
+        engine.add_listener(lambda cells: self._on_values_changed(cells) if engine is self.engine else None)
+
+    def _switch_sheet(self, index):
+        if index < 0 or index == self.sheet_index:
+            return
+
+        self.sheet_states[self.sheet_index] = {name: getattr(self, name) for name in SHEET_STATE}
+        self.sheet_index = index
+
+        state = self.sheet_states[index]
+        if state is None:
+            self._open_sheet(self.workbook.names[index])
+        else:
+            for name, value in state.items():
+                setattr(self, name, value)
+            self.sheet_stack.setCurrentWidget(self.table)
+
+        self.filter_button.setChecked(self.autofilter is not None)
+        self._on_cell_selected(self.table.currentItem(), None)
+
+    def _add_sheet(self):
+        name = next(f"Sheet{n}" for n in count(len(self.workbook) + 1) if f"Sheet{n}" not in self.workbook)
+        self.workbook.add_sheet(name)
+        self.sheet_states.append(None)
+        self.sheet_tabs.setCurrentIndex(self.sheet_tabs.addTab(name))
 
     # ==================================================
     # SETUP
@@ -369,145 +552,343 @@ class MiniExcelUI(QMainWindow):
     # ==================================================
     def _setup_clipboard_menu(self):
         menu = QMenu(self)
-        menu.addAction("Copy", self._copy_cell)
-        menu.addAction("Cut", self._cut_cell)
-        menu.addAction("Paste", self._paste_cell)
+        menu.addAction("Copy", self._copy_selection)
+        menu.addAction("Cut", self._cut_selection)
+        menu.addAction("Paste", self._paste_selection)
 
         self.clipboard_button.setMenu(menu)
 
-
-    def _copy_cell(self):
-        item = self.table.currentItem()
-        if item:
-            QGuiApplication.clipboard().setText(item.text())
-
-    def _cut_cell(self):
-        item = self.table.currentItem()
-        if not item:
+    def _selected_bounds(self):
+        """
+        Seçili aralıklar [(top, left, bottom, right)]; seçim yoksa geçerli hücre
+        """
+        ranges = self.table.selectedRanges()
+        if ranges:
+            return [(r.topRow(), r.leftColumn(), r.bottomRow(), r.rightColumn()) for r in ranges]
+        row, col = self.table.currentRow(), self.table.currentColumn()
+        if row < 0 or col < 0:
+            return []
+        return [(row, col, row, col)]
+
+    def _copy_selection(self):
+        self._set_clipboard(relative=True)
+
+    def _set_clipboard(self, relative, moved=False):
+        """
+        Seçimi panoya koyar: diğer uygulamalar için TSV, kendimiz için
+        formül + stil taşıyan zengin biçim (MIME_TYPE). Dönüş: blok
+        """
+        try:
+            block = copy_block(self.engine, self.styles, self._selected_bounds(), relative, moved)
+        except ValueError:
+            return None
+
+        mime = QMimeData()
+        mime.setText(block_text(self.engine.store, block))
+        mime.setData(MIME_TYPE, QByteArray(encode(block)))
+        QGuiApplication.clipboard().setMimeData(mime)
+        return block
+
+    def _release_clipboard(self):
+        clipboard = QGuiApplication.clipboard()
+        mime = clipboard.mimeData()
+        if mime is not None and mime.hasFormat(MIME_TYPE):
+            clipboard.setText(clipboard.text())
+
+    def _cut_selection(self):
+        """
+        Kopyalar ve kaynağı boşaltır; yapıştırılan formüller kaydırılmaz (taşıma),
+        yalnızca bloğun içini gösteren referansları bloğu izler
+        """
+        block = self._set_clipboard(relative=False, moved=True)
+        if block is None or not (block.values or block.cells):
             return
-        self._push_undo_state(item)
-        QGuiApplication.clipboard().setText(item.text())
-        self.table.blockSignals(True)
-        item.setText("")
-        item.setData(Qt.UserRole, None)
-        self.table.blockSignals(False)
-        self.engine.process_item(item)
 
-    def _paste_cell(self):
-        item = self.table.currentItem()
-        if not item:
+        entries = [(block.rows[i], block.cols[j], None) for i, j, _ in block.values + block.cells]
+        with self._undo_group("Cut"):
+            self._push_undo_blocks(self._selected_bounds())
+            self._paste_entries(entries, [])
+
+        self._update_cells(self._selected_bounds())
+
+    def _paste_selection(self):
+        """
+        Panodaki blok her seçili aralığa (aralık bloğun katıysa döşenerek)
+        yapıştırılır: tek undo adımı, motorda tek toplu yazım ve recalc
+        """
+        mime = QGuiApplication.clipboard().mimeData()
+        block = decode(mime.data(MIME_TYPE).data()) if mime.hasFormat(MIME_TYPE) else None
+        if block is None:
+            block = from_text(mime.text())
+        if block is None:
             return
-        text = QGuiApplication.clipboard().text()
-        if not text:
+
+        targets = self._selected_bounds()
+        if not targets:
             return
-        self._push_undo_state(item)
-        self.table.blockSignals(True)
-        item.setText(text)
-        self.table.blockSignals(False)
-        self.engine.process_item(item)
+
+        store = self.engine.store
+        rects, values, groups = [], [], []
+        with self._undo_group("Paste"):
+            for top, left in paste_origins(block, targets):
+                rect = (top, left, top + block.height - 1, left + block.width - 1)
+                # üst üste binen hedeflere ikinci kez yazılmaz
+                if any(t <= rect[2] and rect[0] <= b and l <= rect[3] and rect[1] <= r for t, l, b, r in rects):
+                    continue
+                rects.append(rect)
+
+                cell_values, cell_groups = paste_cells(block, top, left, store)
+                self._push_undo_blocks([rect])
+                if block.styles:
+                    self._push_style_state(range(left, left + block.width))
+                    paste_styles(block, top, left, self.styles)
+                values += cell_values
+                groups += cell_groups
+
+            self._paste_entries(values, groups)
+
+        self._update_cells(rects)
+
+    def _paste_entries(self, values, groups):
+        """
+        values: [(row, col, tipli değer)], groups: aynı şekilli formül
+        kopyaları; motor bloğu tek parti olarak yazar
+        """
+        rows, cols = self.table.rowCount(), self.table.columnCount()
+        entries = [(row, col, display_value(value)) for row, col, value in values if row < rows and col < cols]
+        entries += [cell for cells in groups for cell in cells if cell[0] < rows and cell[1] < cols]
+        self._write_items(entries)
+        self.engine.paste(values, groups)
 
     # ==================================================
     # UNDO
     # ==================================================
+    @contextmanager
+    def _undo_group(self, label):
+        """
+        Bir kullanıcı işlemini tek undo adımı olarak kaydeder
+        """
+        with self.journal.group(label):
+            yield
+        self._remember_cell(self.table.currentRow(), self.table.currentColumn())
+
     def _push_undo_state(self, item):
         if self._undo_block:
             return
+        self.journal.record((item.row(), item.column()))
 
-        self.undo_stack.append(
-            (
-                item.row(),
-                item.column(),
-                item.text(),
-                item.data(Qt.UserRole),
-                item.data(Qt.UserRole + 1),
-                item.background(),
-                item.foreground(),
-                item.data(Qt.UserRole + 2)
-            )
-        )
-        
-
-
-    def _undo(self):
-        if not self.undo_stack:
+    def _push_undo_cells(self, keys):
+        if self._undo_block:
             return
-        row, col, text, formula, border, bg, fg, number_format = self.undo_stack.pop()
-        item = self.table.item(row, col)
-        if not item:
+        for key in keys:
+            self.journal.record(key)
+
+    def _push_undo_blocks(self, rects):
+        """
+        Büyük bloklar (yapıştırma) hücre başına değil dikdörtgen başına
+        kaydedilir: snapshot yalnızca dolu hücrelerdir
+        """
+        if self._undo_block:
+            return
+        for rect in rects:
+            self.journal.record(("cells",) + tuple(rect))
+
+    def _push_style_state(self, cols, rows=False):
+        """
+        Stil değişikliğinden önce etkilenen sütun run'larını kaydeder
+        (hücre başına değil, run başına).
+        """
+        if self._undo_block:
             return
+        for col in cols:
+            self.journal.record(("column", col))
+        if rows:
+            self.journal.record(("rows",))
+
+    def _capture(self, key):
+        if key[0] == "column":
+            return self.styles.snapshot_column(key[1])
+        if key[0] == "rows":
+            return self.styles.snapshot_rows()
+        if key[0] == "cells":
+            return tuple(self.engine.store.sources(*key[1:]))
+        return self._cell_snapshot(key)
+
+    def _cell_snapshot(self, key):
+        """
+        Hücrenin kaynak metni (formül ya da değer); boşsa None.
+        Format bilgisi hücrede değil StyleIndex'te tutulur.
+        """
+        item = self.table.item(*key)
+        if item is None:
+            # görünen ızgaranın dışı (yapıştırma) yalnızca depoda
+            return self.engine.store.source(*key) or None
+
+        formula = self.engine.formula(*key)
+        source = "=" + formula if formula else item.text()
+        return source or None
+
+    def _replay(self, changes):
+        """
+        Undo/redo adımını uygular: hücreler geri yüklenir,
+        formüller tek bir toplu recalc ile hesaplanır.
+        """
+        if not changes:
+            return
+
         self._undo_block = True
-        item.setText(text or "")
-        item.setData(Qt.UserRole, formula)
-        item.setData(Qt.UserRole + 1, border)
-        item.setBackground(bg)
-        item.setForeground(fg)
-        item.setData(Qt.UserRole + 2, number_format)
+        entries = []
+        for key, snapshot in changes:
+            if key[0] == "column":
+                self.styles.restore_column(key[1], snapshot)
+            elif key[0] == "rows":
+                self.styles.restore_rows(snapshot)
+            elif key[0] == "cells":
+                # bloktaki şimdiki dolu hücreler boşalır, snapshot'takiler geri yazılır
+                block = {(row, col): "" for row, col, _ in self.engine.store.sources(*key[1:])}
+                block.update(((row, col), text) for row, col, text in snapshot or ())
+                entries += [(row, col, text) for (row, col), text in block.items()]
+            else:
+                entries.append((key[0], key[1], snapshot or ""))
+
+        self._write_sources(entries)
         self._undo_block = False
-        self.engine.process_item(item)
+
+        self.table.viewport().update()
+        self._remember_cell(self.table.currentRow(), self.table.currentColumn())
+
+    def _undo(self):
+        self._replay(self.journal.undo())
+
+    def _redo(self):
+        self._replay(self.journal.redo())
+
+    def _remember_cell(self, row, col, *_):
+        """
+        Düzenleme öncesi durumu saklar (itemChanged geldiğinde eski metin kaybolmuş olur).
+        Önceki hücrenin kaydı da tutulur; editör hücre değişirken kapanabilir.
+        """
+        if row < 0 or col < 0:
+            return
+        key = (row, col)
+        kept = {k: v for k, v in self._edit_snapshots.items() if k != key}
+        kept = dict(list(kept.items())[-1:])
+        kept[key] = self._cell_snapshot(key)
+        self._edit_snapshots = kept
 
     def _on_item_changed(self, item):
         if self._undo_block:
             return
-        self._push_undo_state(item)
-        self.engine.process_item(item)
-        self._apply_number_format(item)
+        key = (item.row(), item.column())
+        with self._undo_group("Edit"):
+            if key in self._edit_snapshots:
+                self.journal.record(key, self._edit_snapshots[key])
+            self.engine.process_item(item)
 
     # ==================================================
     # FORMAT PAINTER
     # ==================================================
     def _toggle_format_painter(self):
-        item = self.table.currentItem()
-        if not item:
+        row, col = self.table.currentRow(), self.table.currentColumn()
+        if row < 0 or col < 0:
             self.format_button.setChecked(False)
             return
         if self.format_button.isChecked():
-            self._copied_format = {
-                "font": item.font(),
-                "foreground": item.foreground(),
-                "background": item.background(),
-                "alignment": item.textAlignment(),
-            }
+            self._copied_format = self.styles.style_id(row, col)
             self._format_painter_active = True
         else:
             self._format_painter_active = False
 
     def _apply_format(self, item):
-        f = self._copied_format
-        if not f:
+        if self._copied_format is None:
+            return
+        row, col = item.row(), item.column()
+        with self._undo_group("Format Painter"):
+            self._push_style_state([col])
+            self.styles.set_style_id(row, col, row, col, self._copied_format)
+        self._update_cells([(row, col, row, col)])
+
+    # ==================================================
+    # STYLE
+    # ==================================================
+    def _current_style(self):
+        row, col = self.table.currentRow(), self.table.currentColumn()
+        if row < 0 or col < 0:
+            return None
+        return self.styles.style(row, col)
+
+    def _selection_rects(self):
+        """
+        Seçili aralıklar (top, left, bottom, right); seçim yoksa aktif hücre
+        """
+        rects = [
+            (r.topRow(), r.leftColumn(), r.bottomRow(), r.rightColumn())
+            for r in self.table.selectedRanges()
+        ]
+        if not rects:
+            row, col = self.table.currentRow(), self.table.currentColumn()
+            if row >= 0 and col >= 0:
+                rects.append((row, col, row, col))
+        return rects
+
+    def _apply_style(self, label, **changes):
+        """
+        Seçime format uygular. Tam satır/sütun seçimleri satır/sütun
+        stili olarak saklanır; maliyet hücre değil run sayısıyla orantılı.
+        """
+        rects = self._selection_rects()
+        if not rects:
             return
-        item.setFont(f["font"])
-        item.setForeground(f["foreground"])
-        item.setBackground(f["background"])
-        item.setTextAlignment(f["alignment"])
+
+        last_row = self.table.rowCount() - 1
+        last_col = self.table.columnCount() - 1
+
+        with self._undo_group(label):
+            for top, left, bottom, right in rects:
+                whole_cols = top == 0 and bottom == last_row
+                whole_rows = left == 0 and right == last_col
+
+                if whole_rows and not whole_cols:
+                    cols = set(self.styles.columns) | set(self.styles.col_styles)
+                    self._push_style_state(cols, rows=True)
+                    self.styles.apply_rows(top, bottom, **changes)
+                elif whole_cols:
+                    self._push_style_state(range(left, right + 1), rows=True)
+                    self.styles.apply_columns(left, right, **changes)
+                else:
+                    self._push_style_state(range(left, right + 1))
+                    self.styles.apply(top, left, bottom, right, **changes)
+
+        self._update_cells(rects)
+        return rects
+
+    def _update_cells(self, rects):
+        """
+        Yalnızca değişen hücrelerin alanını yeniden çizdirir
+        """
+        model = self.table.model()
+        viewport = self.table.viewport()
+        for top, left, bottom, right in rects:
+            first = self.table.visualRect(model.index(top, left))
+            last = self.table.visualRect(model.index(bottom, right))
+            if first.isValid() and last.isValid():
+                viewport.update(first.united(last))
+            else:
+                viewport.update()
 
     # ==================================================
     # FONT
     # ==================================================
     def _change_font(self, font):
-        item = self.table.currentItem()
-        if not item:
-            return
-        self._push_undo_state(item)
-        f = item.font()
-        f.setFamily(font.family())
-        item.setFont(f)
+        self._apply_style("Font", font_family=font.family())
 
     def _change_font_size(self, size_text):
-        item = self.table.currentItem()
-        if not item:
-            return
-
         try:
             size = int(size_text)
         except ValueError:
             return
 
-        self._push_undo_state(item)
-
-        font = item.font()
-        font.setPointSize(size)
-        item.setFont(font)
-
+        self._apply_style("Font Size", font_size=size)
 
     # ==================================================
     # FORMULA BAR
@@ -521,33 +902,35 @@ class MiniExcelUI(QMainWindow):
         if not current:
             return
 
-        self.cell_label.setText(index_to_cell(current.row(), current.column()))
+        row, col = current.row(), current.column()
+        self.cell_label.setText(index_to_cell(row, col))
 
-        formula = current.data(Qt.UserRole)
+        formula = self.engine.formula(row, col)
         self.formula_bar.setText(
             "=" + formula if formula else current.text()
         )
 
+        style = self.styles.style(row, col)
+        font = self.delegate.font(self.styles.style_id(row, col), self.table.font())
+
         self.font_box.blockSignals(True)
-        self.font_box.setCurrentFont(current.font())
+        self.font_box.setCurrentFont(font)
         self.font_box.blockSignals(False)
 
-        font = current.font()
         self.font_size_box.blockSignals(True)
         self.font_size_box.setCurrentText(str(font.pointSize()))
         self.font_size_box.blockSignals(False)
 
         self.bold_button.blockSignals(True)
-        self.bold_button.setChecked(font.bold())
+        self.bold_button.setChecked(style.bold)
         self.bold_button.blockSignals(False)
-        self._sync_alignment_buttons(current)
+        self._sync_alignment_buttons(style)
 
-        align = current.textAlignment()
         self.wrap_button.blockSignals(True)
-        self.wrap_button.setChecked(bool(align & Qt.TextWordWrap))
+        self.wrap_button.setChecked(bool((style.alignment or 0) & WORD_WRAP))
         self.wrap_button.blockSignals(False)
 
-        fmt = current.data(Qt.UserRole + 2)
+        fmt = style.number_format
         self.number_format_box.blockSignals(True)
         self.number_format_box.setCurrentText(fmt if fmt else "General")
         self.number_format_box.blockSignals(False)
@@ -558,126 +941,135 @@ class MiniExcelUI(QMainWindow):
         if not item:
             return
         text = self.formula_bar.text().strip()
-        self.table.blockSignals(True)
-        item.setText(text)
-        self.table.blockSignals(False)
-        self.engine.process_item(item)
+        with self._undo_group("Edit"):
+            self._push_undo_state(item)
+            self.table.blockSignals(True)
+            item.setText(text)
+            self.table.blockSignals(False)
+            self.engine.process_item(item)
 
     # ==================================================
     # BUTONLAR
     # ==================================================
     def _toggle_bold(self):
-        item = self.table.currentItem()
-        if not item:
+        style = self._current_style()
+        if style is None:
             return
 
-        self._push_undo_state(item)
-
-        font = item.font()
-        is_bold = font.bold()
-
-        font.setBold(not is_bold)
-        item.setFont(font)
+        self._apply_style("Bold", bold=not style.bold)
 
     def _setup_border_menu(self):
         menu = QMenu(self)
 
         menu.addAction("No Border", lambda: self._set_border(None))
         menu.addAction("All Borders", lambda: self._set_border("all"))
+        menu.addAction("Outside Borders", self._set_outside_border)
+        menu.addAction("Bottom Border", lambda: self._set_border("bottom"))
 
         self.border_button.setMenu(menu)
 
     def _set_border(self, mode):
-        item = self.table.currentItem()
-        if not item:
+        self._apply_style("Border", border=mode)
+
+    def _set_outside_border(self):
+        """
+        Seçimin dış çerçevesi: en fazla 9 alt dikdörtgen, her biri tek stil uygulaması
+        """
+        rects = self._selection_rects()
+        if not rects:
             return
 
-        self._push_undo_state(item)
+        with self._undo_group("Outside Borders"):
+            for top, left, bottom, right in rects:
+                self._push_style_state(range(left, right + 1))
 
-        if mode is None:
-            item.setData(Qt.UserRole + 1, None)
-        else:
-            item.setData(Qt.UserRole + 1, mode)
+                rows = {(top, top)} | ({(top + 1, bottom - 1)} if bottom - top > 1 else set()) | {(bottom, bottom)}
+                cols = {(left, left)} | ({(left + 1, right - 1)} if right - left > 1 else set()) | {(right, right)}
+
+                for r1, r2 in rows:
+                    for c1, c2 in cols:
+                        sides = [
+                            side for side, edge in (
+                                ("top", r1 == top), ("bottom", r2 == bottom),
+                                ("left", c1 == left), ("right", c2 == right),
+                            ) if edge
+                        ]
+                        if sides:
+                            border = "all" if len(sides) == 4 else "|".join(sides)
+                            self.styles.apply(r1, c1, r2, c2, border=border)
 
-        self._apply_table_borders()
+        self._update_cells(rects)
 
     def _choose_fill_color(self):
-        item = self.table.currentItem()
-        if not item:
+        if self._current_style() is None:
             return
 
         color = QColorDialog.getColor(parent=self, title="Fill Color")
         if not color.isValid():
             return
 
-        # Undo için eski state
-        self._push_undo_state(item)
+        self._apply_style("Fill Color", background=color.name())
 
-        item.setBackground(QBrush(color))
-    
     def _choose_text_color(self):
-        item = self.table.currentItem()
-        if not item:
+        if self._current_style() is None:
             return
 
         color = QColorDialog.getColor(parent=self, title="Text Color")
         if not color.isValid():
             return
 
-        self._push_undo_state(item)
-
-        item.setForeground(QBrush(color))
+        self._apply_style("Text Color", foreground=color.name())
 
     def _set_alignment(self, align_flag):
-        item = self.table.currentItem()
-        if not item:
+        style = self._current_style()
+        if style is None:
             return
 
-        self._push_undo_state(item)
-
-        # dikey ortalama + yatay hizalama
-        item.setTextAlignment(align_flag | Qt.AlignVCenter)
+        # dikey ortalama + yatay hizalama (wrap korunur)
+        wrap = (style.alignment or 0) & WORD_WRAP
+        self._apply_style("Alignment", alignment=(align_flag | Qt.AlignVCenter).value | wrap)
 
         # butonları senkronla
-        self._sync_alignment_buttons(item)
+        self._sync_alignment_buttons(self._current_style())
 
-    def _sync_alignment_buttons(self, item):
-        align = item.textAlignment()
+    def _sync_alignment_buttons(self, style):
+        align = style.alignment or 0
 
         self.align_left_btn.blockSignals(True)
         self.align_center_btn.blockSignals(True)
         self.align_right_btn.blockSignals(True)
 
-        self.align_left_btn.setChecked(bool(align & Qt.AlignLeft))
-        self.align_center_btn.setChecked(bool(align & Qt.AlignCenter))
-        self.align_right_btn.setChecked(bool(align & Qt.AlignRight))
+        self.align_left_btn.setChecked(bool(align & Qt.AlignLeft.value))
+        self.align_center_btn.setChecked(bool(align & Qt.AlignHCenter.value))
+        self.align_right_btn.setChecked(bool(align & Qt.AlignRight.value))
 
         self.align_left_btn.blockSignals(False)
         self.align_center_btn.blockSignals(False)
         self.align_right_btn.blockSignals(False)
 
     def _toggle_wrap(self):
-        item = self.table.currentItem()
-        if not item:
+        style = self._current_style()
+        if style is None:
             return
 
-        self._push_undo_state(item)
-
-        align = item.textAlignment()
+        align = style.alignment
+        if align is None:
+            align = (Qt.AlignLeft | Qt.AlignVCenter).value
 
-        if align & Qt.TextWordWrap:
+        if align & WORD_WRAP:
             # wrap kapat
-            align &= ~Qt.TextWordWrap
+            align &= ~WORD_WRAP
             self.wrap_button.setChecked(False)
         else:
             # wrap aç
-            align |= Qt.TextWordWrap
+            align |= WORD_WRAP
             self.wrap_button.setChecked(True)
 
-        item.setTextAlignment(align)
+        rects = self._apply_style("Wrap Text", alignment=align)
 
-        row = item.row()
-        self.table.resizeRowToContents(row)
+        for top, _, bottom, _ in rects:
+            for row in range(top, bottom + 1):
+                self.table.resizeRowToContents(row)
 
     def _toggle_merge(self):
         ranges = self.table.selectedRanges()
@@ -706,123 +1098,49 @@ class MiniExcelUI(QMainWindow):
         self.table.setSpan(row, col, row_span, col_span)
 
     def _change_number_format(self, fmt):
-        item = self.table.currentItem()
-        if not item:
-            return
-
-        self._push_undo_state(item)
-
-        if fmt == "General":
-            item.setData(Qt.UserRole + 2, "General")
-
-        elif fmt == "Integer":
-            item.setData(Qt.UserRole + 2, "Integer:0")
-
-        elif fmt == "Number (2 decimals)":
-            item.setData(Qt.UserRole + 2, "Number:2")
-
-        elif fmt == "Percent":
-            item.setData(Qt.UserRole + 2, "Percent:0")
-
-        elif fmt == "Currency (₺)":
-            item.setData(Qt.UserRole + 2, "Currency:2")
-
-        self._apply_number_format(item)
-
-    def _apply_number_format(self, item):
-        fmt = item.data(Qt.UserRole + 2)
-        if not fmt:
-            return
-
-        raw = item.data(Qt.UserRole)
-        if raw is None:
-            return
-
-        # raw string ise float'a çevirmeyi dene
-        try:
-            value = float(raw)
-        except Exception:
-            return
-        
-        if ":" in fmt:
-            kind, dec = fmt.split(":")
-            dec = int(dec)
-        else:
-            kind, dec = fmt, 0
-
-        if kind == "General":
-            text = str(raw)
-
-        elif kind == "Integer":
-            text = str(int(value))
-
-        elif kind == "Number (2 decimals)":
-            text = f"{value:.2f}"
-
-        elif kind == "Percent":
-            text = f"{value * 100:.0f}%"
-
-        elif kind == "Currency (₺)":
-            text = f"₺{value:,.2f}"
-
-                    
-        elif kind == "Accounting":
-            text = f"₺ {value:,.{dec}f}"
-
-        else:
+        formats = {
+            "General": "General",
+            "Integer": "Integer:0",
+            "Number (2 decimals)": "Number:2",
+            "Percent": "Percent:0",
+            "Currency (₺)": "Currency:2",
+        }
+        if fmt not in formats:
             return
 
-        self.table.blockSignals(True)
-        item.setText(text)
-        self.table.blockSignals(False)
+        self._apply_style("Number Format", number_format=formats[fmt])
 
     def _set_accounting(self):
-        item = self.table.currentItem()
-        if not item:
-            return
-
-        self._push_undo_state(item)
-
         # varsayılan: 2 ondalık
-        item.setData(Qt.UserRole + 2, "Accounting:2")
-        self._apply_number_format(item)
-    
-    def _get_format_parts(self, item):
-        fmt = item.data(Qt.UserRole + 2)
-        if not fmt:
-            return "General", 0
+        self._apply_style("Accounting", number_format="Accounting:2")
 
-        if ":" in fmt:
-            kind, dec = fmt.split(":")
-            return kind, int(dec)
+    def _get_format_parts(self, style):
+        fmt = style.number_format
+        if not fmt or fmt == "General":
+            # General'de ondalık değiştirmek sayı formatına geçer (Excel gibi)
+            return "Number", 0
 
-        return fmt, 0
+        return split_format(fmt)
 
     def _increase_decimal(self):
-        item = self.table.currentItem()
-        if not item:
+        style = self._current_style()
+        if style is None:
             return
 
-        self._push_undo_state(item)
-
-        kind, dec = self._get_format_parts(item)
+        kind, dec = self._get_format_parts(style)
         dec += 1
 
-        item.setData(Qt.UserRole + 2, f"{kind}:{dec}")
-        self._apply_number_format(item)
+        self._apply_style("Increase Decimal", number_format=f"{kind}:{dec}")
 
     def _decrease_decimal(self):
-        item = self.table.currentItem()
-        if not item:
+        style = self._current_style()
+        if style is None:
             return
 
-        self._push_undo_state(item)
-
-        kind, dec = self._get_format_parts(item)
+        kind, dec = self._get_format_parts(style)
         dec = max(0, dec - 1)
 
-        item.setData(Qt.UserRole + 2, f"{kind}:{dec}")
-        self._apply_number_format(item)
+        self._apply_style("Decrease Decimal", number_format=f"{kind}:{dec}")
 
     def _auto_sum(self):
         item = self.table.currentItem()
@@ -832,14 +1150,18 @@ class MiniExcelUI(QMainWindow):
         row = item.row()
         col = item.column()
 
+        # yukarıdaki dolu blok doluluk dizininden bulunur; blok
+        # içinde ilk sayı olmayan hücrede durulur
+        store = self.engine.store
+        first = store.run_start(row - 1, col) if row else None
+        if first is None:
+            return
+
+        column = store.column(col)
         start = row - 1
-        while start >= 0:
-            cell = self.table.item(start, col)
-            if not cell:
-                break
-            try:
-                float(cell.text())
-            except Exception:
+        while start >= first:
+            value = column[start]
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
                 break
             start -= 1
 
@@ -854,50 +1176,277 @@ class MiniExcelUI(QMainWindow):
 
         formula = f"=SUM({start_cell}:{end_cell})"
 
-        self._push_undo_state(item)
+        with self._undo_group("AutoSum"):
+            self._push_undo_state(item)
+            self.table.blockSignals(True)
+            item.setText(formula)
+            self.table.blockSignals(False)
+            self.engine.process_item(item)
+
+    # ==================================================
+    # CTRL+OK
+    # ==================================================
+    def _jump(self, drow, dcol):
+        """
+        Dolu bloğun ucuna / sonraki dolu hücreye atlar (Excel Ctrl+Ok)
+        """
+        row, col = self.table.currentRow(), self.table.currentColumn()
+        if row < 0 or col < 0:
+            return
+
+        row, col = self.engine.store.edge(
+            row, col, drow, dcol,
+            self.table.rowCount() - 1, self.table.columnCount() - 1,
+        )
+        self.table.setCurrentCell(row, col)
+
+    # ==================================================
+    # FILL
+    # ==================================================
+    def _fill(self, direction):
+        """
+        Seçimin ilk satırını (down) / ilk sütununu (right) bloğa kopyalar:
+        göreli referanslar kaydırılır, stiller de taşınır, tek recalc.
+        """
+        ranges = self.table.selectedRanges()
+        if not ranges:
+            return
+
+        r = ranges[0]
+        top, left, bottom, right = r.topRow(), r.leftColumn(), r.bottomRow(), r.rightColumn()
+
+        if direction == "down":
+            if bottom == top:
+                return
+            targets = [(row, col) for row in range(top + 1, bottom + 1) for col in range(left, right + 1)]
+        else:
+            if right == left:
+                return
+            targets = [(row, col) for row in range(top, bottom + 1) for col in range(left + 1, right + 1)]
+
+        with self._undo_group("Fill Down" if direction == "down" else "Fill Right"):
+            self._push_undo_cells(targets)
+            self._push_style_state(range(left, right + 1))
+
+            if direction == "down":
+                for col in range(left, right + 1):
+                    self.styles.set_style_id(top + 1, col, bottom, col, self.styles.style_id(top, col))
+            else:
+                for row in range(top, bottom + 1):
+                    self.styles.set_style_id(row, left + 1, row, right, self.styles.style_id(row, left))
+
+            # formül sonuçları yalnızca var olan item'lara yazılır
+            self.table.blockSignals(True)
+            for row, col in targets:
+                if self.table.item(row, col) is None:
+                    self.table.setItem(row, col, QTableWidgetItem())
+            self.table.blockSignals(False)
+
+            self.engine.fill(top, left, bottom, right, direction)
+
+            store = self.engine.store
+            self.table.blockSignals(True)
+            for row, col in targets:
+                if not store.formula(row, col):
+                    self.table.item(row, col).setText(store.source(row, col))
+            self.table.blockSignals(False)
+
+        self._update_cells([(top, left, bottom, right)])
+
+    # ==================================================
+    # SORT
+    # ==================================================
+    def _sort_column(self, order):
+        col = self.table.currentColumn()
+        if col < 0:
+            return
+
+        bounds = self._sort_bounds()
+        if bounds:
+            self._sort_range(bounds, [(col, order == Qt.AscendingOrder)])
+
+    def _custom_sort(self):
+        bounds = self._sort_bounds()
+        if not bounds:
+            return
+
+        top, left, bottom, right = bounds
+        dlg = SortDialog([index_to_cell(0, c)[:-1] for c in range(left, right + 1)])
+        if dlg.exec() != QDialog.Accepted:
+            return
+
+        keys = [(left + idx, ascending) for idx, ascending in dlg.keys()]
+        if keys:
+            self._sort_range(bounds, keys)
+
+    def _sort_bounds(self):
+        """
+        Çok satırlı seçim varsa o aralık; yoksa sayfanın dolu bölgesi
+        """
+        ranges = self.table.selectedRanges()
+        if ranges and ranges[0].rowCount() > 1:
+            r = ranges[0]
+            return r.topRow(), r.leftColumn(), r.bottomRow(), r.rightColumn()
+
+        bounds = self.engine.store.used_bounds()
+        if bounds is None:
+            return None
+        bottom, right = bounds
+        return 0, 0, bottom, right
+
+    def _sort_range(self, bounds, keys):
+        """
+        Model seviyesinde sıralama: tipli anahtarlar bir kez çıkarılır,
+        satır permütasyonu CellStore'a uygulanır, göreli referanslar
+        kaydırılır ve tek bir toplu recalc yapılır.
+        """
+        top, left, bottom, right = bounds
+        store = self.engine.store
+
+        order = sort_order(store, top, bottom, keys)
+        if order == list(range(top, bottom + 1)):
+            return
+
+        entries = permuted_sources(store, top, left, bottom, right, order)
+
+        with self._undo_group("Sort"):
+            self._push_undo_cells((r, c) for r, c, _ in entries)
+            self._push_style_state(range(left, right + 1))
+            self.styles.permute_rows(top, left, bottom, right, order)
+            self._write_sources(entries)
+
+        self._update_cells([bounds])
+
+    def _write_sources(self, entries):
+        """
+        [(row, col, text)] kaynaklarını item'lara yazar ve motora
+        tek parti olarak verir (tek recalc)
+        """
+        self._write_items(entries)
+        self.engine.set_cells(entries)
+
+    def _write_items(self, entries):
+        """
+        Görünen ızgaradaki item metinleri; dışındaki hücreler yalnızca depoda
+        """
+        rows, cols = self.table.rowCount(), self.table.columnCount()
         self.table.blockSignals(True)
-        item.setText(formula)
+        for row, col, text in entries:
+            if row >= rows or col >= cols:
+                continue
+            item = self.table.item(row, col)
+            if item is None:
+                if not text:
+                    continue
+                item = QTableWidgetItem()
+                self.table.setItem(row, col, item)
+            item.setText(text)
         self.table.blockSignals(False)
-        self.engine.process_item(item)
 
-    def _apply_table_borders(self):
-        css = []
+    # ==================================================
+    # AUTOFILTER
+    # ==================================================
+    def _setup_filter_menu(self):
+        menu = QMenu(self)
+        menu.addAction("Hide Blanks", lambda: self._filter_column(NonBlank()))
+        menu.addAction("Equals Current Value", self._filter_equals_current)
+        menu.addAction("Text Contains…", self._filter_contains)
+        menu.addAction("Between…", self._filter_between)
+        menu.addAction("Top 10", lambda: self._filter_column(TopN(10)))
+        menu.addSeparator()
+        menu.addAction("Clear Column Filter", self._clear_column_filter)
+        menu.addAction("Clear All Filters", self._clear_filter)
+
+        self.filter_button.setMenu(menu)
+
+    def _toggle_filter(self, first_row=None, last_row=None):
+        col = self.table.currentColumn()
+        if col < 0:
+            self.filter_button.setChecked(False)
+            return
 
-        for r in range(self.table.rowCount()):
-            for c in range(self.table.columnCount()):
-                item = self.table.item(r, c)
-                if not item:
-                    continue
+        if self.filter_button.isChecked():
+            self._filter_column(NonBlank(), first_row, last_row)
+        else:
+            self._clear_filter()
+
+    def _filter_column(self, predicate, first_row=None, last_row=None):
+        col = self.table.currentColumn()
+        if col < 0:
+            return
 
-                border = item.data(Qt.UserRole + 1)
-                if border == "all":
-                    css.append(
-                        f"QTableWidget::item(row:{r}, column:{c})"
-                        "{ border: 1px solid black; }"
-                    )
+        if self.autofilter is None or first_row is not None:
+            if self.autofilter is not None:
+                self._apply_filter_blocks(self.autofilter.clear_criteria())
+            self.autofilter = AutoFilter(
+                self.engine.store,
+                first_row if first_row is not None else 0,
+                last_row if last_row is not None else self.table.rowCount() - 1,
+            )
 
-        self.table.setStyleSheet("\n".join(css))
-    
-    def _sort_column(self, order):
-        item = self.table.currentItem()
-        if not item:
+        self.filter_button.setChecked(True)
+        self._apply_filter_blocks(self.autofilter.set_criteria(col, predicate))
+
+    def _filter_equals_current(self):
+        row, col = self.table.currentRow(), self.table.currentColumn()
+        if row < 0:
             return
+        self._filter_column(Equals(self.engine.value(row, col)))
 
-        col = item.column()
-        self.table.sortItems(col, order)
+    def _filter_contains(self):
+        text, ok = QInputDialog.getText(self, "Text Filter", "Contains:")
+        if ok and text:
+            self._filter_column(Contains(text))
 
-    def _toggle_filter(self):
-        item = self.table.currentItem()
-        if not item:
+    def _filter_between(self):
+        text, ok = QInputDialog.getText(self, "Number Filter", "Between (min;max):")
+        if not ok or ";" not in text:
+            return
+        low, high = (part.strip() for part in text.split(";", 1))
+        try:
+            self._filter_column(Between(
+                float(low) if low else None,
+                float(high) if high else None,
+            ))
+        except ValueError:
             return
 
-        col = item.column()
-        enabled = self.filter_button.isChecked()
+    def _clear_column_filter(self):
+        if self.autofilter is None:
+            return
+        self._apply_filter_blocks(self.autofilter.clear_criteria(self.table.currentColumn()))
+        if not self.autofilter.criteria:
+            self._clear_filter()
+
+    def _clear_filter(self):
+        if self.autofilter is not None:
+            self._apply_filter_blocks(self.autofilter.clear_criteria())
+            self.autofilter = None
+        self.filter_button.setChecked(False)
+
+    def _apply_filter_blocks(self, blocks):
+        """
+        Yalnızca durumu değişen satırlar, bitişik bloklar halinde
+        """
+        if not blocks:
+            return
 
-        for r in range(self.table.rowCount()):
-            cell = self.table.item(r, col)
-            hide = enabled and (not cell or not cell.text())
-            self.table.setRowHidden(r, hide)
+        self.table.setUpdatesEnabled(False)
+        for first, last, hidden in blocks:
+            for row in range(first, last + 1):
+                self.table.setRowHidden(row, hidden)
+        self.table.setUpdatesEnabled(True)
+
+    def _on_values_changed(self, cells):
+        if self.autofilter is not None:
+            self._apply_filter_blocks(self.autofilter.refresh(cells))
+
+        for pivot in self.pivots:
+            self._write_pivot(pivot.refresh(cells))
+
+    # ==================================================
+    # PIVOT
+    # ==================================================
 
     def _insert_pivot_table(self):
         ranges = self.table.selectedRanges()
@@ -918,13 +1467,31 @@ class MiniExcelUI(QMainWindow):
         if dlg.exec() != QDialog.Accepted:
             return
 
-        # şimdilik sadece test
-        print(
-            dlg.row_box.currentText(),
-            dlg.value_box.currentText(),
-            dlg.func_box.currentText()
+        left = r.leftColumn()
+        pivot = PivotTable(
+            self.engine.store,
+            (r.topRow(), left, r.bottomRow(), r.rightColumn()),
+            [left + idx for idx in dlg.row_fields()],
+            left + dlg.value_box.currentIndex(),
+            dlg.func_box.currentText(),
+            [left + idx for idx in dlg.column_fields()],
         )
 
+        self.pivots.append(pivot)
+        self._write_pivot(pivot.build())
+
+    def _write_pivot(self, entries):
+        """
+        Pivot çıktısındaki değişen hücreleri tek parti olarak yazar;
+        kaynak düzenlemesi sırasında çağrılırsa aynı undo adımına girer.
+        """
+        if not entries:
+            return
+
+        with self._undo_group("Pivot Table"):
+            self._push_undo_cells((r, c) for r, c, _ in entries)
+            self._write_sources(entries)
+
     def _insert_table(self):
         ranges = self.table.selectedRanges()
         if not ranges:
@@ -937,35 +1504,121 @@ class MiniExcelUI(QMainWindow):
         left = r.leftColumn()
         right = r.rightColumn()
 
-        # Header (ilk satır)
-        for c in range(left, right + 1):
-            item = self.table.item(top, c)
-            if not item:
-                item = QTableWidgetItem("")
-                self.table.setItem(top, c, item)
+        with self._undo_group("Insert Table"):
+            self._push_style_state(range(left, right + 1))
 
-            self._push_undo_state(item)
+            # Header (ilk satır)
+            self.styles.apply(top, left, top, right, bold=True, background="#E8F0FE")
 
-            font = item.font()
-            font.setBold(True)
-            item.setFont(font)
+            # Body
+            if bottom > top:
+                self.styles.apply(top + 1, left, bottom, right, background="#F8FBFF")
 
-            item.setBackground(QBrush(QColor("#E8F0FE")))
+        self._update_cells([(top, left, bottom, right)])
 
-        # Body
-        for row in range(top + 1, bottom + 1):
-            for col in range(left, right + 1):
-                item = self.table.item(row, col)
-                if not item:
-                    item = QTableWidgetItem("")
-                    self.table.setItem(row, col, item)
-
-                self._push_undo_state(item)
-                item.setBackground(QBrush(QColor("#F8FBFF")))
+        # adlandırılmış tablo: formüller Table1[Sütun] ile başvurabilir
+        names = self.workbook.defined_names
+        sheet = self.workbook.names[self.sheet_index]
+        if names.tables.overlapping(sheet.casefold(), top, left, bottom, right) is None:
+            name = next(f"Table{n}" for n in count(len(names.tables) + 1) if f"Table{n}" not in names and f"table{n}" not in names.tables)
+            names.add_table(name, sheet, top, left, bottom, right, table_headers(self.engine.store, top, left, right))
 
         # Filter otomatik aç
         self.filter_button.setChecked(True)
-        self._toggle_filter()
+        self._toggle_filter(top + 1, bottom)
+
+    # ==================================================
+    # PROFİL (recalc enstrümantasyonu)
+    # ==================================================
+    def _toggle_profiling(self, enabled):
+        if enabled:
+            self.engine.enable_instrumentation()
+        else:
+            self.engine.disable_instrumentation()
+
+    def _show_profiler(self):
+        instrumentation = self.engine.instrumentation
+        if instrumentation is None:
+            # rapor istendiyse ölçümü başlat: sonraki düzenlemeler kaydedilir
+            self.profile_btn.setChecked(True)
+            instrumentation = self.engine.instrumentation
+
+        dlg = ProfilerDialog(instrumentation, self.engine.formula, self)
+        if dlg.exec() == QDialog.Accepted and dlg.selected_cell:
+            row, col = dlg.selected_cell
+            self.table.setCurrentCell(row, col)
+
+    # ==================================================
+    # TANIMLI İSİMLER
+    # ==================================================
+    def _show_names(self):
+        NameManagerDialog(self.workbook.defined_names, self._selection_reference(), self).exec()
+
+    def _selection_reference(self):
+        """
+        Seçimin mutlak, sayfa adlı referansı: Sheet1!$A$1:$B$5
+        """
+        sheet = self.workbook.names[self.sheet_index]
+        if not sheet.replace("_", "").isalnum():
+            sheet = "'" + sheet.replace("'", "''") + "'"
+
+        ranges = self.table.selectedRanges()
+        if ranges:
+            r = ranges[0]
+            top, left, bottom, right = r.topRow(), r.leftColumn(), r.bottomRow(), r.rightColumn()
+        else:
+            top = bottom = max(self.table.currentRow(), 0)
+            left = right = max(self.table.currentColumn(), 0)
+
+        ref = f"${column_name(left)}${top + 1}"
+        if (top, left) != (bottom, right):
+            ref += f":${column_name(right)}${bottom + 1}"
+        return f"{sheet}!{ref}"
+
+    # ==================================================
+    # BUL / DEĞİŞTİR
+    # ==================================================
+    def _show_find(self, replace):
+        """
+        Kalıcı (modal olmayan) Bul/Değiştir penceresi; arama çalışma
+        kitabının n-gram dizinlerinden yapılır, item'lar taranmaz
+        """
+        if self._find_dialog is None:
+            self._find_dialog = FindReplaceDialog(
+                self.workbook.search,
+                lambda: self.workbook.names[self.sheet_index],
+                self._goto_cell,
+                self._replace_sources,
+                self,
+            )
+        self._find_dialog.open_for(replace)
+
+    def _goto_cell(self, sheet, row, col):
+        index = self.workbook.names.index(sheet)
+        self.sheet_tabs.setCurrentIndex(index)
+        self.table.setCurrentCell(row, col)
+
+    def _replace_sources(self, sheet, entries):
+        """
+        Değiştir / Tümünü Değiştir: sayfa başına tek undo adımı ve tek
+        set_cells (tek recalc)
+        """
+        current = self.sheet_index
+        self.sheet_tabs.setCurrentIndex(self.workbook.names.index(sheet))
+        with self._undo_group("Replace"):
+            self._push_undo_cells((row, col) for row, col, _ in entries)
+            self._write_sources(entries)
+        self.sheet_tabs.setCurrentIndex(current)
+
+    # ==================================================
+    # BELLEK RAPORU
+    # ==================================================
+    def _show_memory(self):
+        report = lambda: memory_report(self.engine, self.table, self.styles, self.journal)
+        dlg = MemoryDialog(report, self)
+        if dlg.exec() == QDialog.Accepted and dlg.selected_cell:
+            row, col = dlg.selected_cell
+            self.table.setCurrentCell(row, col)
 
     
     # ==================================================
@@ -981,6 +1634,8 @@ class MiniExcelUI(QMainWindow):
 
 
 class PivotDialog(QDialog):
+    NONE = "(none)"
+
     def __init__(self, headers):
         super().__init__()
         self.setWindowTitle("Create Pivot Table")
@@ -988,16 +1643,26 @@ class PivotDialog(QDialog):
         layout = QVBoxLayout(self)
 
         self.row_box = QComboBox()
+        self.row2_box = QComboBox()
+        self.column_box = QComboBox()
         self.value_box = QComboBox()
         self.func_box = QComboBox()
 
         self.row_box.addItems(headers)
+        self.row2_box.addItems([self.NONE] + headers)
+        self.column_box.addItems([self.NONE] + headers)
         self.value_box.addItems(headers)
-        self.func_box.addItems(["SUM", "COUNT", "AVERAGE"])
+        self.func_box.addItems(list(AGGREGATES))
 
         layout.addWidget(QLabel("Row field"))
         layout.addWidget(self.row_box)
 
+        layout.addWidget(QLabel("Second row field"))
+        layout.addWidget(self.row2_box)
+
+        layout.addWidget(QLabel("Column field"))
+        layout.addWidget(self.column_box)
+
         layout.addWidget(QLabel("Value field"))
         layout.addWidget(self.value_box)
 
@@ -1014,4 +1679,605 @@ class PivotDialog(QDialog):
 
         btns.addWidget(ok)
         btns.addWidget(cancel)
-        layout.addWidget(btns)
\ No newline at end of file
+        layout.addLayout(btns)
+
+    def row_fields(self):
+        fields = [self.row_box.currentIndex()]
+        if self.row2_box.currentIndex() > 0:
+            fields.append(self.row2_box.currentIndex() - 1)
+        return fields
+
+    def column_fields(self):
+        if self.column_box.currentIndex() > 0:
+            return [self.column_box.currentIndex() - 1]
+        return []
+
+
+class SortDialog(QDialog):
+    """
+    Çok anahtarlı sıralama: en fazla üç sütun, her biri artan/azalan
+    """
+    def __init__(self, columns, levels=3):
+        super().__init__()
+        self.setWindowTitle("Sort")
+
+        layout = QVBoxLayout(self)
+
+        self.rows = []
+        for level in range(levels):
+            row = QHBoxLayout()
+
+            col_box = QComboBox()
+            col_box.addItems(["(none)"] + columns)
+            if level == 0 and columns:
+                col_box.setCurrentIndex(1)
+
+            order_box = QComboBox()
+            order_box.addItems(["A → Z", "Z → A"])
+
+            row.addWidget(QLabel("Sort by" if level == 0 else "Then by"))
+            row.addWidget(col_box)
+            row.addWidget(order_box)
+            layout.addLayout(row)
+
+            self.rows.append((col_box, order_box))
+
+        btns = QHBoxLayout()
+
+        ok = QPushButton("Sort")
+        cancel = QPushButton("Cancel")
+
+        ok.clicked.connect(self.accept)
+        cancel.clicked.connect(self.reject)
+
+        btns.addWidget(ok)
+        btns.addWidget(cancel)
+        layout.addLayout(btns)
+
+    def keys(self):
+        """
+        [(sütun sırası, artan mı), ...]  ("(none)" seçilenler atlanır)
+        """
+        return [
+            (col_box.currentIndex() - 1, order_box.currentIndex() == 0)
+            for col_box, order_box in self.rows
+            if col_box.currentIndex() > 0
+        ]
+
+
+class ProfilerDialog(QDialog):
+    """
+    En yavaş formüller ve son düzenlemenin özeti; Chrome trace dışa aktarımı.
+    Satıra çift tıklamak hücreye gider.
+    """
+    COLUMNS = ["Cell", "Formula", "Total ms", "Evaluations", "Mean ms"]
+
+    def __init__(self, instrumentation, formula_of, parent=None, limit=50):
+        super().__init__(parent)
+        self.setWindowTitle("Slowest Formulas")
+        self.resize(640, 420)
+
+        self.instrumentation = instrumentation
+        self.formula_of = formula_of
+        self.limit = limit
+        self.selected_cell = None
+
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.report = QTableWidget(0, len(self.COLUMNS))
+        self.report.setHorizontalHeaderLabels(self.COLUMNS)
+        self.report.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.report.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.report.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.report.verticalHeader().setVisible(False)
+        self.report.cellDoubleClicked.connect(self._go_to)
+        layout.addWidget(self.report)
+
+        btns = QHBoxLayout()
+
+        refresh = QPushButton("Refresh")
+        reset = QPushButton("Reset")
+        export = QPushButton("Export Trace…")
+        close = QPushButton("Close")
+
+        refresh.clicked.connect(self.refresh)
+        reset.clicked.connect(self._reset)
+        export.clicked.connect(self._export)
+        close.clicked.connect(self.reject)
+
+        btns.addWidget(refresh)
+        btns.addWidget(reset)
+        btns.addWidget(export)
+        btns.addStretch()
+        btns.addWidget(close)
+        layout.addLayout(btns)
+
+        self.refresh()
+
+    def refresh(self):
+        summary = self.instrumentation.summary()
+        text = (
+            f"Edits: {summary['edits']}   Cells timed: {summary['cells_timed']}   "
+            f"Eval: {summary['eval_seconds'] * 1000:.1f} ms   "
+            f"Parse: {summary['parse_seconds'] * 1000:.1f} ms   "
+            f"Memo hit rate: {summary['memo_hit_rate']:.0%}"
+        )
+        last = summary["last_edit"]
+        if last:
+            text += (
+                f"\nLast edit ({last['label']}): {last['seconds'] * 1000:.1f} ms, "
+                f"dirty {last['dirty']} cells in {last['levels']} levels, "
+                f"{last['visited']} graph nodes visited, "
+                f"aggregate deltas {last['aggregate_deltas']} / rescans {last['aggregate_rescans']}"
+            )
+        self.summary_label.setText(text)
+
+        rows = self.instrumentation.slowest(self.limit)
+        self.report.setRowCount(len(rows))
+        for i, (ref, total, count, mean) in enumerate(rows):
+            values = [ref, "=" + (self.formula_of(*cell_to_index(ref)) or ""), f"{total * 1000:.3f}", str(count), f"{mean * 1000:.3f}"]
+            for j, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if j >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.report.setItem(i, j, item)
+
+    def _reset(self):
+        self.instrumentation.reset()
+        self.refresh()
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "recalc-trace.json", "Trace JSON (*.json)")
+        if path:
+            self.instrumentation.export_chrome_trace(path)
+
+    def _go_to(self, row, _col):
+        self.selected_cell = cell_to_index(self.report.item(row, 0).text())
+        self.accept()
+
+
+class MemoryDialog(QDialog):
+    """
+    Alt sistem ve sayfa bölgesi bazında bellek dökümü; isteğe bağlı
+    tracemalloc izlemesiyle dosya bazında yeni ayırmalar.
+    Bölge satırına çift tıklamak bölgenin sol üst hücresine gider.
+    """
+
+    def __init__(self, report, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Memory Report")
+        self.resize(640, 520)
+
+        self.report = report
+        self.tracker = AllocationTracker()
+        self.selected_cell = None
+
+        layout = QVBoxLayout(self)
+
+        self.total_label = QLabel()
+        layout.addWidget(self.total_label)
+
+        self.subsystems = self._table(["Subsystem", "Size", "%"])
+        layout.addWidget(self.subsystems)
+
+        self.regions = self._table(["Region", "Size"])
+        self.regions.cellDoubleClicked.connect(self._go_to)
+        layout.addWidget(self.regions)
+
+        self.allocations = self._table(["File", "Allocated", "Blocks"])
+        self.allocations.setVisible(False)
+        layout.addWidget(self.allocations)
+
+        btns = QHBoxLayout()
+
+        self.track_btn = QPushButton("Track Allocations")
+        self.track_btn.setCheckable(True)
+        refresh = QPushButton("Refresh")
+        close = QPushButton("Close")
+
+        self.track_btn.toggled.connect(self._toggle_tracking)
+        refresh.clicked.connect(self.refresh)
+        close.clicked.connect(self.reject)
+
+        btns.addWidget(self.track_btn)
+        btns.addWidget(refresh)
+        btns.addStretch()
+        btns.addWidget(close)
+        layout.addLayout(btns)
+
+        self.refresh()
+
+    def _table(self, columns):
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        return table
+
+    def _fill(self, table, rows):
+        table.setRowCount(len(rows))
+        for i, values in enumerate(rows):
+            for j, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if j >= 1:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(i, j, item)
+
+    def refresh(self):
+        report = self.report()
+        total = report["total"] or 1
+
+        self.total_label.setText(
+            f"Total: {format_bytes(report['total'])}   "
+            f"Qt items: {report['qt_items']} (C++ size estimated)"
+        )
+
+        ranked = sorted(report["subsystems"].items(), key=lambda item: item[1], reverse=True)
+        self._fill(self.subsystems, [
+            (name, format_bytes(size), f"{size / total:.1%}") for name, size in ranked
+        ])
+        self._fill(self.regions, [
+            (region["range"], format_bytes(region["bytes"])) for region in report["regions"]
+        ])
+
+        if self.tracker.active:
+            self._fill(self.allocations, [
+                (filename, format_bytes(size), str(count))
+                for filename, size, count in self.tracker.by_module()
+            ])
+
+    def _toggle_tracking(self, enabled):
+        if enabled:
+            self.tracker.start()
+        else:
+            self.tracker.stop()
+            self.allocations.setRowCount(0)
+        self.allocations.setVisible(enabled)
+
+    def _go_to(self, row, _col):
+        start = self.regions.item(row, 0).text().split(":")[0]
+        self.selected_cell = cell_to_index(start)
+        self.accept()
+
+    def done(self, result):
+        self.tracker.stop()
+        super().done(result)
+
+
+class NameManagerDialog(QDialog):
+    """
+    Çalışma kitabının tanımlı isimleri: yeni, düzenle, yeniden adlandır,
+    sil. Her değişiklik yalnızca o ismi kullanan formülleri yeniden derler.
+    """
+
+    def __init__(self, names, default_reference, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Name Manager")
+        self.resize(520, 360)
+
+        self.names = names
+        self.default_reference = default_reference
+
+        layout = QVBoxLayout(self)
+
+        self.list = QTableWidget(0, 2)
+        self.list.setHorizontalHeaderLabels(["Name", "Refers To"])
+        self.list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.list.verticalHeader().setVisible(False)
+        self.list.cellDoubleClicked.connect(lambda *_: self._edit())
+        layout.addWidget(self.list)
+
+        self.error_label = QLabel()
+        self.error_label.setStyleSheet("color: #c00000")
+        layout.addWidget(self.error_label)
+
+        btns = QHBoxLayout()
+
+        new = QPushButton("New…")
+        edit = QPushButton("Edit…")
+        rename = QPushButton("Rename…")
+        delete = QPushButton("Delete")
+        close = QPushButton("Close")
+
+        new.clicked.connect(self._new)
+        edit.clicked.connect(self._edit)
+        rename.clicked.connect(self._rename)
+        delete.clicked.connect(self._delete)
+        close.clicked.connect(self.accept)
+
+        btns.addWidget(new)
+        btns.addWidget(edit)
+        btns.addWidget(rename)
+        btns.addWidget(delete)
+        btns.addStretch()
+        btns.addWidget(close)
+        layout.addLayout(btns)
+
+        self.refresh()
+
+    def refresh(self):
+        defined = list(self.names)
+        self.list.setRowCount(len(defined))
+        for i, name in enumerate(defined):
+            self.list.setItem(i, 0, QTableWidgetItem(name.name))
+            self.list.setItem(i, 1, QTableWidgetItem("=" + name.text))
+
+    def _selected(self):
+        row = self.list.currentRow()
+        item = self.list.item(row, 0) if row >= 0 else None
+        return item.text() if item is not None else None
+
+    def _apply(self, action, *args):
+        """
+        Hatalı ad / tanım diyaloğu kapatmaz, altta gösterilir
+        """
+        try:
+            action(*args)
+        except (ValueError, KeyError, SyntaxError) as error:
+            self.error_label.setText(str(error))
+            return False
+        self.error_label.clear()
+        self.refresh()
+        return True
+
+    def _new(self):
+        name, ok = QInputDialog.getText(self, "New Name", "Name:")
+        if not ok or not name.strip():
+            return
+        text, ok = QInputDialog.getText(self, "New Name", "Refers to:", text="=" + self.default_reference)
+        if ok:
+            self._apply(self.names.define, name.strip(), text)
+
+    def _edit(self):
+        name = self._selected()
+        if name is None:
+            return
+        text, ok = QInputDialog.getText(self, "Edit Name", f"{name} refers to:", text="=" + self.names.get(name).text)
+        if ok:
+            self._apply(self.names.define, name, text)
+
+    def _rename(self):
+        name = self._selected()
+        if name is None:
+            return
+        new, ok = QInputDialog.getText(self, "Rename", "New name:", text=name)
+        if ok and new.strip() and new.strip() != name:
+            self._apply(self.names.rename, name, new.strip())
+
+    def _delete(self):
+        name = self._selected()
+        if name is not None:
+            self._apply(self.names.remove, name)
+
+
+class FindReplaceDialog(QDialog):
+    """
+    Bul/Değiştir (Ctrl+F / Ctrl+H). Sonuçlar yazarken güncellenir;
+    sorgu sayfa dizinlerinin n-gram adaylarıyla sınırlanır.
+    Tümünü Değiştir sayfa başına tek toplu düzenleme yapar.
+    """
+
+    # yazarken aramada listelenen en fazla sonuç
+    RESULT_LIMIT = 1000
+
+    def __init__(self, search, current_sheet, goto, replace, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Find and Replace")
+        self.setModal(False)
+        self.resize(560, 420)
+
+        self.search = search
+        self.current_sheet = current_sheet
+        self.goto = goto
+        self.replace = replace
+        self.results = []
+
+        layout = QVBoxLayout(self)
+
+        fields = QGridLayout()
+        self.find_edit = QLineEdit()
+        self.replace_edit = QLineEdit()
+        fields.addWidget(QLabel("Find what:"), 0, 0)
+        fields.addWidget(self.find_edit, 0, 1)
+        fields.addWidget(QLabel("Replace with:"), 1, 0)
+        fields.addWidget(self.replace_edit, 1, 1)
+        layout.addLayout(fields)
+
+        options = QHBoxLayout()
+        self.within_box = QComboBox()
+        self.within_box.addItems(["Sheet", "Workbook"])
+        self.look_in_box = QComboBox()
+        self.look_in_box.addItem("Formulas", "formulas")
+        self.look_in_box.addItem("Values", "values")
+        self.case_box = QCheckBox("Match case")
+        self.whole_box = QCheckBox("Match entire cell contents")
+        self.regex_box = QCheckBox("Regular expression")
+
+        options.addWidget(QLabel("Within:"))
+        options.addWidget(self.within_box)
+        options.addWidget(QLabel("Look in:"))
+        options.addWidget(self.look_in_box)
+        options.addWidget(self.case_box)
+        options.addWidget(self.whole_box)
+        options.addWidget(self.regex_box)
+        options.addStretch()
+        layout.addLayout(options)
+
+        self.list = QTableWidget(0, 3)
+        self.list.setHorizontalHeaderLabels(["Sheet", "Cell", "Value"])
+        self.list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.list.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.list.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.list.horizontalHeader().setSectionResizeMode(2, QHeaderView.Stretch)
+        self.list.verticalHeader().setVisible(False)
+        self.list.cellClicked.connect(lambda row, _: self._show(row))
+        layout.addWidget(self.list)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        btns = QHBoxLayout()
+
+        find_next = QPushButton("Find Next")
+        replace_one = QPushButton("Replace")
+        replace_all = QPushButton("Replace All")
+        close = QPushButton("Close")
+
+        find_next.clicked.connect(self._find_next)
+        replace_one.clicked.connect(self._replace_one)
+        replace_all.clicked.connect(self._replace_all)
+        close.clicked.connect(self.hide)
+
+        btns.addWidget(find_next)
+        btns.addWidget(replace_one)
+        btns.addWidget(replace_all)
+        btns.addStretch()
+        btns.addWidget(close)
+        layout.addLayout(btns)
+
+        # yazarken arama: her tuş ve seçenek değişikliği sorguyu yeniler
+        self.find_edit.textChanged.connect(self.refresh)
+        self.find_edit.returnPressed.connect(self._find_next)
+        self.within_box.currentIndexChanged.connect(self.refresh)
+        self.look_in_box.currentIndexChanged.connect(self.refresh)
+        for box in (self.case_box, self.whole_box, self.regex_box):
+            box.toggled.connect(self.refresh)
+
+    def open_for(self, replace):
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        edit = self.replace_edit if replace and self.find_edit.text() else self.find_edit
+        edit.setFocus()
+        edit.selectAll()
+        self.refresh()
+
+    # =====================================================
+    # ARAMA
+    # =====================================================
+    def _query(self):
+        """
+        Geçerli sorgu; boş metinde ya da hatalı desende None
+        """
+        if not self.find_edit.text():
+            return None
+        try:
+            return Query(
+                self.find_edit.text(),
+                match_case=self.case_box.isChecked(),
+                whole_cell=self.whole_box.isChecked(),
+                regex=self.regex_box.isChecked(),
+            )
+        except ValueError as error:
+            self._set_status(str(error), error=True)
+            return None
+
+    def _sheets(self):
+        return None if self.within_box.currentIndex() == 1 else [self.current_sheet()]
+
+    def refresh(self):
+        self.results = []
+        self._set_status("")
+        query = self._query()
+        if query is not None:
+            self.results = self.search.find(
+                query, self.look_in_box.currentData(), self._sheets(), limit=self.RESULT_LIMIT + 1
+            )
+
+        shown = self.results[:self.RESULT_LIMIT]
+        self.list.setRowCount(len(shown))
+        for i, (sheet, row, col, text) in enumerate(shown):
+            self.list.setItem(i, 0, QTableWidgetItem(sheet))
+            self.list.setItem(i, 1, QTableWidgetItem(index_to_cell(row, col)))
+            self.list.setItem(i, 2, QTableWidgetItem(text))
+
+        if query is not None:
+            more = "+" if len(self.results) > self.RESULT_LIMIT else ""
+            self._set_status(f"{len(shown)}{more} cell(s) found")
+        self.results = shown
+
+    def _show(self, i):
+        if 0 <= i < len(self.results):
+            self.list.setCurrentCell(i, 0)
+            sheet, row, col, _ = self.results[i]
+            self.goto(sheet, row, col)
+
+    def _find_next(self):
+        if self.results:
+            self._show((self.list.currentRow() + 1) % len(self.results))
+
+    # =====================================================
+    # DEĞİŞTİRME
+    # =====================================================
+    def _replace_one(self):
+        """
+        Seçili sonucu değiştirir ve sıradakine geçer
+        """
+        query = self._query()
+        i = self.list.currentRow()
+        if query is None or not 0 <= i < len(self.results):
+            self._find_next()
+            return
+
+        sheet, row, col, _ = self.results[i]
+        text = self.search.sheet(sheet).engine.store.source(row, col)
+        if not self._apply(lambda: self._replace_cells(sheet, query, [(row, col, text)])):
+            return
+        self.refresh()
+        if self.results:
+            self._show(min(i, len(self.results) - 1))
+
+    def _replace_all(self):
+        query = self._query()
+        if query is None:
+            return
+
+        sheets = self._sheets() or self.search.workbook.names
+        counts = []
+        for sheet in sheets:
+            if not self._apply(lambda: counts.append(self._replace_cells(sheet, query))):
+                return
+        self.refresh()
+        self._set_status(f"{sum(counts)} replacement(s) made")
+
+    def _replace_cells(self, sheet, query, cells=None):
+        """
+        Değişen kaynakları tek partide yazar; cells verilmezse sayfadaki
+        tüm eşleşmeler (her zaman formül kaynağında, Excel gibi)
+        """
+        replacement = self.replace_edit.text()
+        if cells is None:
+            entries = self.search.sheet(sheet).replacements(query, replacement)
+        else:
+            entries = []
+            for row, col, text in cells:
+                new = query.replace(text, replacement) if query.matches(text) else text
+                if new != text:
+                    entries.append((row, col, new))
+        if entries:
+            self.replace(sheet, entries)
+        return len(entries)
+
+    def _apply(self, action):
+        """
+        Hatalı değiştirme metni pencereyi kapatmaz, altta gösterilir
+        """
+        try:
+            action()
+        except ValueError as error:
+            self._set_status(str(error), error=True)
+            return False
+        return True
+
+    def _set_status(self, text, error=False):
+        self.status_label.setStyleSheet("color: #c00000" if error else "")
+        self.status_label.setText(text)
@@ -0,0 +1,201 @@
+import sys
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Varsayılan bellek tavanı (byte)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# Adım / delta başına sabit ek yük tahmini
+_STEP_OVERHEAD = 120
+_DELTA_OVERHEAD = 96
+
+
+class CellDelta:
+    """
+    Tek bir hücrenin (önce, sonra) farkı.
+    key   : (row, col)
+    before/after : UI'nin ürettiği kompakt snapshot (tuple / None)
+    """
+    __slots__ = ("key", "before", "after")
+
+    def __init__(self, key: Hashable, before: Any, after: Any):
+        self.key = key
+        self.before = before
+        self.after = after
+
+    def __repr__(self):
+        return f"CellDelta({self.key}, {self.before!r} -> {self.after!r})"
+
+
+class UndoStep:
+    """
+    Tek bir kullanıcı işlemi = tek undo adımı (birden fazla delta içerebilir)
+    """
+    __slots__ = ("label", "deltas", "size")
+
+    def __init__(self, label: str, deltas: List[CellDelta]):
+        self.label = label
+        self.deltas = deltas
+        self.size = _STEP_OVERHEAD + sum(_delta_size(d) for d in deltas)
+
+    def __repr__(self):
+        return f"UndoStep({self.label!r}, {len(self.deltas)} delta, {self.size}B)"
+
+
+def _value_size(value: Any) -> int:
+    if value is None:
+        return 0
+    if not isinstance(value, tuple):
+        return sys.getsizeof(value)
+
+    # blok snapshot'ları yüz binlerce yaprak içerir: yapraklar özyinelemesiz
+    getsizeof = sys.getsizeof
+    size = getsizeof(value)
+    for v in value:
+        if isinstance(v, tuple):
+            size += _value_size(v)
+        elif v is not None:
+            size += getsizeof(v)
+    return size
+
+
+def _delta_size(delta: CellDelta) -> int:
+    return _DELTA_OVERHEAD + _value_size(delta.before) + _value_size(delta.after)
+
+
+class UndoJournal:
+    """
+    Komut tabanlı, bellek sınırlı undo/redo günlüğü.
+
+    - Bir işlem group() içinde çalışır; record(key) ile dokunulan her
+      hücrenin önceki durumu bir kez alınır, grup kapanırken sonraki
+      durum capture(key) ile okunur ve yalnızca değişen hücreler saklanır.
+    - Toplam boyut max_bytes'ı aşarsa en eski adımlar atılır
+      (en son adım her zaman korunur).
+    """
+
+    def __init__(
+        self,
+        capture: Callable[[Hashable], Any],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.capture = capture
+        self.max_bytes = max_bytes
+
+        self.undo_steps: deque = deque()
+        self.redo_steps: List[UndoStep] = []
+        self.size = 0
+
+        # açık grup: key -> before
+        self._pending: Optional[Dict[Hashable, Any]] = None
+        self._label = ""
+        self._depth = 0
+
+    # =====================================================
+    # GRUPLAMA
+    # =====================================================
+    @contextmanager
+    def group(self, label: str = ""):
+        self.begin(label)
+        try:
+            yield self
+        finally:
+            self.commit()
+
+    def begin(self, label: str = ""):
+        if self._depth == 0:
+            self._pending = {}
+            self._label = label
+        self._depth += 1
+
+    def record(self, key: Hashable, before: Any = ...):
+        """
+        Hücreyi açık gruba ekler. before verilmezse şimdiki durum alınır.
+        Aynı hücre bir grupta yalnızca ilk kez kaydedilir.
+        """
+        if self._pending is None:
+            raise RuntimeError("record() açık bir grup dışında çağrıldı")
+
+        if key in self._pending:
+            return
+
+        self._pending[key] = self.capture(key) if before is ... else before
+
+    def commit(self):
+        if self._depth == 0:
+            return
+
+        self._depth -= 1
+        if self._depth:
+            return
+
+        pending, self._pending = self._pending, None
+
+        deltas = []
+        for key, before in pending.items():
+            after = self.capture(key)
+            if after != before:
+                deltas.append(CellDelta(key, before, after))
+
+        if not deltas:
+            return
+
+        self._clear_redo()
+        step = UndoStep(self._label, deltas)
+        self.undo_steps.append(step)
+        self.size += step.size
+        self._evict()
+
+    # =====================================================
+    # UNDO / REDO
+    # =====================================================
+    def can_undo(self) -> bool:
+        return bool(self.undo_steps)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_steps)
+
+    def undo(self) -> List[Tuple[Hashable, Any]]:
+        """
+        Son adımı geri alır → uygulanacak (key, snapshot) listesi
+        """
+        if not self.undo_steps:
+            return []
+
+        step = self.undo_steps.pop()
+        self.redo_steps.append(step)
+        return [(d.key, d.before) for d in reversed(step.deltas)]
+
+    def redo(self) -> List[Tuple[Hashable, Any]]:
+        if not self.redo_steps:
+            return []
+
+        step = self.redo_steps.pop()
+        self.undo_steps.append(step)
+        return [(d.key, d.after) for d in step.deltas]
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps.clear()
+        self.size = 0
+
+    # =====================================================
+    # BELLEK
+    # =====================================================
+    def set_max_bytes(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def _clear_redo(self):
+        for step in self.redo_steps:
+            self.size -= step.size
+        self.redo_steps.clear()
+
+    def _evict(self):
+        while self.size > self.max_bytes and len(self.undo_steps) > 1:
+            self.size -= self.undo_steps.popleft().size
+
+        # Tavanı yine aşıyorsak önce redo geçmişini bırak
+        if self.size > self.max_bytes:
+            self._clear_redo()
@@ -1,4 +1,9 @@
+import re
+from functools import lru_cache
+from typing import Dict
+
 def cell_to_index(ref: str):
+    ref = ref.replace("$", "")
     col = 0
     i = 0
     while i < len(ref) and ref[i].isalpha():
@@ -8,13 +13,28 @@ def cell_to_index(ref: str):
     return row, col - 1
 
 
-def index_to_cell(row: int, col: int):
+@lru_cache(maxsize=None)
+def column_name(col: int) -> str:
     col += 1
     name = ""
     while col:
         col, rem = divmod(col - 1, 26)
         name = chr(ord("A") + rem) + name
-    return f"{name}{row + 1}"
+    return name
+
+
+def column_index(name: str) -> int:
+    """
+    "A" -> 0, "AB" -> 27 ($ yok sayılır)
+    """
+    col = 0
+    for ch in name.replace("$", "").upper():
+        col = col * 26 + (ord(ch) - ord("A") + 1)
+    return col - 1
+
+
+def index_to_cell(row: int, col: int):
+    return f"{column_name(col)}{row + 1}"
 
 def expand_range(start_ref: str, end_ref: str):
     """
@@ -35,4 +55,108 @@ def expand_range(start_ref: str, end_ref: str):
         for c in range(min(c1, c2), max(c1, c2) + 1):
             cells.append(index_to_cell(r, c))
 
-    return cells
\ No newline at end of file
+    return cells
+
+# A1 referansı: isteğe bağlı $ işaretleriyle, büyük/küçük harf duyarsız
+# (fonksiyon adları ve sayfa adları hariç: LOG10( , AB1!A1 )
+_REF_RE = re.compile(r"(?<![A-Za-z0-9_$])(\$?)([A-Za-z]{1,3})(\$?)([0-9]+)(?![A-Za-z0-9_.(!])")
+# metin sabitleri, tırnaklı sayfa adları ('Q1 2024'!A1) ve tablo
+# belirteçleri (Sales[Q1]) taranmaz
+_STRING_RE = re.compile(r'("(?:[^"]|"")*"|\'(?:[^\']|\'\')*\'|\[[^\]]*\])')
+
+
+class ReferenceTemplate:
+    """
+    Formül bir kez taranır: sabit metin parçaları + referans yuvaları.
+    Kaydırılmış kopyalar yeniden taranmadan render() ile üretilir
+    (fill-down / fill-right, sıralama).
+    """
+    __slots__ = ("parts", "refs")
+
+    def __init__(self, formula: str):
+        self.parts = []   # referanslar arasındaki metin (len(refs) + 1)
+        self.refs = []    # (col_abs, col, row_abs, row)
+
+        pending = ""
+        for i, part in enumerate(_STRING_RE.split(formula)):
+            if i % 2:
+                pending += part
+                continue
+
+            pos = 0
+            for match in _REF_RE.finditer(part):
+                col_abs, col_name, row_abs, row_text = match.groups()
+                row, col = cell_to_index(col_name.upper() + row_text)
+                self.parts.append(pending + part[pos:match.start()])
+                self.refs.append((col_abs, col, row_abs, row))
+                pending = ""
+                pos = match.end()
+            pending += part[pos:]
+
+        self.parts.append(pending)
+
+    def render(self, drow: int, dcol: int) -> str:
+        parts = self.parts
+        out = [parts[0]]
+        for i, (col_abs, col, row_abs, row) in enumerate(self.refs, 1):
+            if not row_abs:
+                row += drow
+            if not col_abs:
+                col += dcol
+            if row < 0 or col < 0:
+                out.append("#REF!")
+            else:
+                out.append(f"{col_abs}{column_name(col)}{row_abs}{row + 1}")
+            out.append(parts[i])
+        return "".join(out)
+
+    def render_moved(self, drow: int, dcol: int, rows: Dict[int, int], cols: Dict[int, int]) -> str:
+        """
+        render() + taşıma (kes-yapıştır): kaydırılmış referans taşınan
+        bloğun içindeyse ($ olsa da) bloğun yeni yerini gösterir.
+        rows / cols: kaynak satır/sütun -> hedef satır/sütun
+        """
+        parts = self.parts
+        out = [parts[0]]
+        for i, (col_abs, col, row_abs, row) in enumerate(self.refs, 1):
+            if not row_abs:
+                row += drow
+            if not col_abs:
+                col += dcol
+            if row in rows and col in cols:
+                row, col = rows[row], cols[col]
+            if row < 0 or col < 0:
+                out.append("#REF!")
+            else:
+                out.append(f"{col_abs}{column_name(col)}{row_abs}{row + 1}")
+            out.append(parts[i])
+        return "".join(out)
+
+
+def shift_references(formula: str, drow: int, dcol: int) -> str:
+    """
+    Formüldeki göreli referansları (drow, dcol) kadar kaydırır; $ ile
+    sabitlenmiş kısımlar değişmez. Metin sabitleri ("...") atlanır.
+    Sayfa dışına taşan referans "#REF!" olur.
+    """
+    if not drow and not dcol:
+        return formula
+    return ReferenceTemplate(formula).render(drow, dcol)
+
+
+def to_r1c1(formula: str, row: int, col: int) -> str:
+    """
+    Formülün (row, col) hücresine göre R1C1 biçimi – şekil anahtarı.
+    =A2*B2 (C2'de) ve =A3*B3 (C3'te) aynı sonucu verir: "RC[-2]*RC[-1]"
+    """
+    def relative(match):
+        col_abs, col_name, row_abs, row_text = match.groups()
+        r, c = cell_to_index(col_name.upper() + row_text)
+        r_part = f"R{r + 1}" if row_abs else (f"R[{r - row}]" if r != row else "R")
+        c_part = f"C{c + 1}" if col_abs else (f"C[{c - col}]" if c != col else "C")
+        return r_part + c_part
+
+    parts = _STRING_RE.split(formula)
+    for i in range(0, len(parts), 2):
+        parts[i] = _REF_RE.sub(relative, parts[i])
+    return "".join(parts)
@@ -0,0 +1,377 @@
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from evaluator import EvaluationError
+from formula_engine import FormulaEngine
+from names import NameManager
+from search import WorkbookSearch
+from utils import cell_to_index
+
+# Excel'in sayfa adlarında izin vermediği karakterler
+INVALID_SHEET_CHARS = frozenset("[]:*?/\\")
+
+Node = Tuple[str, str]   # (sayfa anahtarı, "A1")
+
+
+def sheet_key(name: str) -> str:
+    """
+    Sayfa adları büyük/küçük harf duyarsızdır: Sheet2!A1 == SHEET2!A1
+    """
+    return name.casefold()
+
+
+# =========================
+# SAYFALAR ARASI KENARLAR
+# =========================
+
+class SheetLinks:
+    """
+    Sayfalar arası bağımlılık kenarları. Her sayfanın kendi
+    DependencyGraph'ı yalnızca sayfa içi kenarları tutar; başka
+    sayfayı okuyan formüller burada (sayfa anahtarı, hücre) çiftiyle.
+    Başka sayfanın tüm sütun/satırı (Data!A:A) tek alan kenarıdır.
+    """
+
+    def __init__(self):
+        # (okuyan sayfa, hücre) -> {(okunan sayfa, ref), ...}
+        self.precedents: Dict[Node, Set[Node]] = {}
+
+        # (okunan sayfa, ref) -> {(okuyan sayfa, hücre), ...}
+        self.dependents: Dict[Node, Set[Node]] = {}
+
+        # (okuyan sayfa, hücre) -> [(okunan sayfa, ("col" | "row", ilk, son)), ...]
+        self.area_precedents: Dict[Node, list] = {}
+
+        # (okunan sayfa, "col" | "row", indeks) -> {(okuyan sayfa, hücre), ...}
+        self.area_dependents: Dict[tuple, Set[Node]] = {}
+
+        # okunan sayfa -> başka sayfalardan gelen kenar sayısı
+        self.readers: Dict[str, int] = {}
+
+    def set(self, sheet: str, cell: str, refs: Iterable[Tuple[str, str]], areas: Iterable[tuple] = ()):
+        """
+        refs: [(sayfa adı, "A1"), ...], areas: [(sayfa adı, alan), ...];
+        ikisi de boşsa hücrenin kenarları silinir
+        """
+        self.remove(sheet, cell)
+
+        node = (sheet, cell)
+        precedents = {(sheet_key(name), ref) for name, ref in refs}
+        if precedents:
+            self.precedents[node] = precedents
+            for source in precedents:
+                self.dependents.setdefault(source, set()).add(node)
+                self._count(source[0], 1)
+
+        areas = [(sheet_key(name), area) for name, area in areas]
+        if areas:
+            self.area_precedents[node] = areas
+            for source, (kind, start, end) in areas:
+                for i in range(start, end + 1):
+                    self.area_dependents.setdefault((source, kind, i), set()).add(node)
+                self._count(source, 1)
+
+    def remove(self, sheet: str, cell: str):
+        node = (sheet, cell)
+
+        for source in self.precedents.pop(node, ()):
+            readers = self.dependents.get(source)
+            if readers is not None:
+                readers.discard(node)
+                if not readers:
+                    del self.dependents[source]
+            self._count(source[0], -1)
+
+        for source, (kind, start, end) in self.area_precedents.pop(node, ()):
+            for i in range(start, end + 1):
+                readers = self.area_dependents.get((source, kind, i))
+                if readers is not None:
+                    readers.discard(node)
+                    if not readers:
+                        del self.area_dependents[(source, kind, i)]
+            self._count(source, -1)
+
+    def _count(self, sheet: str, delta: int):
+        count = self.readers.get(sheet, 0) + delta
+        if count:
+            self.readers[sheet] = count
+        else:
+            del self.readers[sheet]
+
+    def is_read(self, sheet: str) -> bool:
+        return sheet in self.readers
+
+    def readers_at(self, sheet: str, ref: str):
+        """
+        (sheet, ref) değişirse etkilenen başka sayfa hücreleri
+        """
+        readers = self.dependents.get((sheet, ref), ())
+        if not self.area_dependents:
+            return readers
+
+        row, col = cell_to_index(ref)
+        by_column = self.area_dependents.get((sheet, "col", col))
+        by_row = self.area_dependents.get((sheet, "row", row))
+        if not by_column and not by_row:
+            return readers
+        return set(readers) | (by_column or set()) | (by_row or set())
+
+    def readers_of(self, sheet: str) -> Dict[str, List[str]]:
+        """
+        sheet'i okuyan hücreler, okuyan sayfaya göre gruplu
+        """
+        grouped: Dict[str, Set[str]] = {}
+        for index in (self.dependents, self.area_dependents):
+            for key, readers in index.items():
+                if key[0] != sheet:
+                    continue
+                for reader, cell in readers:
+                    grouped.setdefault(reader, set()).add(cell)
+        return {reader: sorted(cells) for reader, cells in grouped.items()}
+
+    def __len__(self):
+        return len(self.precedents.keys() | self.area_precedents.keys())
+
+
+# =========================
+# SAYFA
+# =========================
+
+class Sheet:
+    """
+    Çalışma kitabındaki bir sayfa. Motoru (FormulaEngine) ilk
+    erişimde oluşturulur ve loader varsa içerik o an yüklenir:
+    hiç dokunulmayan sayfa bellekte yalnızca adından ibarettir.
+    """
+    __slots__ = ("name", "key", "workbook", "loader", "_engine")
+
+    def __init__(self, workbook: "Workbook", name: str, loader: Optional[Callable] = None):
+        self.workbook = workbook
+        self.name = name
+        self.key = sheet_key(name)
+
+        # loader() -> [(row, col, text), ...]
+        self.loader = loader
+        self._engine: Optional[FormulaEngine] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._engine is not None
+
+    @property
+    def engine(self) -> FormulaEngine:
+        if self._engine is None:
+            self._engine = self.workbook._load(self)
+        return self._engine
+
+    def __repr__(self):
+        return f"Sheet({self.name!r}, loaded={self.loaded})"
+
+
+# =========================
+# ÇALIŞMA KİTABI
+# =========================
+
+class Workbook:
+    """
+    Sayfalar, sayfa başına bağımlılık bölümleri ve sayfalar arası kenarlar.
+
+    Düzenleme yalnızca kendi sayfasının grafiğinde yayılır; sayfa başka
+    bir sayfa tarafından okunmuyorsa recalc o sayfada biter. Okunuyorsa
+    kirli küme sayfalar arası kenarlarla genişletilir ve yalnızca
+    ulaşılan sayfaların hücreleri tek topolojik sırada hesaplanır.
+    """
+
+    def __init__(self):
+        self._sheets: Dict[str, Sheet] = {}
+        self.order: List[str] = []
+        self.links = SheetLinks()
+
+        # tanımlı isimler (tüm sayfalarda geçerli); tanım değişince
+        # yalnızca yüklü sayfalardaki kullanıcılar yeniden derlenir
+        self.defined_names = NameManager(lambda: [sheet.engine for sheet in self if sheet.loaded])
+
+        # Bul/Değiştir: sayfa başına n-gram dizinleri, ilk aramada kurulur
+        self.search = WorkbookSearch(self)
+
+        # lazy yükleme sırasında recalc sayfa içinde kalır
+        self._loading = 0
+
+    # =====================================================
+    # SAYFALAR
+    # =====================================================
+    def add_sheet(self, name: str, loader: Optional[Callable] = None) -> Sheet:
+        """
+        loader: ilk erişimde çağrılır, [(row, col, text), ...] döndürür.
+        Bu adı önceden okuyan formüller (#REF! almış olanlar) yeniden hesaplanır.
+        """
+        _validate(name)
+        key = sheet_key(name)
+        if key in self._sheets:
+            raise ValueError(f"Sayfa zaten var: {name}")
+
+        sheet = self._sheets[key] = Sheet(self, name, loader)
+        self.order.append(key)
+
+        for reader, cells in self.links.readers_of(key).items():
+            self._sheets[reader].engine.recalculate(cells)
+        return sheet
+
+    def sheet(self, name: str) -> Sheet:
+        sheet = self._sheets.get(sheet_key(name))
+        if sheet is None:
+            raise KeyError(name)
+        return sheet
+
+    def engine(self, name: str) -> FormulaEngine:
+        return self.sheet(name).engine
+
+    def store(self, name: str):
+        """
+        Değerlendiricinin sayfa çözücüsü: Sheet2!A1 → Sheet2'nin deposu
+        """
+        sheet = self._sheets.get(sheet_key(name))
+        if sheet is None:
+            raise EvaluationError("#REF!")
+        return sheet.engine.store
+
+    @property
+    def names(self) -> List[str]:
+        return [self._sheets[key].name for key in self.order]
+
+    def __contains__(self, name: str) -> bool:
+        return sheet_key(name) in self._sheets
+
+    def __iter__(self):
+        return (self._sheets[key] for key in self.order)
+
+    def __len__(self):
+        return len(self._sheets)
+
+    def _load(self, sheet: Sheet) -> FormulaEngine:
+        engine = FormulaEngine(workbook=self, sheet=sheet.key)
+        if sheet.loader is not None:
+            self._loading += 1
+            try:
+                engine.set_cells(list(sheet.loader()))
+            finally:
+                self._loading -= 1
+            sheet.loader = None
+        return engine
+
+    # =====================================================
+    # SAYFALAR ARASI RECALC
+    # =====================================================
+    def crosses(self, sheet: str) -> bool:
+        """
+        sheet'teki bir değişiklik başka sayfaya uzanabilir mi
+        """
+        return not self._loading and self.links.is_read(sheet)
+
+    def recalculate(self, sheet: str, cell_refs: Iterable[str]) -> Dict[str, int]:
+        """
+        sheet'te değişen hücreler + tüm (sayfalar arası) bağımlıları.
+        Katmanlar sayfa bazında gruplanır ve her sayfanın kendi
+        motorunda (vektörel gruplarıyla) hesaplanır.
+        """
+        affected = self._affected(sheet, cell_refs)
+        engines = {key: self._sheets[key].engine for key in affected}
+        levels, cyclic = self._levels(affected, engines)
+
+        for engine in engines.values():
+            engine.evaluator.begin_pass()
+        try:
+            for level in levels:
+                by_sheet: Dict[str, List[str]] = {}
+                for key, ref in level:
+                    by_sheet.setdefault(key, []).append(ref)
+                for key, refs in by_sheet.items():
+                    engines[key]._recalculate_level(refs)
+        finally:
+            for engine in engines.values():
+                engine.evaluator.end_pass()
+
+        for key, ref in cyclic:
+            engines[key]._mark_cycles([ref])
+
+        for key, engine in engines.items():
+            if key != sheet:
+                engine._notify()
+
+        return {
+            "cells": sum(len(refs) for refs in affected.values()),
+            "levels": len(levels),
+            "sheets": len(affected),
+        }
+
+    def _affected(self, sheet: str, cell_refs: Iterable[str]) -> Dict[str, Set[str]]:
+        """
+        Sayfa içi grafik + sayfalar arası kenarlarla ulaşılan hücreler
+        """
+        links = self.links
+        affected: Dict[str, Set[str]] = {}
+        pending = [(sheet, list(cell_refs))]
+
+        while pending:
+            key, refs = pending.pop()
+            graph = self._sheets[key].engine.graph
+            seen = affected.setdefault(key, set())
+
+            queue = deque(ref for ref in refs if ref not in seen)
+            seen.update(queue)
+            while queue:
+                current = queue.popleft()
+                for dependent in graph.successors(current):
+                    if dependent not in seen:
+                        seen.add(dependent)
+                        queue.append(dependent)
+
+                readers = links.readers_at(key, current)
+                if readers:
+                    for reader, cell in readers:
+                        if cell not in affected.get(reader, ()):
+                            pending.append((reader, [cell]))
+
+        return affected
+
+    def _levels(self, affected: Dict[str, Set[str]], engines: Dict[str, FormulaEngine]):
+        """
+        DependencyGraph.recalculation_levels'ın sayfalar arası hali;
+        düğümler (sayfa, hücre). Dönüş: (katmanlar, döngüdeki düğümler)
+        """
+        links = self.links
+
+        # ardıllar bir kez toplanır; giriş dereceleri ileri kenarlardan sayılır
+        successors: Dict[Node, List[Node]] = {}
+        indegree: Dict[Node, int] = {}
+        for key, refs in affected.items():
+            graph = engines[key].graph
+            for ref in refs:
+                following = [(key, d) for d in graph.successors(ref)]
+                following.extend(links.readers_at(key, ref))
+                successors[(key, ref)] = following
+                for node in following:
+                    indegree[node] = indegree.get(node, 0) + 1
+
+        layer = [node for node in successors if node not in indegree]
+        levels = []
+        while layer:
+            levels.append(layer)
+            following = []
+            for node in layer:
+                for successor in successors[node]:
+                    degree = indegree[successor] - 1
+                    indegree[successor] = degree
+                    if not degree:
+                        following.append(successor)
+            layer = following
+
+        cyclic = [node for node, degree in indegree.items() if degree]
+        return levels, cyclic
+
+
+def _validate(name: str):
+    if not name or not name.strip():
+        raise ValueError("Sayfa adı boş olamaz")
+    if any(ch in INVALID_SHEET_CHARS for ch in name):
+        raise ValueError(f"Sayfa adında geçersiz karakter: {name}")